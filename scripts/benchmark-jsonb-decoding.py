@@ -0,0 +1,108 @@
+"""Micro-benchmark of the JSONB column types.
+
+Compares the per-row cost of reading the struct columns of a row:
+
+- before: the driver decodes JSONB into dicts, which are then turned into structs with ``from_dict``.
+- after: the columns are selected as JSON text and decoded straight into structs by a typed msgspec decoder.
+
+Run with ``pdm run python scripts/benchmark-jsonb-decoding.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import timeit
+from pathlib import Path
+from typing import Any
+
+import msgspec
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from app.db.models.custom_types import (
+    FundingType,
+    JSONBType,
+    LocationType,
+    OrgSizeType,
+    ToolType,
+    WorkExperienceType,
+)
+
+logger = logging.getLogger("benchmark-jsonb-decoding")
+
+# Values as they used to be stored, keyed by attribute name
+ROW: list[tuple[JSONBType, Any]] = [
+    (LocationType(), {"city": "Berlin", "region": "Berlin", "country": "Germany"}),
+    (
+        FundingType(),
+        {
+            "round_name": "Series A",
+            "money_raised": 12000000.0,
+            "announced_date": "2024-05-02",
+            "investors": ["Point Nine", "Index Ventures"],
+        },
+    ),
+    (OrgSizeType(), {"engineering": 42}),
+    (
+        ToolType(),
+        [
+            {"name": "Python", "certainty": "High"},
+            {"name": "PostgreSQL", "certainty": "Medium"},
+            {"name": "Kubernetes", "certainty": "Low"},
+            {"name": "Terraform", "certainty": "Low"},
+        ],
+    ),
+    (
+        WorkExperienceType(),
+        [
+            {
+                "starts_at": "2021-03-01",
+                "ends_at": None,
+                "title": "Staff Engineer",
+                "company_name": "Acme",
+                "company_url": "https://acme.com",
+                "location": {"city": "Berlin", "region": None, "country": "Germany"},
+            },
+            {
+                "starts_at": "2017-09-01",
+                "ends_at": "2021-02-01",
+                "title": "Software Engineer",
+                "company_name": "Initech",
+                "company_url": "https://initech.com",
+                "location": None,
+            },
+        ],
+    ),
+]
+
+
+LEGACY_ROW = [(column_type, msgspec.json.encode(value)) for column_type, value in ROW]
+TEXT_ROW = [
+    (column_type, msgspec.json.encode(column_type.process_legacy_value(value)).decode()) for column_type, value in ROW
+]
+
+
+def decode_row_legacy() -> list[Any]:
+    return [column_type.process_legacy_value(msgspec.json.decode(value)) for column_type, value in LEGACY_ROW]
+
+
+def decode_row() -> list[Any]:
+    return [column_type.process_result_value(value, None) for column_type, value in TEXT_ROW]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of rows to decode per run.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs, the fastest one is reported.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    for name, decode in (("before", decode_row_legacy), ("after", decode_row)):
+        best = min(timeit.repeat(decode, number=args.rows, repeat=args.repeat))
+        logger.info("%-8s %8.2f µs per row", name, best / args.rows * 1_000_000)
+
+
+if __name__ == "__main__":
+    main()
@@ -193,3 +193,95 @@ def create_default_roles() -> None:
 
     console.rule("Creating default roles.")
     anyio.run(_create_default_roles)
+
+
+@click.group(name="jobs", invoke_without_command=False, help="Manage job posts.")
+@click.pass_context
+def job_management_app(_: dict[str, Any]) -> None:
+    """Manage job posts."""
+
+
+@job_management_app.command(name="extraction-cache-stats", help="Show the hits and misses of the extraction cache")
+def extraction_cache_stats() -> None:
+    """Show the hits and misses of the job post extraction cache."""
+    import anyio
+    from rich import get_console
+
+    from app.domain.jobs.utils import get_job_details_cache_stats
+
+    console = get_console()
+    stats = anyio.run(get_job_details_cache_stats)
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = stats["hits"] / lookups if lookups else 0
+    console.print(f"Hits: {stats['hits']}, misses: {stats['misses']}, hit rate: {hit_rate:.1%}")
+
+
+@job_management_app.command(name="clear-extraction-cache", help="Drop all cached job post extractions")
+def clear_extraction_cache() -> None:
+    """Drop all cached job post extractions, e.g. after changing the prompt."""
+    import anyio
+    from rich import get_console
+
+    from app.domain.jobs.utils import clear_job_details_cache
+
+    console = get_console()
+    console.rule("Clearing the job post extraction cache.")
+    anyio.run(clear_job_details_cache)
+    console.print("Extraction cache cleared")
+
+
+@job_management_app.command(name="add-tool", help="Add a tool or process, or aliases of an existing one")
+@click.argument("name")
+@click.option(
+    "--process",
+    "is_process",
+    help="Add a process rather than a tool",
+    type=click.BOOL,
+    default=False,
+    required=False,
+    is_flag=True,
+)
+@click.option("--alias", "aliases", help="Another spelling of the name", multiple=True, required=False)
+def add_tool(name: str, is_process: bool, aliases: tuple[str, ...]) -> None:
+    """Add a tool or process to the taxonomy the names extracted from job posts are resolved against."""
+    import anyio
+    from rich import get_console
+
+    from app.domain.jobs.taxonomy import tool_taxonomy
+    from app.lib.schema import ToolKind
+
+    console = get_console()
+    kind = ToolKind.PROCESS if is_process else ToolKind.TOOL
+    anyio.run(tool_taxonomy.add_tool, kind, name, aliases)
+    console.print(f"{kind.value} {name!r} saved with {len(aliases)} alias(es)")
+
+
+@job_management_app.command(name="renormalize-tools", help="Resolve the tool and process names of all job posts again")
+@click.option("--batch-size", help="Job posts per batch", type=click.INT, default=1000, show_default=True)
+@click.option("--after", help="Continue after this job post id, as printed by an interrupted run", required=False)
+def renormalize_tools(batch_size: int, after: str | None) -> None:
+    """Resolve the tool and process names of all job posts against the current taxonomy, e.g. after adding aliases."""
+    from uuid import UUID
+
+    import anyio
+    from rich import get_console
+
+    from app.config.app import alchemy
+    from app.domain.jobs.services import JobPostService
+    from app.lib.tasks import TaskProgress
+
+    console = get_console()
+    progress = TaskProgress()
+
+    async def _renormalize_tools() -> int:
+        async with JobPostService.new(config=alchemy) as service:
+            return await service.renormalize_names(batch_size, after=UUID(after) if after else None, progress=progress)
+
+    console.rule("Renormalizing the tool and process names of job posts.")
+    try:
+        updated = anyio.run(_renormalize_tools)
+    except BaseException:
+        if cursor := progress.meta.get("cursor"):
+            console.print(f"Interrupted, continue with --after {cursor}")
+        raise
+    console.print(f"{progress.counters.get('job_posts_scanned', 0)} job posts scanned, {updated} updated")
@@ -13,9 +13,12 @@ from litestar.config.csrf import CSRFConfig
 from litestar.logging.config import LoggingConfig, StructLoggingConfig
 from litestar.middleware.logging import LoggingMiddlewareConfig
 from litestar.plugins.structlog import StructlogConfig
-from litestar_saq import QueueConfig, SAQConfig
+from litestar_saq import CronJob, QueueConfig, SAQConfig
 from litestar_vite import ViteConfig
 
+from app.lib.http import close_http_clients, open_http_clients
+from app.lib.tasks import lazy_task
+
 from .base import get_settings
 
 settings = get_settings()
@@ -57,11 +60,46 @@ saq = SAQConfig(
             name="system-tasks",
             tasks=["app.domain.system.tasks.system_task", "app.domain.system.tasks.system_upkeep"],
             scheduled_tasks=[],
+            startup=open_http_clients,
+            shutdown=close_http_clients,
         ),
         QueueConfig(
             name="background-tasks",
-            tasks=["app.domain.system.tasks.background_worker_task"],
-            scheduled_tasks=[],
+            tasks=[
+                "app.domain.system.tasks.background_worker_task",
+                lazy_task("app.domain.opportunities.tasks.scan_opportunities"),
+                lazy_task("app.domain.opportunities.tasks.poll_context_batch"),
+                lazy_task("app.domain.opportunities.tasks.warm_opportunity_contexts"),
+                lazy_task("app.domain.jobs.tasks.renormalize_job_posts"),
+                lazy_task("app.domain.companies.tasks.enrich_company"),
+                lazy_task("app.domain.companies.tasks.refresh_company_funding"),
+                lazy_task("app.domain.companies.tasks.refresh_stale_companies"),
+                lazy_task("app.domain.people.tasks.refresh_stale_persons"),
+            ],
+            scheduled_tasks=[
+                CronJob(
+                    function=lazy_task("app.domain.opportunities.tasks.warm_opportunity_contexts"),
+                    cron=settings.scan.CONTEXT_WARM_CRON,
+                    timeout=60 * 60,
+                ),
+                CronJob(
+                    function=lazy_task("app.domain.companies.tasks.refresh_company_funding"),
+                    cron=settings.enrichment.FUNDING_REFRESH_CRON,
+                    timeout=60 * 60,
+                ),
+                CronJob(
+                    function=lazy_task("app.domain.companies.tasks.refresh_stale_companies"),
+                    cron=settings.enrichment.REFRESH_CRON,
+                    timeout=60 * 60,
+                ),
+                CronJob(
+                    function=lazy_task("app.domain.people.tasks.refresh_stale_persons"),
+                    cron=settings.enrichment.REFRESH_CRON,
+                    timeout=60 * 60,
+                ),
+            ],
+            startup=open_http_clients,
+            shutdown=close_http_clients,
         ),
     ],
 )
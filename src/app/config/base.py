@@ -278,6 +278,155 @@ class SaqSettings:
         default_factory=lambda: os.getenv("SAQ_USE_SERVER_LIFESPAN", "True") in TRUE_VALUES,
     )
     """Auto start and stop `saq` processes when starting the Litestar application."""
+    JOB_HEARTBEAT: int = field(default_factory=lambda: int(os.getenv("SAQ_JOB_HEARTBEAT", "300")))
+    """Seconds a long running job may go without saving progress before it is considered stuck."""
+    JOB_RETRIES: int = field(default_factory=lambda: int(os.getenv("SAQ_JOB_RETRIES", "3")))
+    """The number of attempts for long running, resumable jobs."""
+
+
+@dataclass
+class ScanSettings:
+    """Opportunity scan configuration."""
+
+    CONCURRENCY: int = field(default_factory=lambda: int(os.getenv("SCAN_CONCURRENCY", "5")))
+    """The number of companies whose matching job posts are processed concurrently during a scan.
+
+    Each of them uses a database session of its own, so keep this below the connection pool size.
+    """
+    CHUNK_SIZE: int = field(default_factory=lambda: int(os.getenv("SCAN_CHUNK_SIZE", "500")))
+    """The number of job posts read at a time while matching them against ICPs."""
+    CONTEXT_BATCH: bool = field(default_factory=lambda: os.getenv("SCAN_CONTEXT_BATCH", "False") in TRUE_VALUES)
+    """Create opportunities without context and extract it afterwards through the OpenAI Batch API.
+
+    The context is filled in within 24 hours, at about half the token price, and the scan does not wait for the LLM.
+    """
+    CONTEXT_BATCH_POLL_INTERVAL: int = field(
+        default_factory=lambda: int(os.getenv("SCAN_CONTEXT_BATCH_POLL_INTERVAL", "300")),
+    )
+    """Seconds between checks of a context batch for completion."""
+    CONTEXT_WARM_CRON: str = field(default_factory=lambda: os.getenv("SCAN_CONTEXT_WARM_CRON", "15 * * * *"))
+    """When the contexts of the job posts imported during the last day are extracted ahead of the scans."""
+    CONTEXT_PROMPT_VERSION: str = field(default_factory=lambda: os.getenv("SCAN_CONTEXT_PROMPT_VERSION", "1"))
+    """Part of the opportunity context cache key, bump it to invalidate the cached contexts, e.g. when their parsing
+    changes. Changes to the model or the prompt text invalidate them on their own."""
+    CONTEXT_CACHE_TTL: int = field(
+        default_factory=lambda: int(os.getenv("SCAN_CONTEXT_CACHE_TTL", str(60 * 60 * 24 * 30))),
+    )
+    """Seconds the context extracted from a job post for a pitch is cached."""
+
+
+@dataclass
+class JobSettings:
+    """Job post import configuration."""
+
+    DETAILS_PROMPT_VERSION: str = field(default_factory=lambda: os.getenv("JOB_DETAILS_PROMPT_VERSION", "1"))
+    """Part of the job details cache key, bump it to invalidate the cached extractions, e.g. when their parsing changes.
+    Changes to the model or the prompt text invalidate them on their own."""
+    DETAILS_CACHE_TTL: int = field(
+        default_factory=lambda: int(os.getenv("JOB_DETAILS_CACHE_TTL", str(60 * 60 * 24 * 90))),
+    )
+    """Seconds the details extracted from a job post are cached."""
+
+
+@dataclass
+class EnrichmentSettings:
+    """Company and person enrichment configuration."""
+
+    LAZY: bool = field(default_factory=lambda: os.getenv("ENRICHMENT_LAZY", "True") in TRUE_VALUES)
+    """Save companies found while importing job posts and persons right away and enrich them in a background task."""
+    ENRICH_TIMEOUT: int = field(default_factory=lambda: int(os.getenv("ENRICHMENT_ENRICH_TIMEOUT", "300")))
+    """Seconds a background enrichment of a company may take."""
+    PDL_TIMEOUT: float = field(default_factory=lambda: float(os.getenv("ENRICHMENT_PDL_TIMEOUT", "30")))
+    """Seconds the PDL company details may take while enriching a company."""
+    FUNDING_TIMEOUT: float = field(default_factory=lambda: float(os.getenv("ENRICHMENT_FUNDING_TIMEOUT", "30")))
+    """Seconds the PitchBook funding lookup may take while enriching a company."""
+    APP_STORE_TIMEOUT: float = field(default_factory=lambda: float(os.getenv("ENRICHMENT_APP_STORE_TIMEOUT", "20")))
+    """Seconds each app store search may take while enriching a company."""
+    HOMEPAGE_TIMEOUT: float = field(default_factory=lambda: float(os.getenv("ENRICHMENT_HOMEPAGE_TIMEOUT", "90")))
+    """Seconds the homepage render and link extraction may take while enriching a company."""
+    MAX_AGE_DAYS: int = field(default_factory=lambda: int(os.getenv("ENRICHMENT_MAX_AGE_DAYS", "28")))
+    """Companies and persons enriched longer ago than this many days are refreshed by the refresh tasks."""
+    REFRESH_LIMIT: int = field(default_factory=lambda: int(os.getenv("ENRICHMENT_REFRESH_LIMIT", "100")))
+    """The maximum number of companies, and of persons, refreshed per run, least recently enriched first."""
+    REFRESH_BATCH_SIZE: int = field(default_factory=lambda: int(os.getenv("ENRICHMENT_REFRESH_BATCH_SIZE", "10")))
+    """The number of records refreshed together, and saved once the batch is done."""
+    REFRESH_CRON: str = field(default_factory=lambda: os.getenv("ENRICHMENT_REFRESH_CRON", "30 * * * *"))
+    """When the company and person refresh tasks run, until the daily provider budgets are used up."""
+    FUNDING_MAX_AGE_DAYS: int = field(default_factory=lambda: int(os.getenv("ENRICHMENT_FUNDING_MAX_AGE_DAYS", "30")))
+    """Funding snapshots older than this many days are refreshed by the funding refresh task."""
+    FUNDING_REFRESH_LIMIT: int = field(
+        default_factory=lambda: int(os.getenv("ENRICHMENT_FUNDING_REFRESH_LIMIT", "500")),
+    )
+    """The maximum number of companies whose funding is refreshed per run, oldest snapshots first."""
+    FUNDING_REFRESH_CONCURRENCY: int = field(
+        default_factory=lambda: int(os.getenv("ENRICHMENT_FUNDING_REFRESH_CONCURRENCY", "5")),
+    )
+    """The number of companies whose funding is fetched concurrently."""
+    FUNDING_REFRESH_CRON: str = field(default_factory=lambda: os.getenv("ENRICHMENT_FUNDING_REFRESH_CRON", "0 3 * * *"))
+    """When the funding refresh task runs."""
+
+
+@dataclass
+class ProviderSettings:
+    """Third party provider configuration.
+
+    Limits of a single provider are set with ``<PROVIDER>_<SETTING>`` variables, read with ``override``.
+    """
+
+    APP_DETAILS_CACHE_TTL: int = field(
+        default_factory=lambda: int(os.getenv("APP_DETAILS_CACHE_TTL", str(60 * 60 * 24 * 7))),
+    )
+    """Seconds app store details are kept in the cache."""
+    APP_DETAILS_REFRESH_AFTER: int = field(
+        default_factory=lambda: int(os.getenv("APP_DETAILS_REFRESH_AFTER", str(60 * 60 * 6))),
+    )
+    """Seconds after which cached app store details are refreshed in the background, while still being served."""
+    PLAY_STORE_MAX_WORKERS: int = field(default_factory=lambda: int(os.getenv("PLAY_STORE_MAX_WORKERS", "4")))
+    """The number of threads scraping Google Play."""
+    PLAY_STORE_TIMEOUT: float = field(default_factory=lambda: float(os.getenv("PLAY_STORE_TIMEOUT", "10")))
+    """Seconds a Google Play scrape may take, including the wait for a free thread."""
+    PDL_COMPANY_ENRICH_CACHE_TTL: int = field(
+        default_factory=lambda: int(os.getenv("PDL_COMPANY_ENRICH_CACHE_TTL", str(60 * 60 * 24 * 30))),
+    )
+    """Seconds a PDL company enrichment response is cached."""
+    PDL_PERSON_ENRICH_CACHE_TTL: int = field(
+        default_factory=lambda: int(os.getenv("PDL_PERSON_ENRICH_CACHE_TTL", str(60 * 60 * 24 * 7))),
+    )
+    """Seconds a PDL person enrichment response is cached."""
+    PDL_PERSON_SEARCH_CACHE_TTL: int = field(
+        default_factory=lambda: int(os.getenv("PDL_PERSON_SEARCH_CACHE_TTL", str(60 * 60 * 24 * 7))),
+    )
+    """Seconds a PDL person search response is cached."""
+    PDL_NOT_FOUND_CACHE_TTL: int = field(
+        default_factory=lambda: int(os.getenv("PDL_NOT_FOUND_CACHE_TTL", str(60 * 60 * 24))),
+    )
+    """Seconds a PDL "not found" response is cached."""
+    PDL_BULK_CHUNK_SIZE: int = field(default_factory=lambda: int(os.getenv("PDL_BULK_CHUNK_SIZE", "100")))
+    """The number of profiles per PDL bulk enrichment request, PDL accepts up to 100."""
+    HTTP_RETRY_MAX_ATTEMPTS: int = field(default_factory=lambda: int(os.getenv("HTTP_RETRY_MAX_ATTEMPTS", "5")))
+    """The number of attempts of a provider request, throttled and failed attempts are retried."""
+    HTTP_RETRY_BACKOFF_BASE: float = field(default_factory=lambda: float(os.getenv("HTTP_RETRY_BACKOFF_BASE", "0.5")))
+    """Seconds of the first retry backoff, doubled on every attempt."""
+    HTTP_RETRY_BACKOFF_MAX: float = field(default_factory=lambda: float(os.getenv("HTTP_RETRY_BACKOFF_MAX", "30")))
+    """The maximum number of seconds of a retry backoff."""
+    CIRCUIT_BREAKER_THRESHOLD: int = field(default_factory=lambda: int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "5")))
+    """The number of consecutive failures after which calls to a provider are stopped."""
+    CIRCUIT_BREAKER_RESET: float = field(default_factory=lambda: float(os.getenv("CIRCUIT_BREAKER_RESET", "30")))
+    """Seconds after which a stopped provider is tried again."""
+    PB_FUNDING_CACHE_TTL: int = field(
+        default_factory=lambda: int(os.getenv("PB_FUNDING_CACHE_TTL", str(60 * 60 * 24))),
+    )
+    """Seconds a PitchBook funding lookup is cached."""
+
+    def __post_init__(self) -> None:
+        if self.HTTP_RETRY_MAX_ATTEMPTS < 1:
+            msg = "HTTP_RETRY_MAX_ATTEMPTS must be at least 1."
+            raise ValueError(msg)
+
+    @staticmethod
+    def override(provider: str, setting: str) -> str | None:
+        """Get the ``<PROVIDER>_<SETTING>`` value of a provider, ``None`` when it is not set."""
+        return os.getenv(f"{provider.upper()}_{setting}")
 
 
 @dataclass
@@ -450,6 +599,10 @@ class Settings:
     log: LogSettings = field(default_factory=LogSettings)
     redis: RedisSettings = field(default_factory=RedisSettings)
     saq: SaqSettings = field(default_factory=SaqSettings)
+    scan: ScanSettings = field(default_factory=ScanSettings)
+    enrichment: EnrichmentSettings = field(default_factory=EnrichmentSettings)
+    job: JobSettings = field(default_factory=JobSettings)
+    provider: ProviderSettings = field(default_factory=ProviderSettings)
 
     @classmethod
     def from_env(cls, dotenv_filename: str = ".env") -> Settings:
@@ -0,0 +1,117 @@
+# type: ignore
+"""Store JSONB structs with their msgspec field names
+
+Revision ID: 0c4d7b9e2f61
+Revises: 5e8a0f3b7d12
+Create Date: 2024-12-19 16:48:02.117395+00:00
+
+"""
+from __future__ import annotations
+
+import warnings
+from typing import TYPE_CHECKING
+
+import sqlalchemy as sa
+from alembic import op
+from advanced_alchemy.types import EncryptedString, EncryptedText, GUID, ORA_JSONB, DateTimeUTC
+from sqlalchemy import Text  # noqa: F401
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = ["downgrade", "upgrade", "schema_upgrades", "schema_downgrades", "data_upgrades", "data_downgrades"]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+
+# revision identifiers, used by Alembic.
+revision = "0c4d7b9e2f61"
+down_revision = "5e8a0f3b7d12"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            schema_upgrades()
+            data_upgrades()
+
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            data_downgrades()
+            schema_downgrades()
+
+
+# Struct columns holding keys with more than one word, and whether nested objects are structs as well
+STRUCT_COLUMNS = (
+    ("company", "last_funding", True),
+    ("icp", "company", True),
+    ("icp", "person", True),
+    ("person", "work_experiences", True),
+    ("opportunity", "context", False),
+)
+
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+
+
+def data_upgrades() -> None:
+    """Rename snake_case keys to camelCase."""
+    _rename_keys("lower(left(key, 1)) || substr(replace(initcap(key), '_', ''), 2)", "key LIKE '%\\_%'")
+
+
+def data_downgrades() -> None:
+    """Rename camelCase keys to snake_case."""
+    _rename_keys("lower(regexp_replace(key, '([A-Z])', '_\\1', 'g'))", "key ~ '[A-Z]'")
+
+
+def _rename_keys(renamed_key: str, condition: str) -> None:
+    op.execute(
+        sa.text(
+            f"""
+            CREATE OR REPLACE FUNCTION pg_temp.rename_keys(data jsonb, recursive boolean) RETURNS jsonb AS $$
+            BEGIN
+                IF jsonb_typeof(data) = 'object' THEN
+                    RETURN (
+                        SELECT coalesce(
+                            jsonb_object_agg(
+                                CASE WHEN {condition} THEN {renamed_key} ELSE key END,
+                                CASE WHEN recursive THEN pg_temp.rename_keys(value, true) ELSE value END
+                            ),
+                            '{{}}'::jsonb
+                        )
+                        FROM jsonb_each(data)
+                    );
+                ELSIF jsonb_typeof(data) = 'array' THEN
+                    RETURN (
+                        SELECT coalesce(jsonb_agg(pg_temp.rename_keys(value, recursive)), '[]'::jsonb)
+                        FROM jsonb_array_elements(data)
+                    );
+                END IF;
+                RETURN data;
+            END;
+            $$ LANGUAGE plpgsql IMMUTABLE;
+            """,
+        ),
+    )
+    for table, column, recursive in STRUCT_COLUMNS:
+        op.execute(
+            sa.text(
+                f"UPDATE {table} SET {column} = pg_temp.rename_keys({column}, {str(recursive).lower()}) "
+                f"WHERE {column} IS NOT NULL",
+            ),
+        )
+    op.execute(sa.text("DROP FUNCTION pg_temp.rename_keys(jsonb, boolean)"))
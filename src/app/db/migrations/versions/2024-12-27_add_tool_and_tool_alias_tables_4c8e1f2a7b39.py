@@ -0,0 +1,245 @@
+# type: ignore
+"""Add tool and tool alias tables
+
+Revision ID: 4c8e1f2a7b39
+Revises: 8f2b5c7d1a93
+Create Date: 2024-12-27 10:12:44.503118+00:00
+
+"""
+from __future__ import annotations
+
+import uuid
+import warnings
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import sqlalchemy as sa
+from alembic import op
+from advanced_alchemy.types import EncryptedString, EncryptedText, GUID, ORA_JSONB, DateTimeUTC
+from sqlalchemy import Text  # noqa: F401
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = ["downgrade", "upgrade", "schema_upgrades", "schema_downgrades", "data_upgrades", "data_downgrades"]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+
+# revision identifiers, used by Alembic.
+revision = "4c8e1f2a7b39"
+down_revision = "8f2b5c7d1a93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            schema_upgrades()
+            data_upgrades()
+
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            data_downgrades()
+            schema_downgrades()
+
+
+# The names that were hard-coded in app.domain.jobs.utils
+TOOL_NAMES = [
+    "Python",
+    "Kubernetes",
+    "JavaScript",
+    "Typescript",
+    "Node.js",
+    "React",
+    "Flask",
+    "GitHub",
+    "GitHub Actions",
+    "Jenkins",
+    "CircleCI",
+    "GitLab",
+    "GitLab CI",
+    "Buildkite",
+    "Docker",
+    "GitOps",
+    "Argo CD",
+    "Cypress",
+    "Playwright",
+    "Rust",
+    "Go",
+    "TensorFlow",
+    "PyTorch",
+    "LlamaIndex",
+    "LangCHain",
+    "LLM",
+    "RAG",
+    "HuggingFace",
+    "OpenAI",
+    "API",
+    "SDK",
+    "REST API",
+    "GraphQL",
+    "OpenAPI",
+    "Markdown",
+    "Authorization",
+    "Access Management",
+    "Django",
+    "Spring Boot",
+    "Express",
+    "Ruby on Rails",
+    "SailPoint",
+    "Okta",
+    "Auth0",
+    "AWS",
+    "Grafana",
+    "Prometheuse",
+    "Sentry",
+    "Word2Vec",
+    "GloVe",
+    "BERT",
+    "ELMo",
+    "fastText",
+    "Llama",
+    "T5",
+    "Stable Diffusion",
+    "ComfyUI",
+    "ONNX",
+    "OpenVINO",
+    "WebSocket",
+    "gRPC",
+    "PostgreSQL",
+    "Rasa",
+    "Dialogflow",
+    "Amazon Lex",
+    "Cognigy",
+    "Cognigy.ai",
+    "Kore.ai",
+    "ManyChat",
+    "Microsoft Bot Framework",
+    "Yellow.ai",
+]
+TOOL_ALIASES = {
+    "k8s": "Kubernetes",
+    "js": "JavaScript",
+    "ts": "Typescript",
+    "node": "Node.js",
+    "golang": "Go",
+    "postgres": "PostgreSQL",
+    "lex": "Amazon Lex",
+}
+PROCESS_NAMES = ["Code Review", "Testing", "Documentation", "CI/CD"]
+PROCESS_ALIASES = {"ci/cd pipelines": "CI/CD"}
+
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table(
+        "tool",
+        sa.Column("id", sa.GUID(length=16), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("sa_orm_sentinel", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTimeUTC(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTimeUTC(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_tool")),
+        sa.UniqueConstraint("kind", "name", name="uix_tool_kind_name"),
+    )
+    with op.batch_alter_table("tool", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_tool_kind"), ["kind"], unique=False)
+
+    op.create_table(
+        "tool_alias",
+        sa.Column("id", sa.GUID(length=16), nullable=False),
+        sa.Column("alias", sa.String(length=255), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("tool_id", sa.GUID(length=16), nullable=False),
+        sa.Column("sa_orm_sentinel", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTimeUTC(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTimeUTC(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["tool_id"],
+            ["tool.id"],
+            name=op.f("fk_tool_alias_tool_id_tool"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_tool_alias")),
+        sa.UniqueConstraint("kind", "alias", name="uix_tool_alias_kind_alias"),
+    )
+    with op.batch_alter_table("tool_alias", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_tool_alias_tool_id"), ["tool_id"], unique=False)
+
+    # ### end Alembic commands ###
+
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table("tool_alias", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_tool_alias_tool_id"))
+
+    op.drop_table("tool_alias")
+    with op.batch_alter_table("tool", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_tool_kind"))
+
+    op.drop_table("tool")
+    # ### end Alembic commands ###
+
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+    tool_table = sa.table(
+        "tool",
+        sa.column("id", sa.GUID(length=16)),
+        sa.column("name", sa.String),
+        sa.column("kind", sa.String),
+        sa.column("created_at", sa.DateTimeUTC(timezone=True)),
+        sa.column("updated_at", sa.DateTimeUTC(timezone=True)),
+    )
+    tool_alias_table = sa.table(
+        "tool_alias",
+        sa.column("id", sa.GUID(length=16)),
+        sa.column("alias", sa.String),
+        sa.column("kind", sa.String),
+        sa.column("tool_id", sa.GUID(length=16)),
+        sa.column("created_at", sa.DateTimeUTC(timezone=True)),
+        sa.column("updated_at", sa.DateTimeUTC(timezone=True)),
+    )
+    now = datetime.now(UTC)
+    tools = []
+    aliases = []
+    for kind, names, extra_aliases in (
+        ("Tool", TOOL_NAMES, TOOL_ALIASES),
+        ("Process", PROCESS_NAMES, PROCESS_ALIASES),
+    ):
+        ids = {name: uuid.uuid4() for name in names}
+        tools.extend(
+            {"id": tool_id, "name": name, "kind": kind, "created_at": now, "updated_at": now}
+            for name, tool_id in ids.items()
+        )
+        # Canonical names are aliases of themselves
+        for alias, name in {**{name.lower(): name for name in names}, **extra_aliases}.items():
+            aliases.append(
+                {
+                    "id": uuid.uuid4(),
+                    "alias": alias,
+                    "kind": kind,
+                    "tool_id": ids[name],
+                    "created_at": now,
+                    "updated_at": now,
+                },
+            )
+    op.bulk_insert(tool_table, tools)
+    op.bulk_insert(tool_alias_table, aliases)
+
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
@@ -1,5 +1,5 @@
 from .company import Company
-from .icp import ICP
+from .icp import ICP, icp_rejected_job_post_relation
 from .job_post import JobPost
 from .oauth_account import UserOauthAccount
 from .opportunity import Opportunity, OpportunityAuditLog, opportunity_job_post_relation, opportunity_person_relation
@@ -12,6 +12,7 @@ from .team_member import TeamMember
 from .team_roles import TeamRoles
 from .team_tag import team_tag
 from .tenant import Tenant
+from .tool import Tool, ToolAlias
 from .user import User
 from .user_role import UserRole
 
@@ -35,4 +36,7 @@ __all__ = (
     "opportunity_person_relation",
     "opportunity_job_post_relation",
     "ICP",
+    "icp_rejected_job_post_relation",
+    "Tool",
+    "ToolAlias",
 )
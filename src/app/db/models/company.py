@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-from datetime import date  # noqa: TCH003
+from datetime import date, datetime  # noqa: TCH003
 from typing import TYPE_CHECKING
 
 from advanced_alchemy.base import SlugKey, UUIDAuditBase
+from advanced_alchemy.types import DateTimeUTC
 from sqlalchemy import String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.lib.schema import Funding, Location, OrgSize  # noqa: TCH001
+from app.lib.schema import EnrichmentStatus, Funding, Location, OrgSize
 
-from .custom_types import FundingType, LocationType, OrgSizeType
+from .custom_types import EnrichmentStatusType, FundingType, LocationType, OrgSizeType
 
 if TYPE_CHECKING:
     from .person import Person
@@ -35,6 +36,12 @@ class Company(UUIDAuditBase, SlugKey):
     )
     hq_location: Mapped[Location | None] = mapped_column(LocationType, nullable=True, default=None)
     last_funding: Mapped[Funding | None] = mapped_column(FundingType, nullable=True, default=None)
+    last_funding_updated_at: Mapped[datetime | None] = mapped_column(
+        DateTimeUTC(timezone=True),
+        nullable=True,
+        default=None,
+        index=True,
+    )
     org_size: Mapped[OrgSize | None] = mapped_column(OrgSizeType, nullable=True, default=None)
     ios_app_url: Mapped[str | None] = mapped_column(String(length=2083), nullable=True, default=None)
     android_app_url: Mapped[str | None] = mapped_column(String(length=2083), nullable=True, default=None)
@@ -46,6 +53,13 @@ class Company(UUIDAuditBase, SlugKey):
     slack_url: Mapped[str | None] = mapped_column(String(length=2083), nullable=True, default=None, unique=True)
     twitter_url: Mapped[str | None] = mapped_column(String(length=2083), nullable=True, default=None, unique=True)
     product_last_released_at: Mapped[date] = mapped_column(nullable=True, default=None)
+    enrichment_status: Mapped[EnrichmentStatus] = mapped_column(
+        EnrichmentStatusType(length=20),
+        nullable=False,
+        default=EnrichmentStatus.PENDING,
+        index=True,
+    )
+    enriched_at: Mapped[datetime | None] = mapped_column(DateTimeUTC(timezone=True), nullable=True, default=None)
     # -----------
     # ORM Relationships
     # ------------
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-import json
 from contextlib import suppress
-from typing import Any
+from functools import cache
+from typing import Any, ClassVar, get_args
 
+import msgspec
+from sqlalchemy import ColumnElement, Text, cast
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.types import String, TypeDecorator
 
 from app.lib.schema import (
+    BaseStruct,
     CompanyCriteria,
+    EnrichmentStatus,
     Funding,
     FundingRound,
     Location,
@@ -23,17 +27,99 @@ from app.lib.schema import (
     SocialActivity,
     Tool,
     ToolCriteria,
+    ToolKind,
     WorkExperience,
 )
 
+_EMPTY_JSON = frozenset(("null", "{}", "[]"))
+
+
+@cache
+def _encode_names(struct_type: type[BaseStruct]) -> dict[str, str]:
+    """Map the attribute names of a struct to the names it is encoded with, where they differ."""
+    return {
+        field.name: field.encode_name
+        for field in msgspec.structs.fields(struct_type)
+        if field.name != field.encode_name
+    }
+
+
+@cache
+def _decoder(struct_type: type[BaseStruct], many: bool) -> msgspec.json.Decoder:
+    """Build a JSON decoder for a struct, or a list of them."""
+    return msgspec.json.Decoder(struct_type | list[struct_type] if many else struct_type)  # type: ignore[valid-type]
+
+
+@cache
+def _nested_structs(struct_type: type[BaseStruct]) -> dict[str, type[BaseStruct]]:
+    """Map the attribute names of a struct to the struct they hold, directly or in a list or union."""
+    nested = {}
+    for field in msgspec.structs.fields(struct_type):
+        types = [field.type]
+        while types:
+            field_type = types.pop()
+            if isinstance(field_type, type) and issubclass(field_type, BaseStruct):
+                nested[field.name] = field_type
+                break
+            types.extend(get_args(field_type))
+    return nested
+
+
+def _rename_keys(value: Any, struct_type: type[BaseStruct]) -> Any:
+    """Rename attribute name keys, as structs were stored before, to the names the struct is encoded with.
+
+    Keys of nested structs are renamed too.
+    """
+    if not isinstance(value, dict):
+        return value
+    names = _encode_names(struct_type)
+    attribute_names = {encode_name: name for name, encode_name in names.items()}
+    nested = _nested_structs(struct_type)
+    renamed = {}
+    for key, item in value.items():
+        name = attribute_names.get(key, key)
+        if name in nested:
+            nested_type = nested[name]
+            if isinstance(item, list):
+                item = [_rename_keys(nested_item, nested_type) for nested_item in item]
+            else:
+                item = _rename_keys(item, nested_type)
+        renamed[names.get(key, key)] = item
+    return renamed
+
 
 class JSONBType(TypeDecorator):
-    """Base JSON Type."""
+    """Base JSON Type.
+
+    Subclasses setting ``struct_type`` store the msgspec encoding of the struct and select the column as text, so that
+    it is decoded straight into the struct by a typed decoder rather than into dicts first. Values that do not fit
+    the struct fall back to the more lenient ``process_legacy_value``.
+    """
 
     impl = JSONB  # Use the PostgreSQL JSONB type as base
+    struct_type: ClassVar[type[BaseStruct] | None] = None
+    many: ClassVar[bool] = False
+    """Whether the column may also hold a list of structs."""
+
+    def column_expression(self, column: ColumnElement[Any]) -> ColumnElement[Any] | None:
+        """Select struct columns as JSON text, skipping the driver's JSONB decoding."""
+        if self.struct_type is None:
+            return None
+        return cast(column, Text)
 
     def process_bind_param(self, value: Any, dialect: Any) -> Any:
         """Convert Python object to JSON format before storing it in the database."""
+        if self.struct_type is not None:
+            if isinstance(value, dict):
+                # Keys of plain dicts are attribute names, which the typed decoder would drop
+                try:
+                    value = self.convert(value)
+                except msgspec.ValidationError:
+                    value = _rename_keys(value, self.struct_type)
+            elif isinstance(value, list):
+                # Items are only renamed, not filled with defaults, e.g. the operand of ``contains``
+                value = [_rename_keys(item, self.struct_type) for item in value]
+            return msgspec.to_builtins(value)
         if isinstance(value, dict):
             return value
         if hasattr(value, "to_dict"):
@@ -42,16 +128,48 @@ class JSONBType(TypeDecorator):
 
     def process_result_value(self, value: Any, dialect: Any) -> Any | list[Any] | None:
         """Convert JSON format to Python object when reading from the database."""
-        if value:
-            return json.loads(value)
+        if not value:
+            return None
+        if self.struct_type is None:
+            return value
+        if isinstance(value, str):
+            if value in _EMPTY_JSON:
+                return None
+            try:
+                return _decoder(self.struct_type, self.many).decode(value)
+            except msgspec.ValidationError:
+                value = msgspec.json.decode(value)
+        try:
+            return self.convert(value)
+        except msgspec.ValidationError:
+            return self.process_legacy_value(value)
+
+    def convert(self, value: Any) -> Any:
+        """Convert a decoded JSON value into the struct, or list of structs, of the column."""
+        if self.struct_type is None:
+            return value
+        if isinstance(value, dict):
+            return msgspec.convert(_rename_keys(value, self.struct_type), self.struct_type, strict=False)
+        if self.many and isinstance(value, list):
+            return msgspec.convert(
+                [_rename_keys(item, self.struct_type) for item in value],
+                list[self.struct_type],  # type: ignore[name-defined]
+                strict=False,
+            )
+        return None
+
+    def process_legacy_value(self, value: Any) -> Any:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         return None
 
 
 class LocationType(JSONBType):
     """Location Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> Location | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = Location
+
+    def process_legacy_value(self, value: Any) -> Location | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             return Location.from_dict(value)
         return None
@@ -60,8 +178,10 @@ class LocationType(JSONBType):
 class FundingType(JSONBType):
     """Funding Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> Any | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = Funding
+
+    def process_legacy_value(self, value: Any) -> Any | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             obj = Funding.from_dict(value)
             try:
@@ -75,8 +195,11 @@ class FundingType(JSONBType):
 class WorkExperienceType(JSONBType):
     """Work Experience Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> WorkExperience | list[WorkExperience] | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = WorkExperience
+    many = True
+
+    def process_legacy_value(self, value: Any) -> WorkExperience | list[WorkExperience] | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             return WorkExperience.from_dict(value)
         if value and isinstance(value, list):
@@ -87,8 +210,11 @@ class WorkExperienceType(JSONBType):
 class SocialActivityType(JSONBType):
     """Social Activity Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> SocialActivity | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = SocialActivity
+    many = True
+
+    def process_legacy_value(self, value: Any) -> SocialActivity | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             return SocialActivity.from_dict(value)
         return None
@@ -112,11 +238,49 @@ class OpportunityStageType(TypeDecorator):
         return value
 
 
+class EnrichmentStatusType(TypeDecorator):
+    """Enrichment Status Type."""
+
+    impl = String
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Any:
+        """Store the value of the status."""
+        if isinstance(value, EnrichmentStatus):
+            return value.value
+        return value
+
+    def process_result_value(self, value: Any, dialect: Any) -> EnrichmentStatus | None:
+        """Convert the stored value back to a status."""
+        if value is not None:
+            return EnrichmentStatus(value)
+        return value
+
+
+class ToolKindType(TypeDecorator):
+    """Tool Kind Type."""
+
+    impl = String
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Any:
+        """Store the value of the kind."""
+        if isinstance(value, ToolKind):
+            return value.value
+        return value
+
+    def process_result_value(self, value: Any, dialect: Any) -> ToolKind | None:
+        """Convert the stored value back to a kind."""
+        if value is not None:
+            return ToolKind(value)
+        return value
+
+
 class OrgSizeType(JSONBType):
     """Org Size Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> OrgSize | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = OrgSize
+
+    def process_legacy_value(self, value: Any) -> OrgSize | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             return OrgSize.from_dict(value)
         return None
@@ -125,8 +289,11 @@ class OrgSizeType(JSONBType):
 class ToolType(JSONBType):
     """Tool Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> Tool | list[Tool] | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = Tool
+    many = True
+
+    def process_legacy_value(self, value: Any) -> Tool | list[Tool] | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             obj = Tool.from_dict(value)
             obj.certainty = Scale(obj.certainty) if obj.certainty else Scale.LOW
@@ -144,8 +311,11 @@ class ToolType(JSONBType):
 class ProcessType(JSONBType):
     """Process Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> Process | list[Process] | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = Process
+    many = True
+
+    def process_legacy_value(self, value: Any) -> Process | list[Process] | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             return Process.from_dict(value)
         if value and isinstance(value, list):
@@ -160,8 +330,10 @@ class ProcessType(JSONBType):
 class OrgSizeCriteriaType(JSONBType):
     """Org Size Criteria Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> OrgSizeCriteria | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = OrgSizeCriteria
+
+    def process_legacy_value(self, value: Any) -> OrgSizeCriteria | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             return OrgSizeCriteria.from_dict(value)
         return None
@@ -170,8 +342,10 @@ class OrgSizeCriteriaType(JSONBType):
 class PersonCriteriaType(JSONBType):
     """Process Criteria Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> PersonCriteria | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = PersonCriteria
+
+    def process_legacy_value(self, value: Any) -> PersonCriteria | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             return PersonCriteria.from_dict(value)
         return None
@@ -180,8 +354,10 @@ class PersonCriteriaType(JSONBType):
 class ToolCriteriaType(JSONBType):
     """Tool Criteria Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> ToolCriteria | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = ToolCriteria
+
+    def process_legacy_value(self, value: Any) -> ToolCriteria | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             return ToolCriteria.from_dict(value)
         return None
@@ -190,8 +366,10 @@ class ToolCriteriaType(JSONBType):
 class ProcessCriteriaType(JSONBType):
     """Process Criteria Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> ProcessCriteria | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = ProcessCriteria
+
+    def process_legacy_value(self, value: Any) -> ProcessCriteria | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             return ProcessCriteria.from_dict(value)
         return None
@@ -200,8 +378,18 @@ class ProcessCriteriaType(JSONBType):
 class CompanyCriteriaType(JSONBType):
     """Company Criteria Type."""
 
+    struct_type = CompanyCriteria
+
     def process_result_value(self, value: Any, dialect: Any) -> CompanyCriteria | None:
         """Convert JSON format to Python object when reading from the database."""
+        obj = super().process_result_value(value, dialect)
+        # Criteria without funding rounds are left out
+        if not obj or not obj.funding:
+            return None
+        return obj
+
+    def process_legacy_value(self, value: Any) -> CompanyCriteria | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             obj = CompanyCriteria.from_dict(value)
             if not obj.funding or not isinstance(obj.funding, list):
@@ -220,8 +408,10 @@ class CompanyCriteriaType(JSONBType):
 class OpportunityContextType(JSONBType):
     """Opportunity Criteria Type."""
 
-    def process_result_value(self, value: Any, dialect: Any) -> OpportunityContext | None:
-        """Convert JSON format to Python object when reading from the database."""
+    struct_type = OpportunityContext
+
+    def process_legacy_value(self, value: Any) -> OpportunityContext | None:
+        """Convert a decoded JSON value that does not fit the struct of the column."""
         if value and isinstance(value, dict):
             return OpportunityContext.from_dict(value)
         return None
@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+from datetime import datetime  # noqa: TCH003
+from typing import Final
 from uuid import UUID  # noqa: TCH003
 
-from advanced_alchemy.base import UUIDAuditBase
-from sqlalchemy import ForeignKey, Index, String, UniqueConstraint, asc
+from advanced_alchemy.base import UUIDAuditBase, orm_registry
+from advanced_alchemy.types import DateTimeUTC
+from sqlalchemy import Column, ForeignKey, Index, String, Table, UniqueConstraint, asc
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.lib.schema import CompanyCriteria, PersonCriteria, ProcessCriteria, ToolCriteria  # noqa: TCH001
 
 from .custom_types import CompanyCriteriaType, PersonCriteriaType, ProcessCriteriaType, ToolCriteriaType
 
+# Job posts that matched an ICP but did not turn into an opportunity
+icp_rejected_job_post_relation: Final[Table] = Table(
+    "icp_rejected_job_post_relation",
+    orm_registry.metadata,
+    Column("icp_id", ForeignKey("icp.id", ondelete="CASCADE"), primary_key=True, index=True),
+    Column("job_post_id", ForeignKey("job_post.id", ondelete="CASCADE"), primary_key=True),
+)
+
 
 class ICP(UUIDAuditBase):
     """ICP criteria."""
@@ -27,3 +38,11 @@ class ICP(UUIDAuditBase):
     person: Mapped[PersonCriteria] = mapped_column(PersonCriteriaType, nullable=True, default="identified", index=True)
     tenant_id: Mapped[UUID] = mapped_column(ForeignKey("tenant.id"), nullable=False, index=True)
     pitch: Mapped[str | None] = mapped_column(String(length=500), nullable=True, default=None)
+    # Last job post scanned for the ICP, along with the criteria it was scanned with
+    scan_cursor_created_at: Mapped[datetime | None] = mapped_column(
+        DateTimeUTC(timezone=True),
+        nullable=True,
+        default=None,
+    )
+    scan_cursor_id: Mapped[UUID | None] = mapped_column(nullable=True, default=None)
+    scan_criteria_hash: Mapped[str | None] = mapped_column(String(length=64), nullable=True, default=None)
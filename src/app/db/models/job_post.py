@@ -17,7 +17,17 @@ class JobPost(UUIDAuditBase):
     """A job post."""
 
     __tablename__ = "job_post"
-    __table_args__ = (Index("ix_job_post_id", "id"),)
+    __table_args__ = (
+        Index("ix_job_post_id", "id"),
+        Index("idx_job_post_created_at_id", "created_at", "id"),
+        Index("idx_job_post_tools", "tools", postgresql_using="gin", postgresql_ops={"tools": "jsonb_path_ops"}),
+        Index(
+            "idx_job_post_processes",
+            "processes",
+            postgresql_using="gin",
+            postgresql_ops={"processes": "jsonb_path_ops"},
+        ),
+    )
     title: Mapped[str] = mapped_column(nullable=False, index=True)
     body: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
     location: Mapped[Location | None] = mapped_column(LocationType, nullable=True, default=None)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from uuid import UUID  # noqa: TCH003
+
+from advanced_alchemy.base import UUIDAuditBase
+from sqlalchemy import ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.lib.schema import ToolKind
+
+from .custom_types import ToolKindType
+
+
+class Tool(UUIDAuditBase):
+    """A canonical tool or process name, which the names extracted from job posts are normalised to."""
+
+    __tablename__ = "tool"
+    __table_args__ = (UniqueConstraint("kind", "name", name="uix_tool_kind_name"),)
+    name: Mapped[str] = mapped_column(String(length=100), nullable=False)
+    kind: Mapped[ToolKind] = mapped_column(ToolKindType(length=20), nullable=False, default=ToolKind.TOOL, index=True)
+
+    # -----------
+    # ORM Relationships
+    # ------------
+    aliases: Mapped[list[ToolAlias]] = relationship(
+        back_populates="tool",
+        cascade="all, delete-orphan",
+        lazy="noload",
+    )
+
+
+class ToolAlias(UUIDAuditBase):
+    """A lowercased spelling of a tool, e.g. ``k8s`` for Kubernetes."""
+
+    __tablename__ = "tool_alias"
+    __table_args__ = (UniqueConstraint("kind", "alias", name="uix_tool_alias_kind_alias"),)
+    alias: Mapped[str] = mapped_column(String(length=255), nullable=False)
+    kind: Mapped[ToolKind] = mapped_column(ToolKindType(length=20), nullable=False)
+    """The kind of the tool, so that an alias is unique among the tools or the processes."""
+    tool_id: Mapped[UUID] = mapped_column(ForeignKey("tool.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # -----------
+    # ORM Relationships
+    # ------------
+    tool: Mapped[Tool] = relationship(back_populates="aliases", lazy="noload")
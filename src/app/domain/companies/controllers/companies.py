@@ -9,11 +9,11 @@ from litestar.di import Provide
 
 from app.domain.accounts.guards import requires_active_user
 from app.domain.companies import urls
-from app.domain.companies.dependencies import provide_companies_service
+from app.domain.companies.dependencies import provide_app_details_cache, provide_companies_service
 from app.domain.companies.schemas import Company, CompanyCreate, CompanyUpdate
 from app.domain.companies.services import CompanyService
-from app.lib.app_store import get_android_app_details, get_ios_app_details
-from app.lib.schema import AppDetails
+from app.domain.companies.utils import set_app_details
+from app.lib.app_store import AppDetailsCache
 from app.lib.utils import get_logo_dev_link
 
 if TYPE_CHECKING:
@@ -29,10 +29,14 @@ class CompanyController(Controller):
     """Company operations."""
 
     tags = ["Companies"]
-    dependencies = {"companies_service": Provide(provide_companies_service)}
+    dependencies = {
+        "companies_service": Provide(provide_companies_service),
+        "app_details_cache": Provide(provide_app_details_cache, sync_to_thread=False),
+    }
     guards = [requires_active_user]
     signature_namespace = {
         "CompanyService": CompanyService,
+        "AppDetailsCache": AppDetailsCache,
     }
     dto = None
     return_dto = None
@@ -46,6 +50,7 @@ class CompanyController(Controller):
     async def list_companies(
         self,
         companies_service: CompanyService,
+        app_details_cache: AppDetailsCache,
         filters: Annotated[list[FilterTypes], Dependency(skip_validation=True)],
     ) -> OffsetPagination[Company]:
         """List companies that your account can access.."""
@@ -61,14 +66,7 @@ class CompanyController(Controller):
             if company.url:
                 company.profile_pic_url = get_logo_dev_link(company.url)
 
-            if company.ios_app_url:
-                ios_app_details = await get_ios_app_details(company.ios_app_url)
-                company.ios_app_details = AppDetails(**ios_app_details)
-
-            if company.android_app_url:
-                android_app_details = await get_android_app_details(company.android_app_url)
-                company.android_app_details = AppDetails(**android_app_details)
-
+        await set_app_details(paginated_response.items, app_details_cache)
         return paginated_response
 
     @post(
@@ -96,6 +94,7 @@ class CompanyController(Controller):
     async def get_company(
         self,
         companies_service: CompanyService,
+        app_details_cache: AppDetailsCache,
         company_id: Annotated[
             UUID,
             Parameter(
@@ -112,14 +111,7 @@ class CompanyController(Controller):
         if company.url:
             company.profile_pic_url = get_logo_dev_link(company.url)
 
-        if company.ios_app_url:
-            ios_app_details = await get_ios_app_details(company.ios_app_url)
-            company.ios_app_details = AppDetails(**ios_app_details)
-
-        if company.android_app_url:
-            android_app_details = await get_android_app_details(company.android_app_url)
-            company.android_app_details = AppDetails(**android_app_details)
-
+        await set_app_details([company], app_details_cache)
         return company
 
     @patch(
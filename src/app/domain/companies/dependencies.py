@@ -5,13 +5,15 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from app.domain.companies.services import CompanyService
+from app.lib.app_store import AppDetailsCache
 
-__all__ = ("provide_companies_service",)
+__all__ = ("provide_app_details_cache", "provide_companies_service")
 
 
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
 
+    from litestar import Request
     from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -22,3 +24,8 @@ async def provide_companies_service(db_session: AsyncSession) -> AsyncGenerator[
         load=[],
     ) as service:
         yield service
+
+
+def provide_app_details_cache(request: Request) -> AppDetailsCache:
+    """Construct the app details cache, backed by the app's ``app_details`` store."""
+    return AppDetailsCache(request.app.stores.get("app_details"))
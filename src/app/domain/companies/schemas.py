@@ -5,7 +5,7 @@ from uuid import UUID  # noqa: TCH003
 
 import msgspec
 
-from app.lib.schema import AppDetails, CamelizedBaseStruct, Funding, Location, OrgSize
+from app.lib.schema import AppDetails, CamelizedBaseStruct, EnrichmentStatus, Funding, Location, OrgSize
 from app.lib.utils import get_logo_dev_link
 
 
@@ -40,6 +40,8 @@ class Company(CamelizedBaseStruct):
     ios_app_details: AppDetails | None = None
     android_app_details: AppDetails | None = None
     product_last_released_at: date | None = None
+    enrichment_status: EnrichmentStatus | None = None
+    enriched_at: datetime | None = None
 
     def __post_init__(self) -> None:
         """Build a profile pic url from company url."""
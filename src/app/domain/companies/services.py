@@ -1,25 +1,35 @@
 from __future__ import annotations
 
+import asyncio
+from datetime import UTC, datetime, timedelta
+from functools import partial
 from typing import TYPE_CHECKING, Any
 
 import structlog
-from advanced_alchemy.exceptions import ErrorMessages  # noqa: TCH002
+from advanced_alchemy.exceptions import ErrorMessages, RepositoryError
 from advanced_alchemy.filters import LimitOffset, SearchFilter
 from advanced_alchemy.service import SQLAlchemyAsyncRepositoryService, is_dict, is_msgspec_model, is_pydantic_model
 from advanced_alchemy.utils.dataclass import Empty, EmptyType
+from sqlalchemy import func, or_, select, update
 
+from app.config.base import get_settings
 from app.db.models import Company
 from app.lib.app_store import get_android_app_url, get_ios_app_url
+from app.lib.limits import ProviderUnavailableError, provider_budget
 from app.lib.pdl import get_company_details
+from app.lib.pipeline import Step, run_steps
 from app.lib.pitchbook import get_company_funding_data
-from app.lib.schema import Funding, Location
+from app.lib.schema import EnrichmentStatus, Funding, Location
 from app.lib.scraperapi import extract_url_content
+from app.lib.tasks import TaskProgress
 from app.lib.utils import get_domain
 
 from .repositories import CompanyRepository
 from .utils import extract_links_from_page
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from uuid import UUID
 
     from advanced_alchemy.service import ModelDictT
 
@@ -37,7 +47,7 @@ class CompanyService(SQLAlchemyAsyncRepositoryService[Company]):
         self.repository: CompanyRepository = self.repository_type(**repo_kwargs)
         self.model_type = self.repository.model_type
 
-    async def create(  # noqa: PLR0915
+    async def create(
         self,
         data: ModelDictT[Company],
         *,
@@ -45,8 +55,13 @@ class CompanyService(SQLAlchemyAsyncRepositoryService[Company]):
         auto_expunge: bool | None = None,
         auto_refresh: bool | None = None,
         error_messages: ErrorMessages | None | EmptyType = Empty,
+        enrich: bool = True,
     ) -> Company:
-        """Create a new company."""
+        """Create a new company.
+
+        With ``enrich=False`` only the given fields are saved and the company is left ``Pending``, to be filled in
+        later with ``enrich_pending``.
+        """
         obj = None
         if isinstance(data, dict):
             obj = await self.to_model(data, "create")
@@ -72,21 +87,78 @@ class CompanyService(SQLAlchemyAsyncRepositoryService[Company]):
         results, count = await self.list_and_count(*filters)
 
         if count > 0:
-            # TODO: Check the record is older than 4 weeks, refetch
+            # Stale companies are refreshed by the refresh_stale_companies task
             await logger.ainfo("Company already exists", id=results[0].id, url=results[0].url)
             return results[0]
 
-        try:
-            company_details = await get_company_details(url=obj.url, social_url=obj.linkedin_profile_url)
-            location = Location(
-                country=company_details.get("location", {}).get("country"),
-                region=company_details.get("location", {}).get("region"),
-                city=company_details.get("location", {}).get("locality"),
-            )
-        except (KeyError, TypeError, IndexError, LookupError) as e:
-            await logger.awarn("Error getting company details", exc_info=e)
-            company_details = {}
-            location = None
+        if enrich:
+            await self.enrich(obj)
+        else:
+            obj.enrichment_status = EnrichmentStatus.PENDING
+
+        # TODO: Fix upsert
+        return await super().upsert(
+            data=obj,
+            item_id=results[0].id if count > 0 else None,
+            auto_commit=auto_commit,
+            auto_expunge=auto_expunge,
+            auto_refresh=auto_refresh,
+            error_messages=error_messages,
+        )
+
+    async def enrich(self, obj: Company, *, refresh: bool = False) -> None:
+        """Fill in a company from the data providers.
+
+        PDL details come first when the url of the company is unknown, as the other steps need it. Otherwise all steps
+        run concurrently. A step that fails or does not finish in time leaves its fields as they were. With ``refresh``
+        cached provider responses are not used.
+        """
+        settings = get_settings().enrichment
+        url = obj.url
+        after_pdl = () if url else ("pdl",)
+
+        def with_url(enrich: Callable[[Company, str], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+            async def run() -> None:
+                if url or obj.url:
+                    await enrich(obj, url or obj.url)
+
+            return run
+
+        statuses = await run_steps(
+            [
+                Step("pdl", partial(self._enrich_from_pdl, obj, refresh=refresh), timeout=settings.PDL_TIMEOUT),
+                Step(
+                    "funding",
+                    with_url(partial(self._enrich_funding, refresh=refresh)),
+                    settings.FUNDING_TIMEOUT,
+                    after_pdl,
+                ),
+                Step("ios_app", with_url(self._enrich_ios_app), settings.APP_STORE_TIMEOUT, after_pdl),
+                Step("android_app", with_url(self._enrich_android_app), settings.APP_STORE_TIMEOUT, after_pdl),
+                Step("homepage", with_url(self._enrich_from_homepage), settings.HOMEPAGE_TIMEOUT, after_pdl),
+            ],
+        )
+        # Nothing was found when every step timed out, failed or was skipped
+        failed = all(status != "done" for status in statuses.values())
+        obj.enrichment_status = EnrichmentStatus.FAILED if failed else EnrichmentStatus.ENRICHED
+        obj.enriched_at = datetime.now(UTC)
+        await logger.ainfo("Company enriched", url=obj.url, steps=statuses)
+
+    async def enrich_pending(self, company_id: UUID) -> Company:
+        """Enrich a company that was created with ``enrich=False``, companies enriched meanwhile are left as is."""
+        obj = await self.get(company_id)
+        if obj.enrichment_status == EnrichmentStatus.ENRICHED:
+            await logger.ainfo("Company already enriched", id=obj.id, url=obj.url)
+            return obj
+        await self.enrich(obj)
+        return await self.update(obj, auto_commit=True)
+
+    async def _enrich_from_pdl(self, obj: Company, *, refresh: bool = False) -> None:
+        company_details = await get_company_details(
+            url=obj.url,
+            social_url=obj.linkedin_profile_url,
+            refresh=refresh,
+        )
 
         # TODO: Move to provider specific code
         obj.description = company_details.get("headline") or obj.description
@@ -96,53 +168,183 @@ class CompanyService(SQLAlchemyAsyncRepositoryService[Company]):
         obj.founded_year = company_details.get("founded") or obj.founded_year
         obj.url = company_details.get("website") or obj.url
         obj.linkedin_profile_url = company_details.get("linkedin_url") or obj.linkedin_profile_url
-        obj.hq_location = location
+        obj.hq_location = Location(
+            country=company_details.get("location", {}).get("country"),
+            region=company_details.get("location", {}).get("region"),
+            city=company_details.get("location", {}).get("locality"),
+        )
         # TODO: Fetch and set org size
 
-        if obj.url:
-            # Get investor names and last funding round name
-            try:
-                funding_data = await get_company_funding_data(obj.url)
-                obj.last_funding = Funding(
-                    round_name=funding_data["round_name"],
-                    money_raised=funding_data["money_raised"],
-                    announced_date=funding_data["announced_date"],
-                    investors=funding_data["investors"],
+    async def _enrich_funding(self, obj: Company, url: str, *, refresh: bool = False) -> None:
+        # Get investor names and last funding round name
+        funding_data = await get_company_funding_data(url, refresh=refresh)
+        obj.last_funding = Funding(
+            round_name=funding_data["round_name"],
+            money_raised=funding_data["money_raised"],
+            announced_date=funding_data["announced_date"],
+            investors=funding_data["investors"],
+        )
+        obj.last_funding_updated_at = datetime.now(UTC)
+
+    async def _enrich_ios_app(self, obj: Company, url: str) -> None:
+        obj.ios_app_url = await get_ios_app_url(url)
+
+    async def _enrich_android_app(self, obj: Company, url: str) -> None:
+        obj.android_app_url = await get_android_app_url(obj.name, url)
+
+    async def _enrich_from_homepage(self, obj: Company, url: str) -> None:
+        # Get data from company homepage
+        company_homepage_html_content = await extract_url_content(url, render=True)
+        company_homepage_data = await extract_links_from_page(url, company_homepage_html_content)
+        obj.docs_url = company_homepage_data.get("docs_url")
+        obj.blog_url = company_homepage_data.get("blog_url")
+        obj.changelog_url = company_homepage_data.get("changelog_url")
+        obj.github_url = company_homepage_data.get("github_url")
+        obj.discord_url = company_homepage_data.get("discord_url")
+        obj.slack_url = company_homepage_data.get("slack_url")
+        obj.twitter_url = company_homepage_data.get("twitter_url")
+
+    async def refresh_funding(
+        self,
+        max_age_days: int,
+        limit: int,
+        concurrency: int,
+        progress: TaskProgress | None = None,
+    ) -> int:
+        """Refresh the funding of the companies with the oldest funding snapshots.
+
+        Args:
+            max_age_days: Refresh snapshots older than this many days, or missing ones.
+            limit: The maximum number of companies to refresh.
+            concurrency: The number of companies fetched concurrently.
+            progress: Progress counters of the job running the refresh.
+
+        Returns:
+            The number of companies whose funding was updated.
+        """
+        progress = progress or TaskProgress()
+        cutoff = datetime.now(UTC) - timedelta(days=max_age_days)
+        rows = (
+            await self.repository.session.execute(
+                select(Company.id, Company.url)
+                .where(
+                    Company.url.is_not(None),
+                    or_(Company.last_funding_updated_at.is_(None), Company.last_funding_updated_at < cutoff),
                 )
-            except (KeyError, TypeError, IndexError, LookupError) as e:
-                obj.last_funding = Funding()
-                await logger.awarn("Failed to get company funding data", url=obj.url, exc_info=e)
+                .order_by(Company.last_funding_updated_at.asc().nulls_first(), Company.id)
+                .limit(limit),
+            )
+        ).all()
+        semaphore = asyncio.Semaphore(concurrency)
 
-            # Get app store urls
-            try:
-                obj.ios_app_url = await get_ios_app_url(obj.url)
-                obj.android_app_url = await get_android_app_url(obj.name, obj.url)
-            except (KeyError, TypeError, IndexError, LookupError) as e:
-                await logger.awarn("Failed to get app store data", url=obj.url, exc_info=e)
+        async def fetch(company_id: UUID, url: str) -> dict[str, Any] | None:
+            async with semaphore:
+                try:
+                    funding_data = await get_company_funding_data(url, refresh=True)
+                except ProviderUnavailableError as e:
+                    # Try again on the next run
+                    await logger.awarn("Skipping funding refresh", company_id=company_id, url=url, exc_info=e)
+                    progress.incr("companies_skipped")
+                    return None
+                except (KeyError, TypeError, IndexError, LookupError) as e:
+                    # Companies PitchBook does not know about are checked again once the snapshot is stale
+                    await logger.awarn("Failed to refresh company funding", company_id=company_id, url=url, exc_info=e)
+                    progress.incr("companies_failed")
+                    return {"id": company_id, "last_funding_updated_at": datetime.now(UTC)}
+                progress.incr("companies_refreshed")
+                return {
+                    "id": company_id,
+                    "last_funding": Funding(
+                        round_name=funding_data["round_name"],
+                        money_raised=funding_data["money_raised"],
+                        announced_date=funding_data["announced_date"],
+                        investors=funding_data["investors"],
+                    ),
+                    "last_funding_updated_at": datetime.now(UTC),
+                }
 
-            # Get data from company homepage
-            try:
-                company_homepage_html_content = await extract_url_content(obj.url, render=True)
-                company_homepage_data = await extract_links_from_page(obj.url, company_homepage_html_content)
-                obj.docs_url = company_homepage_data.get("docs_url")
-                obj.blog_url = company_homepage_data.get("blog_url")
-                obj.changelog_url = company_homepage_data.get("changelog_url")
-                obj.github_url = company_homepage_data.get("github_url")
-                obj.discord_url = company_homepage_data.get("discord_url")
-                obj.slack_url = company_homepage_data.get("slack_url")
-                obj.twitter_url = company_homepage_data.get("twitter_url")
-            except (KeyError, TypeError, IndexError, LookupError) as e:
-                await logger.awarn("Failed to extract links from company homepage", url=obj.url, exc_info=e)
+        results = await asyncio.gather(*(fetch(company_id, url) for company_id, url in rows))
+        refreshed = [result for result in results if result is not None and "last_funding" in result]
+        checked = [result for result in results if result is not None and "last_funding" not in result]
+        # Bulk updates by primary key need the same columns in every row
+        for values in (refreshed, checked):
+            if values:
+                await self.repository.session.execute(update(Company), values)
+        await self.repository.session.commit()
+        await progress.save()
+        return len(refreshed)
 
-        # TODO: Fix upsert
-        return await super().upsert(
-            data=obj,
-            item_id=results[0].id if count > 0 else None,
-            auto_commit=auto_commit,
-            auto_expunge=auto_expunge,
-            auto_refresh=auto_refresh,
-            error_messages=error_messages,
+    async def refresh_stale(
+        self,
+        max_age_days: int,
+        limit: int,
+        batch_size: int,
+        progress: TaskProgress | None = None,
+    ) -> int:
+        """Enrich again the companies enriched longest ago, within today's PDL budget.
+
+        Companies are refreshed ``batch_size`` at a time and each batch is committed once done, the budget is taken
+        per batch. A company whose enrichment raises, or whose new details conflict with another company (e.g. the
+        same url), is left as it was and checked again once it is stale.
+
+        Returns:
+            The number of companies refreshed.
+        """
+        progress = progress or TaskProgress()
+        enriched_at = func.coalesce(Company.enriched_at, Company.updated_at)
+        companies = list(
+            await self.repository.session.scalars(
+                select(Company)
+                .where(enriched_at < datetime.now(UTC) - timedelta(days=max_age_days))
+                .order_by(enriched_at)
+                .limit(limit),
+            ),
         )
+        # Enriched detached, so that a conflicting company can be rolled back on its own
+        for company in companies:
+            self.repository.session.expunge(company)
+
+        async def enrich(company: Company) -> bool:
+            try:
+                await self.enrich(company, refresh=True)
+            except Exception as e:  # noqa: BLE001
+                await logger.awarn("Failed to refresh company", id=company.id, url=company.url, exc_info=e)
+                return False
+            return True
+
+        refreshed = 0
+        for i in range(0, len(companies), batch_size):
+            batch = companies[i : i + batch_size]
+            granted = await provider_budget.take("pdl", len(batch))
+            over_budget = granted < len(batch)
+            if over_budget:
+                progress.incr("companies_over_budget", len(companies) - i - granted)
+                batch = batch[:granted]
+            enriched = await asyncio.gather(*(enrich(company) for company in batch))
+            failed = [company.id for company, ok in zip(batch, enriched, strict=True) if not ok]
+            for company, ok in zip(batch, enriched, strict=True):
+                if not ok:
+                    continue
+                try:
+                    async with self.repository.session.begin_nested():
+                        await self.update(company)
+                except RepositoryError as e:
+                    await logger.awarn("Failed to save refreshed company", id=company.id, url=company.url, exc_info=e)
+                    failed.append(company.id)
+                else:
+                    refreshed += 1
+                    progress.incr("companies_refreshed")
+            # Companies that failed are checked again once they are stale, instead of blocking the ones after them
+            if failed:
+                progress.incr("companies_failed", len(failed))
+                await self.repository.session.execute(
+                    update(Company).where(Company.id.in_(failed)).values(enriched_at=datetime.now(UTC)),
+                )
+            await self.repository.session.commit()
+            await progress.save(progress=(i + len(batch)) / len(companies))
+            if over_budget:
+                break
+        return refreshed
 
     async def to_model(self, data: ModelDictT[Company], operation: str | None = None) -> Company:
         if (is_msgspec_model(data) or is_pydantic_model(data)) and operation == "create" and data.slug is None:  # type: ignore[union-attr]
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from advanced_alchemy.exceptions import NotFoundError, RepositoryError
+from saq import Job
+from sqlalchemy import update
+from structlog import get_logger
+
+from app.config.app import alchemy
+from app.config.base import get_settings
+from app.db.models import Company
+from app.lib.schema import EnrichmentStatus
+from app.lib.tasks import TaskProgress
+
+from .services import CompanyService
+
+if TYPE_CHECKING:
+    from saq import Queue
+    from saq.types import Context
+
+__all__ = ["enrich_company", "queue_company_enrichment", "refresh_company_funding", "refresh_stale_companies"]
+
+
+logger = get_logger()
+ENRICH_JOB_TTL = 60 * 60
+"""Seconds to keep a finished enrichment job around, the same company is not queued again meanwhile."""
+ENRICH_RETRY_DELAY = 10.0
+"""Seconds to wait before retrying an enrichment job whose company was not found."""
+
+
+async def queue_company_enrichment(queue: Queue, company: Company) -> None:
+    """Queue the enrichment of a pending company, once per company.
+
+    The company must be committed already, otherwise the job might run before it can be found.
+    """
+    if company.enrichment_status != EnrichmentStatus.PENDING:
+        return
+    settings = get_settings()
+    job = await queue.enqueue(
+        Job(
+            function="enrich_company",
+            kwargs={"company_id": str(company.id)},
+            key=f"enrich-company:{company.id}",
+            timeout=settings.enrichment.ENRICH_TIMEOUT,
+            retries=settings.saq.JOB_RETRIES,
+            ttl=ENRICH_JOB_TTL,
+            retry_delay=ENRICH_RETRY_DELAY,
+        ),
+    )
+    await logger.ainfo("Queued company enrichment", id=company.id, queued=job is not None)
+
+
+async def enrich_company(ctx: Context, *, company_id: str) -> str:
+    """Fill in a company that was saved without enrichment."""
+    await logger.ainfo("Enriching company", id=company_id)
+    async with CompanyService.new(config=alchemy) as service:
+        try:
+            company = await service.enrich_pending(UUID(company_id))
+        except NotFoundError:
+            # Retried, in case the company is not committed yet
+            await logger.awarn("Company to enrich not found", id=company_id)
+            raise
+        except RepositoryError as e:
+            # E.g. the enriched url or profiles belong to another company
+            await logger.aerror("Failed to enrich company", id=company_id, exc_info=e)
+            await service.repository.session.rollback()
+            await service.repository.session.execute(
+                update(Company)
+                .where(Company.id == UUID(company_id))
+                .values(enrichment_status=EnrichmentStatus.FAILED.value),
+            )
+            await service.repository.session.commit()
+            return EnrichmentStatus.FAILED.value
+    return company.enrichment_status.value
+
+
+async def refresh_company_funding(
+    ctx: Context,
+    *,
+    max_age_days: int | None = None,
+    limit: int | None = None,
+) -> int:
+    """Refresh the funding of companies whose funding snapshot is stale."""
+    settings = get_settings().enrichment
+    max_age_days = max_age_days if max_age_days is not None else settings.FUNDING_MAX_AGE_DAYS
+    limit = limit if limit is not None else settings.FUNDING_REFRESH_LIMIT
+    progress = TaskProgress(ctx.get("job"))
+    await logger.ainfo("Refreshing company funding", max_age_days=max_age_days, limit=limit)
+    async with CompanyService.new(config=alchemy) as service:
+        companies_refreshed = await service.refresh_funding(
+            max_age_days,
+            limit,
+            settings.FUNDING_REFRESH_CONCURRENCY,
+            progress=progress,
+        )
+    await logger.ainfo("Company funding refresh complete", **progress.counters)
+    return companies_refreshed
+
+
+async def refresh_stale_companies(
+    ctx: Context,
+    *,
+    max_age_days: int | None = None,
+    limit: int | None = None,
+) -> int:
+    """Enrich again the companies enriched longest ago."""
+    settings = get_settings().enrichment
+    max_age_days = max_age_days if max_age_days is not None else settings.MAX_AGE_DAYS
+    limit = limit if limit is not None else settings.REFRESH_LIMIT
+    progress = TaskProgress(ctx.get("job"))
+    await logger.ainfo("Refreshing stale companies", max_age_days=max_age_days, limit=limit)
+    async with CompanyService.new(config=alchemy) as service:
+        companies_refreshed = await service.refresh_stale(
+            max_age_days,
+            limit,
+            settings.REFRESH_BATCH_SIZE,
+            progress=progress,
+        )
+    await logger.ainfo("Stale company refresh complete", **progress.counters)
+    return companies_refreshed
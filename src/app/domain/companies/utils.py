@@ -6,6 +6,9 @@ import structlog
 from bs4 import BeautifulSoup
 from openai import AsyncOpenAI
 
+from app.domain.companies.schemas import Company
+from app.lib.app_store import AppDetailsCache, AppPlatform
+from app.lib.limits import provider_limit
 from app.lib.utils import get_fully_qualified_url
 
 logger = structlog.get_logger()
@@ -54,17 +57,37 @@ async def extract_links_from_page(base_url: str, html_content: str) -> dict[str,
             "content": prompt.format(links=links),
         },
     ]
-    chat_response = await client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=0,
-        response_format={
-            "type": "json_object",
-        },
-    )
+    async with provider_limit("openai"):
+        chat_response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0,
+            response_format={
+                "type": "json_object",
+            },
+        )
 
     data = json.loads(chat_response.choices[0].message.content)
     if not data:
         logger.warning("Failed to extract necessary information from page")
 
     return {k: urljoin(get_fully_qualified_url(base_url), v) for k, v in data.items() if v}
+
+
+async def set_app_details(companies: list[Company], app_details_cache: AppDetailsCache) -> None:
+    """Set the app store details of companies, fetching the ones missing from the cache concurrently."""
+    apps: list[tuple[AppPlatform, str]] = []
+    for company in companies:
+        if company.ios_app_url:
+            apps.append(("ios", company.ios_app_url))
+        if company.android_app_url:
+            apps.append(("android", company.android_app_url))
+    if not apps:
+        return
+
+    app_details = await app_details_cache.get_many(apps)
+    for company in companies:
+        if company.ios_app_url:
+            company.ios_app_details = app_details[("ios", company.ios_app_url)]
+        if company.android_app_url:
+            company.android_app_details = app_details[("android", company.android_app_url)]
@@ -16,24 +16,26 @@ from litestar.exceptions import NotFoundException
 from litestar.params import Body  # noqa: TCH002
 from litestar.response import Response
 
+from app.config.base import get_settings
 from app.domain.accounts.guards import requires_active_user
 from app.domain.companies.dependencies import provide_companies_service
 from app.domain.companies.schemas import CompanyCreate
 from app.domain.companies.services import CompanyService  # noqa: TCH001
+from app.domain.companies.tasks import queue_company_enrichment
 from app.domain.jobs import urls
 from app.domain.jobs.dependencies import provide_job_posts_service
+from app.domain.jobs.repositories import job_post_processes_filter, job_post_tools_filter
 from app.domain.jobs.schemas import JobPost, JobPostCreate, JobPostCreateFromURL, JobPostUpdate
 from app.domain.jobs.services import JobPostService
-from app.domain.jobs.utils import extract_job_details_from_html
+from app.domain.jobs.utils import extract_job_post
 from app.lib.schema import Location, Process, Tool
-from app.lib.scraperapi import extract_url_content
-from app.lib.utils import get_domain
 
 if TYPE_CHECKING:
     from uuid import UUID
 
     from advanced_alchemy.service.pagination import OffsetPagination
     from litestar.params import Dependency, Parameter
+    from litestar_saq import TaskQueues
 
     from app.lib.dependencies import FilterTypes
 
@@ -66,9 +68,32 @@ class JobPostController(Controller):
         self,
         job_posts_service: JobPostService,
         filters: Annotated[list[FilterTypes], Dependency(skip_validation=True)],
+        tools: Annotated[
+            list[str] | None,
+            Parameter(
+                title="Tools",
+                description="Only list job posts using any of these tools.",
+                query="tools",
+                required=False,
+            ),
+        ] = None,
+        processes: Annotated[
+            list[str] | None,
+            Parameter(
+                title="Processes",
+                description="Only list job posts following any of these processes.",
+                query="processes",
+                required=False,
+            ),
+        ] = None,
     ) -> OffsetPagination[JobPost]:
         """List job_posts that your account can access.."""
-        results, total = await job_posts_service.get_job_posts(*filters)
+        name_filters = []
+        if tools:
+            name_filters.append(job_post_tools_filter(tools))
+        if processes:
+            name_filters.append(job_post_processes_filter(processes))
+        results, total = await job_posts_service.get_job_posts(*filters, *name_filters)
         return job_posts_service.to_schema(data=results, total=total, schema_type=JobPost, filters=filters)
 
     @post(
@@ -97,6 +122,7 @@ class JobPostController(Controller):
         self,
         companies_service: CompanyService,
         job_posts_service: JobPostService,
+        task_queues: TaskQueues,
         data: JobPostCreateFromURL,
     ) -> JobPost:
         """Create a new job post."""
@@ -112,17 +138,7 @@ class JobPostController(Controller):
             await logger.ainfo("Job post already exists", job_post=jp)
             return jp
 
-        # Extract job post from URL
-        render = False
-
-        # Some ur;s require a rendering javascript(done using headless browser)
-        job_link_domain = get_domain(data.url)
-        if job_link_domain.endswith(("workable.com", "linkedin.com")):
-            render = True
-
-        html_content = await extract_url_content(data.url, render=render, timeout=data.timeout)
-        job_details = await extract_job_details_from_html(html_content)
-
+        html_content, job_details = await extract_job_post(data.url, timeout=data.timeout)
         company_url = job_details.get("company", {}).get("url")
         company_linkedin_url = job_details.get("company", {}).get("linkedin_url")
 
@@ -136,7 +152,11 @@ class JobPostController(Controller):
             url=company_url,
             linkedin_profile_url=company_linkedin_url,
         )
-        company_db_obj = await companies_service.create(company.to_dict())
+        lazy = get_settings().enrichment.LAZY
+        # Committed before its enrichment is queued, the job runs in another session
+        company_db_obj = await companies_service.create(company.to_dict(), enrich=not lazy, auto_commit=lazy)
+        if lazy:
+            await queue_company_enrichment(task_queues.get("background-tasks"), company_db_obj)
 
         # Add job post
         job_post = JobPostCreate(
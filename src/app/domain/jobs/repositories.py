@@ -3,14 +3,32 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any
 
 from advanced_alchemy.repository import SQLAlchemyAsyncRepository
-from sqlalchemy import ColumnElement, select
+from sqlalchemy import ColumnElement, or_, select
 
 from app.db.models import JobPost
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from advanced_alchemy.filters import FilterTypes
 
-__all__ = ("JobPostRepository",)
+__all__ = ("JobPostRepository", "job_post_processes_filter", "job_post_tools_filter")
+
+
+def job_post_tools_filter(names: Iterable[str]) -> ColumnElement[bool]:
+    """Select job posts using any of the tools.
+
+    Each name is a containment check (``@>``), answered by the ``jsonb_path_ops`` GIN index on ``job_post.tools``.
+    """
+    return or_(*(JobPost.tools.contains([{"name": name}]) for name in names))
+
+
+def job_post_processes_filter(names: Iterable[str]) -> ColumnElement[bool]:
+    """Select job posts following any of the processes.
+
+    Each name is a containment check (``@>``), answered by the ``jsonb_path_ops`` GIN index on ``job_post.processes``.
+    """
+    return or_(*(JobPost.processes.contains([{"name": name}]) for name in names))
 
 
 class JobPostRepository(SQLAlchemyAsyncRepository[JobPost]):
@@ -1,19 +1,32 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
+from uuid import UUID
 
+import msgspec
+import structlog
 from advanced_alchemy.service import SQLAlchemyAsyncRepositoryService
+from sqlalchemy import column, func, select, update, values
 
 from app.db.models import JobPost
+from app.db.models.custom_types import ProcessType, ToolType
+from app.lib.schema import ToolKind
+from app.lib.tasks import TaskProgress
 
 from .repositories import JobPostRepository
+from .taxonomy import tool_taxonomy
 
 if TYPE_CHECKING:
 
     from advanced_alchemy.filters import FilterTypes
+    from sqlalchemy import ColumnElement
+
+    from app.lib.schema import Process, Tool
 
 __all__ = ("JobPostService",)
 
+logger = structlog.get_logger()
+
 
 class JobPostService(SQLAlchemyAsyncRepositoryService[JobPost]):
     """JobPost Service."""
@@ -27,8 +40,88 @@ class JobPostService(SQLAlchemyAsyncRepositoryService[JobPost]):
 
     async def get_job_posts(
         self,
-        *filters: FilterTypes,
+        *filters: FilterTypes | ColumnElement[bool],
         **kwargs: Any,
     ) -> tuple[list[JobPost], int]:
         """Get all job posts."""
         return await self.repository.get_job_posts(*filters, **kwargs)
+
+    async def renormalize_names(
+        self,
+        batch_size: int = 1000,
+        after: UUID | None = None,
+        progress: TaskProgress | None = None,
+    ) -> int:
+        """Resolve the stored tool and process names of all job posts against the current tool taxonomy.
+
+        Job posts are read ``batch_size`` at a time in id order. The names of a batch are resolved together and the
+        job posts whose names changed are written back with a single ``UPDATE ... FROM (VALUES ...)``, committed per
+        batch. The last id done is kept in ``progress.meta["cursor"]``, a retried task continues from there, as it
+        does from ``after``.
+
+        Returns:
+            The number of job posts updated.
+        """
+        progress = progress or TaskProgress()
+        cursor = progress.meta.get("cursor")
+        last_id = UUID(cursor) if cursor else after
+        if "job_posts_total" not in progress.counters:
+            count = select(func.count()).select_from(JobPost)
+            if last_id:
+                count = count.where(JobPost.id > last_id)
+            total = await self.repository.session.scalar(count)
+            progress.set("job_posts_total", total or 0)
+
+        while True:
+            statement = select(JobPost.id, JobPost.tools, JobPost.processes).order_by(JobPost.id).limit(batch_size)
+            if last_id:
+                statement = statement.where(JobPost.id > last_id)
+            rows = (await self.repository.session.execute(statement)).tuples().all()
+            if not rows:
+                break
+
+            tool_names = await self._resolve_names(ToolKind.TOOL, [tools for _, tools, _ in rows])
+            process_names = await self._resolve_names(ToolKind.PROCESS, [processes for _, _, processes in rows])
+            changed = []
+            for job_post_id, tools, processes in rows:
+                new_tools = _renamed(tools, tool_names)
+                new_processes = _renamed(processes, process_names)
+                if new_tools is not tools or new_processes is not processes:
+                    changed.append((job_post_id, new_tools, new_processes))
+
+            if changed:
+                changes = values(
+                    column("id", JobPost.id.type),
+                    column("tools", ToolType()),
+                    column("processes", ProcessType()),
+                    name="changes",
+                ).data(changed)
+                await self.repository.session.execute(
+                    update(JobPost)
+                    .where(JobPost.id == changes.c.id)
+                    .values(tools=changes.c.tools, processes=changes.c.processes)
+                    .execution_options(synchronize_session=False),
+                )
+            await self.repository.session.commit()
+
+            last_id = rows[-1][0]
+            progress.meta["cursor"] = str(last_id)
+            progress.incr("job_posts_scanned", len(rows))
+            progress.incr("job_posts_updated", len(changed))
+            total = progress.counters["job_posts_total"]
+            await progress.save(progress=progress.counters["job_posts_scanned"] / total if total else None)
+            await logger.ainfo("Renormalized job post names", cursor=str(last_id), **progress.counters)
+        return progress.counters.get("job_posts_updated", 0)
+
+    @staticmethod
+    async def _resolve_names(kind: ToolKind, items: list[list[Tool] | list[Process] | None]) -> dict[str, str]:
+        """Resolve all the names of a batch in one go."""
+        names = list(dict.fromkeys(item.name for batch in items for item in batch or []))
+        return dict(zip(names, await tool_taxonomy.resolve_many(kind, names), strict=True))
+
+
+def _renamed(items: list[Any] | None, names: dict[str, str]) -> list[Any] | None:
+    """Rename items, the same list is returned when no name changed."""
+    if not items or all(names.get(item.name, item.name) == item.name for item in items):
+        return items
+    return [msgspec.structs.replace(item, name=names.get(item.name, item.name)) for item in items]
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from structlog import get_logger
+
+from app.config.app import alchemy
+from app.lib.tasks import TaskProgress
+
+from .services import JobPostService
+
+if TYPE_CHECKING:
+    from saq.types import Context
+
+__all__ = ["renormalize_job_posts"]
+
+
+logger = get_logger()
+
+
+async def renormalize_job_posts(ctx: Context, *, batch_size: int = 1000) -> int:
+    """Resolve the tool and process names of all job posts against the current tool taxonomy.
+
+    A retry continues after the last batch that was done.
+    """
+    progress = TaskProgress(ctx.get("job"))
+    await logger.ainfo("Renormalizing job post names", batch_size=batch_size, cursor=progress.meta.get("cursor"))
+    async with JobPostService.new(config=alchemy) as service:
+        updated = await service.renormalize_names(batch_size, progress=progress)
+    await logger.ainfo("Job post names renormalized", **progress.counters)
+    return updated
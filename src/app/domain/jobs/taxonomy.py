@@ -0,0 +1,212 @@
+"""The tool and process taxonomy, which the names extracted from job posts are resolved against."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+import structlog
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config.app import alchemy
+from app.config.base import get_settings
+from app.db.models import Tool, ToolAlias
+from app.lib.normalizer import NameNormalizer
+from app.lib.schema import ToolKind
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = ("ToolTaxonomy", "tool_taxonomy")
+
+logger = structlog.get_logger()
+ALIAS_MAX_LENGTH = 255
+
+
+class ToolTaxonomy:
+    """In-process index of the ``tool`` and ``tool_alias`` tables.
+
+    Names are resolved by an exact alias lookup first. Only on a miss they are fuzzy matched against the tool names,
+    and the aliases resolved that way are written back, so that the next lookup of the same spelling is a hit.
+
+    The index is loaded on startup and kept up to date through Redis pub/sub: new aliases are broadcast to the other
+    processes and any other change of the tables triggers a reload, see ``publish_reload``. Processes not listening
+    (e.g. task workers) reload it once it is older than ``max_age`` seconds.
+    """
+
+    def __init__(self, max_age: float = 300) -> None:
+        self.max_age = max_age
+        self.loaded_at: float | None = None
+        self._aliases: dict[ToolKind, dict[str, tuple[UUID, str]]] = {kind: {} for kind in ToolKind}
+        self._tool_ids: dict[ToolKind, dict[str, UUID]] = {kind: {} for kind in ToolKind}
+        self._normalizers = {kind: NameNormalizer() for kind in ToolKind}
+        self._lock = asyncio.Lock()
+        self._listener: asyncio.Task[None] | None = None
+
+    @property
+    def channel(self) -> str:
+        """The Redis channel changes of the taxonomy are published on."""
+        return f"{get_settings().app.slug}:tool-taxonomy"
+
+    async def load(self) -> None:
+        """Read the taxonomy from the database, the current index is kept when it cannot be read."""
+        try:
+            async with alchemy.get_session() as db_session:
+                tools = (await db_session.execute(select(Tool.kind, Tool.id, Tool.name))).tuples().all()
+                alias_statement = select(ToolAlias.kind, ToolAlias.alias, ToolAlias.tool_id)
+                alias_rows = (await db_session.execute(alias_statement)).tuples().all()
+        except SQLAlchemyError as e:
+            await logger.awarn("Failed to load the tool taxonomy", exc_info=e)
+            return
+
+        tool_ids: dict[ToolKind, dict[str, UUID]] = {kind: {} for kind in ToolKind}
+        names: dict[UUID, str] = {}
+        for kind, tool_id, name in tools:
+            tool_ids[kind][name] = tool_id
+            names[tool_id] = name
+        index: dict[ToolKind, dict[str, tuple[UUID, str]]] = {kind: {} for kind in ToolKind}
+        for kind, alias, tool_id in alias_rows:
+            if tool_id in names:
+                index[kind][alias] = (tool_id, names[tool_id])
+        for kind, kind_tool_ids in tool_ids.items():
+            for name, tool_id in kind_tool_ids.items():
+                index[kind].setdefault(name.lower(), (tool_id, name))
+            self._normalizers[kind].set_vocabulary(kind_tool_ids)
+        self._tool_ids, self._aliases = tool_ids, index
+        self.loaded_at = time.monotonic()
+        await logger.ainfo(
+            "Loaded the tool taxonomy",
+            tools=len(tool_ids[ToolKind.TOOL]),
+            processes=len(tool_ids[ToolKind.PROCESS]),
+            aliases=sum(len(aliases) for aliases in index.values()),
+        )
+
+    async def ensure_loaded(self) -> None:
+        """Load the taxonomy when it was not yet, or when it may be stale because no listener keeps it up to date."""
+        listening = self._listener is not None and not self._listener.done()
+        if self.loaded_at is not None and (listening or time.monotonic() - self.loaded_at < self.max_age):
+            return
+        async with self._lock:
+            if self.loaded_at is None or (not listening and time.monotonic() - self.loaded_at >= self.max_age):
+                await self.load()
+
+    async def resolve_many(self, kind: ToolKind, names: Sequence[str]) -> list[str]:
+        """Resolve names to the canonical names of the taxonomy, names that match none are left as they are."""
+        await self.ensure_loaded()
+        aliases = self._aliases[kind]
+        names = [name.strip() for name in names]
+        misses = {name.lower(): name for name in names if name.lower() not in aliases}
+        if misses:
+            resolved = self._normalizers[kind].normalize_many(list(misses.values()))
+            tool_ids = self._tool_ids[kind]
+            new_aliases = {
+                alias: (tool_ids[name], name)
+                for alias, name in zip(misses, resolved, strict=True)
+                if name in tool_ids and len(alias) <= ALIAS_MAX_LENGTH
+            }
+            if new_aliases:
+                aliases.update(new_aliases)
+                await self._write_back(kind, new_aliases)
+        return [aliases[name.lower()][1] if name.lower() in aliases else name for name in names]
+
+    async def normalize_items(self, kind: ToolKind, items: list[dict[str, str]]) -> list[dict[str, str]]:
+        """Resolve the ``name`` of each item in place, e.g. the tools of a job post."""
+        named = [item for item in items if "name" in item]
+        for item, name in zip(named, await self.resolve_many(kind, [item["name"] for item in named]), strict=True):
+            item["name"] = name
+        return items
+
+    async def add_tool(self, kind: ToolKind, name: str, aliases: Sequence[str] = ()) -> None:
+        """Add a tool, or aliases of an existing one, and have all processes reload the taxonomy."""
+        async with alchemy.get_session() as db_session:
+            await db_session.execute(pg_insert(Tool).values(kind=kind, name=name).on_conflict_do_nothing())
+            tool_statement = select(Tool.id).where(Tool.kind == kind, Tool.name == name)
+            tool_id = (await db_session.execute(tool_statement)).scalar_one()
+            for alias in {name.lower(), *(alias.strip().lower() for alias in aliases)}:
+                await db_session.execute(
+                    pg_insert(ToolAlias)
+                    .values(kind=kind, alias=alias, tool_id=tool_id)
+                    .on_conflict_do_update(
+                        index_elements=[ToolAlias.kind, ToolAlias.alias],
+                        set_={"tool_id": tool_id},
+                    ),
+                )
+            await db_session.commit()
+        await self.load()
+        await self.publish_reload()
+
+    async def publish_reload(self) -> None:
+        """Have every process reload the taxonomy, e.g. after the tables were edited."""
+        await self._publish({"reload": True})
+
+    async def start(self, *_: Any) -> None:
+        """Listen to changes of the taxonomy, loading it once subscribed, used as a Litestar ``on_startup`` hook."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self, *_: Any) -> None:
+        """Stop listening to changes, used as a Litestar ``on_shutdown`` hook."""
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+    async def _write_back(self, kind: ToolKind, new_aliases: dict[str, tuple[UUID, str]]) -> None:
+        try:
+            async with alchemy.get_session() as db_session:
+                rows = [
+                    {"kind": kind, "alias": alias, "tool_id": tool_id} for alias, (tool_id, _) in new_aliases.items()
+                ]
+                await db_session.execute(pg_insert(ToolAlias).values(rows).on_conflict_do_nothing())
+                await db_session.commit()
+        except SQLAlchemyError as e:
+            await logger.awarn("Failed to save tool aliases", kind=kind.value, aliases=list(new_aliases), exc_info=e)
+            return
+        await self._publish(
+            {
+                "kind": kind.value,
+                "aliases": {alias: [str(tool_id), name] for alias, (tool_id, name) in new_aliases.items()},
+            },
+        )
+
+    async def _publish(self, message: dict[str, Any]) -> None:
+        try:
+            await get_settings().redis.get_client().publish(self.channel, json.dumps(message))
+        except RedisError as e:
+            await logger.awarn("Failed to publish tool taxonomy change", exc_info=e)
+
+    async def _apply(self, message: dict[str, Any]) -> None:
+        if "aliases" in message:
+            aliases = self._aliases[ToolKind(message["kind"])]
+            for alias, (tool_id, name) in message["aliases"].items():
+                aliases[alias] = (UUID(tool_id), name)
+        else:
+            await self.load()
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = get_settings().redis.get_client().pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Changes made while not subscribed are missed
+                await self.load()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        await self._apply(json.loads(message["data"]))
+            except (RedisError, OSError) as e:
+                await logger.awarn("Lost the tool taxonomy subscription", exc_info=e)
+                await asyncio.sleep(5)
+            finally:
+                with suppress(RedisError, OSError):
+                    await pubsub.aclose()
+
+
+tool_taxonomy = ToolTaxonomy()
@@ -1,109 +1,29 @@
+import hashlib
 import json
 import os
 from typing import Any
 
 import structlog
 from openai import AsyncOpenAI
-from rapidfuzz import fuzz, process
+from redis.exceptions import RedisError
+
+from app.config.base import get_settings
+from app.domain.jobs.taxonomy import tool_taxonomy
+from app.lib.html import preprocess_html
+from app.lib.job_boards import JobBoardPosting, get_job_board_posting
+from app.lib.limits import provider_limit
+from app.lib.schema import ToolKind
+from app.lib.scraperapi import extract_url_content
+from app.lib.stores import provider_store
+from app.lib.utils import get_domain
 
 logger = structlog.get_logger()
 
-canonical_tech_names = [
-    "Python",
-    "Kubernetes",
-    "JavaScript",
-    "Node.js",
-    "React",
-    "Flask",
-    "GitHub",
-    "GitHub Actions",
-    "Jenkins",
-    "CircleCI",
-    "GitLab",
-    "GitLab CI",
-    "Buildkite",
-    "Docker",
-    "GitOps",
-    "Argo CD",
-    "Cypress",
-    "Playwright",
-    "Rust",
-    "Go",
-    "Python",
-    "TensorFlow",
-    "PyTorch",
-    "LlamaIndex",
-    "LangCHain",
-    "LLM",
-    "RAG",
-    "HuggingFace",
-    "OpenAI",
-    "API",
-    "SDK",
-    "REST API",
-    "GraphQL",
-    "OpenAPI",
-    "Markdown",
-    "Authorization",
-    "Access Management",
-    "Django",
-    "Spring Boot",
-    "Flask",
-    "Express",
-    "Ruby on Rails",
-    "SailPoint",
-    "Okta",
-    "Auth0",
-    "AWS",
-    "Grafana",
-    "Prometheuse",
-    "Sentry",
-    "Word2Vec",
-    "GloVe",
-    "BERT",
-    "ELMo",
-    "fastText",
-    "Llama",
-    "T5",
-    "Stable Diffusion",
-    "ComfyUI",
-    "ONNX",
-    "OpenVINO",
-    "WebSocket",
-    "gRPC",
-    "PostgreSQL",
-    "Rasa",
-    "Dialogflow",
-    "Amazon Lex",
-    "Cognigy",
-    "Kore.ai",
-    "ManyChat",
-    "Microsoft Bot Framework",
-    "Yellow.ai",
-]
-
-tool_name_special_cases = {
-    "k8s": "Kubernetes",
-    "js": "Javascript",
-    "ts": "Typescript",
-    "node": "Node.js",
-    "golang": "Go",
-    "postgres": "PostgreSQL",
-    "lex": "Amazon Lex",
-    "cognigy.ai": "Cognigy.ai",
-}
-
-
-canonical_process_names = ["Code Review", "Testing", "Documentation", "CI/CD"]
-process_name_special_cases = {
-    "ci/cd pipelines": "CI/CD",
-}
-
 model = os.environ["OPENAI_MODEL_NAME"]
 client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
 prompt = """
-    Only extract the following information directly from the given job post(which is in the form of HTML/JS code)
-    without adding any outside knowledge or assumptions:
+    Only extract the following information directly from the given job post(which is given as its text, structured
+    JobPosting data and links) without adding any outside knowledge or assumptions:
     - Company Name
     - Hiring Team Name
     - Company URL
@@ -139,58 +59,157 @@ prompt = """
 
     Note: Do NOT include anything that's not part of the post and use null if you're unable to extract any information.
 
-    Here is the code:
+    Here is the job post:
     {html_content}
 """
 
+job_details_cache_stats = {"hits": 0, "misses": 0}
+"""Extraction cache lookups of this process, see ``get_job_details_cache_stats`` for the ones of all processes."""
 
-def normalise_names(
-    items: list[dict[str, str]],
-    canonical_names: list[str],
-    special_cases: dict[str, str],
-) -> list[dict[str, str]]:
-    def normalise_name(name: str) -> str:
-        # Check case-insensitive special cases
-        lower_name = name.lower()
-        if lower_name in special_cases:
-            return special_cases[lower_name]
-
-        # Fuzzy matching for general cases
-        result: tuple[str, float, int] | None = process.extractOne(
-            name,
-            canonical_names,
-            scorer=fuzz.token_set_ratio,
-            processor=str.lower,
-        )
-        if result:
-            match, score, _ = result
-            return match if score > 90 else name
 
-        return name
+def job_details_cache_key(content: str) -> str:
+    """Key of the extraction of a job post, derived from its content, the model and the prompt.
+
+    Whitespace is collapsed, so that copies of a post that only differ in their formatting share their extraction.
+    """
+    digest = hashlib.sha256()
+    prompt_version = get_settings().job.DETAILS_PROMPT_VERSION
+    for part in (model, prompt_version, prompt, " ".join(content.split())):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return f"extraction:{digest.hexdigest()}"
+
+
+def _stats_key() -> str:
+    return f"{provider_store('job-details').namespace}:stats"
+
+
+async def _get_cached_job_details(key: str) -> dict[str, Any] | None:
+    try:
+        cached = await provider_store("job-details").get(key)
+    except RedisError as e:
+        await logger.awarn("Failed to read job details cache", key=key, exc_info=e)
+        cached = None
+    outcome = "hits" if cached is not None else "misses"
+    job_details_cache_stats[outcome] += 1
+    try:
+        await get_settings().redis.get_client().hincrby(_stats_key(), outcome, 1)
+    except RedisError as e:
+        await logger.awarn("Failed to count job details cache lookup", exc_info=e)
+    return json.loads(cached) if cached is not None else None
+
+
+async def _set_cached_job_details(key: str, job_details: dict[str, Any]) -> None:
+    ttl = get_settings().job.DETAILS_CACHE_TTL
+    try:
+        await provider_store("job-details").set(key, json.dumps(job_details), expires_in=ttl)
+    except RedisError as e:
+        await logger.awarn("Failed to write job details cache", key=key, exc_info=e)
+
+
+async def get_job_details_cache_stats() -> dict[str, int]:
+    """Get the extraction cache hits and misses of all processes since the cache was last cleared."""
+    stats = await get_settings().redis.get_client().hgetall(_stats_key())
+    return {"hits": 0, "misses": 0} | {key.decode(): int(value) for key, value in stats.items()}
+
+
+async def clear_job_details_cache() -> None:
+    """Drop all cached extractions and their stats."""
+    await provider_store("job-details").delete_all()
+
+
+async def extract_job_details_from_html(html_content: str, *, refresh: bool = False) -> dict[str, Any]:
+    """Extracts job post from the html using an LLM.
+
+    The page is reduced to its text, structured data and links first, see ``preprocess_html``. Extractions are cached
+    by content, see ``job_details_cache_key``. With ``refresh`` the cache is bypassed and overwritten. Tool and process
+    names are resolved against the tool taxonomy after the lookup, so that they follow its current state.
+    """
+    content = preprocess_html(html_content)
+    key = job_details_cache_key(content)
+    cached = await _get_cached_job_details(key) if not refresh else None
+    if cached is not None:
+        job_details = cached
+    else:
+        job_details = await _extract_job_details(content)
+        # Failed extractions are not cached, so that they are tried again
+        if job_details.get("title") and job_details.get("company"):
+            await _set_cached_job_details(key, job_details)
+
+    # Normalise tools
+    try:
+        job_details["tools"] = await tool_taxonomy.normalize_items(ToolKind.TOOL, job_details["tools"])
+    except (ValueError, TypeError, KeyError) as e:
+        await logger.awarn("Failed to normalise tool stack", job_details=job_details, exc_info=e)
+
+    try:
+        job_details["processes"] = await tool_taxonomy.normalize_items(ToolKind.PROCESS, job_details["processes"])
+    except (ValueError, TypeError, KeyError) as e:
+        await logger.awarn("Failed to normalise processes", job_details=job_details, exc_info=e)
 
-    # Normalize each item's name in the tech stack
-    for item in items:
-        if "name" in item:
-            item["name"] = normalise_name(item["name"].strip())
-    return items
+    return job_details
+
+
+async def extract_job_details_from_posting(posting: JobBoardPosting) -> dict[str, Any]:
+    """Extracts job post details from the structured fields of a job board post.
+
+    Only what has no structured field (e.g. tools, processes or a missing company url) is extracted by the LLM, from
+    the body of the post.
+    """
+    job_details = await extract_job_details_from_html(posting.to_html())
+    company = job_details.get("company") or {}
+    job_details["company"] = {
+        "name": posting.company_name or company.get("name"),
+        "url": posting.company_url or company.get("url"),
+        "linkedin_url": posting.company_linkedin_url or company.get("linkedin_url"),
+    }
+    job_details["title"] = posting.title
+    if posting.location:
+        job_details["location"] = {
+            "country": posting.location.country,
+            "region": posting.location.region,
+            "city": posting.location.city,
+        }
+    if posting.team_name:
+        job_details["team_name"] = posting.team_name
+    return job_details
 
 
-async def extract_job_details_from_html(html_content: str) -> dict[str, Any]:
-    """Extracts job post from the html using an LLM."""
+async def extract_job_post(url: str, timeout: float = 60.0) -> tuple[str, dict[str, Any]]:
+    """Extracts a job post from its URL.
+
+    Posts on supported job boards are read from the API of the job board, which is faster and cheaper than scraping
+    them. Only when the company cannot be told from it the page of the post is scraped instead.
+
+    Returns:
+        The HTML content of the post and its details.
+    """
+    posting = await get_job_board_posting(url)
+    if posting is not None and (posting.company_url or posting.company_linkedin_url):
+        return posting.to_html(), await extract_job_details_from_posting(posting)
+
+    # Some urls require rendering javascript (done using a headless browser)
+    render = get_domain(url).endswith(("workable.com", "linkedin.com"))
+    html_content = await extract_url_content(url, render=render, timeout=timeout)
+    return html_content, await extract_job_details_from_html(html_content)
+
+
+async def _extract_job_details(content: str) -> dict[str, Any]:
     messages = [
         {
             "role": "user",
-            "content": prompt.format(html_content=html_content),
+            "content": prompt.format(html_content=content),
         },
     ]
-    chat_response = await client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=0,
-        response_format={
-            "type": "json_object",
-        },
-    )
+    async with provider_limit("openai"):
+        chat_response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0,
+            response_format={
+                "type": "json_object",
+            },
+        )
 
     job_details: dict[str, Any] = {}
     try:
@@ -207,20 +226,4 @@ async def extract_job_details_from_html(html_content: str) -> dict[str, Any]:
         or "linkedin_url" not in job_details["company"]
     ):
         await logger.awarn("Failed to extract necessary information from job post", job_details=job_details)
-
-    # Normalise tools
-    try:
-        job_details["tools"] = normalise_names(job_details["tools"], canonical_tech_names, tool_name_special_cases)
-    except (ValueError, TypeError, KeyError) as e:
-        await logger.awarn("Failed to normalise tool stack", job_details=job_details, exc_info=e)
-
-    try:
-        job_details["processes"] = normalise_names(
-            job_details["processes"],
-            canonical_process_names,
-            process_name_special_cases,
-        )
-    except (ValueError, TypeError, KeyError) as e:
-        await logger.awarn("Failed to normalise processes", job_details=job_details, exc_info=e)
-
     return job_details
@@ -7,23 +7,28 @@ from typing import TYPE_CHECKING, Annotated
 import structlog
 from litestar import Controller, delete, get, patch, post
 from litestar.di import Provide
-from litestar.exceptions import ValidationException
+from litestar.exceptions import NotFoundException, ValidationException
+from saq import Job
+from saq.job import Status
 
+from app.config.base import get_settings
 from app.db.models import User as UserModel
 from app.domain.accounts.dependencies import provide_users_service
 from app.domain.accounts.guards import requires_active_user, requires_superuser
 from app.domain.accounts.services import UserService  # noqa: TCH001
+from app.domain.companies.dependencies import provide_app_details_cache
+from app.domain.companies.utils import set_app_details
 from app.domain.opportunities import urls
 from app.domain.opportunities.dependencies import provide_opportunities_audit_log_service, provide_opportunities_service
 from app.domain.opportunities.schemas import (
     Opportunity,
     OpportunityCreate,
     OpportunityScanFor,
+    OpportunityScanJob,
     OpportunityUpdate,
 )
 from app.domain.opportunities.services import OpportunityAuditLogService, OpportunityService
-from app.lib.app_store import get_android_app_details, get_ios_app_details
-from app.lib.schema import AppDetails
+from app.lib.app_store import AppDetailsCache
 from app.lib.utils import get_logo_dev_link
 
 if TYPE_CHECKING:
@@ -31,11 +36,25 @@ if TYPE_CHECKING:
 
     from advanced_alchemy.service.pagination import OffsetPagination
     from litestar.params import Dependency, Parameter
+    from litestar_saq import TaskQueues
 
     from app.lib.dependencies import FilterTypes
 
 
 logger = structlog.get_logger()
+SCAN_JOB_TTL = 60 * 60 * 24
+"""Seconds to keep a finished scan job around for polling."""
+
+
+def _to_scan_job(job: Job) -> OpportunityScanJob:
+    return OpportunityScanJob(
+        job_key=job.key,
+        status=job.status.value,
+        progress=job.progress,
+        counters=job.meta.get("counters"),
+        result=job.result,
+        error=job.error,
+    )
 
 
 class OpportunityController(Controller):
@@ -46,11 +65,13 @@ class OpportunityController(Controller):
         "opportunities_service": Provide(provide_opportunities_service),
         "opportunities_audit_log_service": Provide(provide_opportunities_audit_log_service),
         "users_service": Provide(provide_users_service),
+        "app_details_cache": Provide(provide_app_details_cache, sync_to_thread=False),
     }
     guards = [requires_active_user]
     signature_namespace = {
         "OpportunityService": OpportunityService,
         "UserModel": UserModel,
+        "AppDetailsCache": AppDetailsCache,
     }
     dto = None
     return_dto = None
@@ -143,12 +164,59 @@ class OpportunityController(Controller):
     )
     async def scan_for_opportunities(
         self,
-        opportunities_service: OpportunityService,
+        task_queues: TaskQueues,
         data: OpportunityScanFor,
-    ) -> int:
-        """Create a new opportunity."""
-        # TODO: Run as a backgound job
-        return await opportunities_service.scan(data.tenant_ids, data.last_n_days)
+    ) -> OpportunityScanJob:
+        """Queue a background scan for new opportunities."""
+        queue = task_queues.get("background-tasks")
+        settings = get_settings()
+        meta = {}
+        if data.resume_job_key:
+            # Carry over the checkpoint of a scan that was aborted or failed
+            previous_job = await queue.job(data.resume_job_key)
+            if not previous_job:
+                error_msg = "Scan job does not exist"
+                raise NotFoundException(error_msg)
+            if previous_job.status not in {Status.ABORTED, Status.FAILED}:
+                error_msg = "Only aborted or failed scans can be resumed"
+                raise ValidationException(error_msg)
+            meta = previous_job.meta
+
+        job = await queue.enqueue(
+            Job(
+                function="scan_opportunities",
+                kwargs={"tenant_ids": data.tenant_ids, "last_n_days": data.last_n_days},
+                timeout=0,
+                heartbeat=settings.saq.JOB_HEARTBEAT,
+                retries=settings.saq.JOB_RETRIES,
+                ttl=SCAN_JOB_TTL,
+                meta=meta,
+            ),
+        )
+        if not job:
+            error_msg = "Failed to queue the scan"
+            raise ValidationException(error_msg)
+        await logger.ainfo("Queued opportunity scan", job_key=job.key, resume_job_key=data.resume_job_key)
+        return _to_scan_job(job)
+
+    @get(
+        operation_id="GetScanForOpportunity",
+        name="opportunities:get-scan-for",
+        guards=[requires_superuser],
+        summary="Retrieve the progress of a scan for new opportunities.",
+        path=urls.OPPORTUNITY_SCAN_FOR_DETAIL,
+    )
+    async def get_scan_for_opportunities(
+        self,
+        task_queues: TaskQueues,
+        job_key: Annotated[str, Parameter(title="Job Key", description="The scan job to retrieve.")],
+    ) -> OpportunityScanJob:
+        """Get the status and progress counters of a scan."""
+        job = await task_queues.get("background-tasks").job(job_key)
+        if not job:
+            error_msg = "Scan job does not exist"
+            raise NotFoundException(error_msg)
+        return _to_scan_job(job)
 
     @get(
         operation_id="GetOpportunity",
@@ -159,6 +227,7 @@ class OpportunityController(Controller):
     async def get_opportunity(
         self,
         opportunities_service: OpportunityService,
+        app_details_cache: AppDetailsCache,
         current_user: UserModel,
         opportunity_id: Annotated[
             UUID,
@@ -176,14 +245,8 @@ class OpportunityController(Controller):
         if opportunity.company and opportunity.company.url:
             opportunity.company.profile_pic_url = get_logo_dev_link(opportunity.company.url)
 
-        if opportunity.company.ios_app_url:
-            ios_app_details = await get_ios_app_details(opportunity.company.ios_app_url)
-            opportunity.company.ios_app_details = AppDetails(**ios_app_details)
-
-        if opportunity.company.android_app_url:
-            android_app_details = await get_android_app_details(opportunity.company.android_app_url)
-            opportunity.company.android_app_details = AppDetails(**android_app_details)
-
+        if opportunity.company:
+            await set_app_details([opportunity.company], app_details_cache)
         return opportunity
 
     @patch(
@@ -0,0 +1,164 @@
+"""Matching of job posts against ICP criteria."""
+
+from __future__ import annotations
+
+import hashlib
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+import msgspec
+from sqlalchemy import and_, false, func, or_, true
+
+from app.db.models import Company
+from app.domain.jobs.repositories import job_post_processes_filter, job_post_tools_filter
+from app.lib.schema import FundingRound
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from uuid import UUID
+
+    from sqlalchemy import ColumnElement
+
+    from app.db.models import ICP, JobPost
+    from app.lib.schema import CompanyCriteria
+
+__all__ = ("ICPMatcher", "company_criteria_filters", "company_criteria_matches", "icp_criteria_hash")
+
+
+def company_criteria_filters(criteria: CompanyCriteria | None) -> list[ColumnElement[bool]]:
+    """Compile the company criteria of an ICP into predicates on the ``company`` table.
+
+    Companies with a missing headcount or engineering org size are left out when the criteria sets bounds on them,
+    while companies with missing or unknown funding data are kept. Countries are not filtered on.
+    """
+    filters: list[ColumnElement[bool]] = []
+    if not criteria:
+        return filters
+
+    if criteria.headcount_min:
+        filters.append(Company.headcount >= criteria.headcount_min)
+    if criteria.headcount_max:
+        filters.append(Company.headcount.between(1, criteria.headcount_max))
+
+    if criteria.org_size:
+        engineering = Company.org_size["engineering"].as_integer()
+        if criteria.org_size.engineering_min:
+            filters.append(engineering >= criteria.org_size.engineering_min)
+        if criteria.org_size.engineering_max:
+            filters.append(engineering.between(1, criteria.org_size.engineering_max))
+
+    if criteria.funding:
+        round_name = func.coalesce(
+            Company.last_funding["roundName"].as_string(),
+            FundingRound.SERIES_UNKNOWN.value,
+        )
+        excluded_rounds = [
+            funding_round.value
+            for funding_round in FundingRound
+            if funding_round not in criteria.funding and funding_round != FundingRound.SERIES_UNKNOWN
+        ]
+        filters.append(round_name.not_in(excluded_rounds))
+
+    return filters
+
+
+def company_criteria_matches(criteria: CompanyCriteria | None, company: Company) -> bool:  # noqa: PLR0911
+    """Check a company against the company criteria of an ICP.
+
+    Mirrors :func:`company_criteria_filters` for companies that are already loaded.
+    """
+    if not criteria:
+        return True
+
+    if criteria.headcount_min and (not company.headcount or company.headcount < criteria.headcount_min):
+        return False
+    if criteria.headcount_max and (not company.headcount or company.headcount > criteria.headcount_max):
+        return False
+
+    if criteria.org_size:
+        engineering = company.org_size.engineering if company.org_size else None
+        if criteria.org_size.engineering_min and (not engineering or engineering < criteria.org_size.engineering_min):
+            return False
+        if criteria.org_size.engineering_max and (not engineering or engineering > criteria.org_size.engineering_max):
+            return False
+
+    if criteria.funding:
+        round_name = company.last_funding.round_name if company.last_funding else FundingRound.SERIES_UNKNOWN
+        if round_name != FundingRound.SERIES_UNKNOWN and round_name not in criteria.funding:
+            return False
+
+    return True
+
+
+def icp_criteria_hash(icp: ICP) -> str:
+    """Hash the criteria deciding which job posts of an ICP turn into opportunities."""
+    criteria = msgspec.json.encode([icp.company, icp.tool, icp.process, icp.person])
+    return hashlib.sha256(criteria).hexdigest()
+
+
+class ICPMatcher:
+    """Route job posts to every ICP they satisfy.
+
+    ICPs are indexed by the tool and process names they include, so that matching a job post costs a lookup per
+    tool and process of the post rather than a check per ICP.
+    """
+
+    def __init__(self, icps: Iterable[ICP]) -> None:
+        self.icps: list[ICP] = []
+        self._by_tool: dict[str, list[ICP]] = defaultdict(list)
+        self._by_process: dict[str, list[ICP]] = defaultdict(list)
+        for icp in icps:
+            tools_include = icp.tool.include if icp.tool else None
+            processes_include = icp.process.include if icp.process else None
+            if not tools_include and not processes_include:
+                continue
+            self.icps.append(icp)
+            for name in tools_include or []:
+                self._by_tool[name].append(icp)
+            for name in processes_include or []:
+                self._by_process[name].append(icp)
+
+    def job_post_filter(self) -> ColumnElement[bool]:
+        """Build a predicate selecting the job posts that may match at least one ICP.
+
+        The predicate is a superset of the matches, :meth:`match` has the final say.
+        """
+        if not self.icps:
+            return false()
+
+        name_conditions = []
+        if self._by_tool:
+            name_conditions.append(job_post_tools_filter(self._by_tool))
+        if self._by_process:
+            name_conditions.append(job_post_processes_filter(self._by_process))
+
+        # ICPs sharing the same company criteria share a predicate
+        company_conditions: dict[bytes, ColumnElement[bool]] = {}
+        for icp in self.icps:
+            filters = company_criteria_filters(icp.company)
+            if not filters:
+                company_conditions.clear()
+                break
+            company_conditions.setdefault(msgspec.json.encode(icp.company), and_(*filters))
+        company_condition = or_(*company_conditions.values()) if company_conditions else true()
+
+        return and_(or_(*name_conditions), company_condition)
+
+    def match(self, job_post: JobPost) -> list[ICP]:
+        """Find the ICPs a job post satisfies."""
+        tool_names = {tool.name for tool in job_post.tools or []}
+        process_names = {process.name for process in job_post.processes or []}
+
+        candidates: dict[UUID, ICP] = {}
+        for name in tool_names:
+            candidates.update((icp.id, icp) for icp in self._by_tool.get(name, []))
+        for name in process_names:
+            candidates.update((icp.id, icp) for icp in self._by_process.get(name, []))
+
+        return [
+            icp
+            for icp in candidates.values()
+            # A job post is excluded only if it has every excluded tool
+            if not (icp.tool and icp.tool.exclude and tool_names.issuperset(icp.tool.exclude))
+            and (job_post.company is None or company_criteria_matches(icp.company, job_post.company))
+        ]
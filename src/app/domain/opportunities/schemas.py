@@ -67,6 +67,18 @@ class OpportunityScanFor(CamelizedBaseStruct):
 
     tenant_ids: list[str] | None = None
     last_n_days: int = 7
+    resume_job_key: str | None = None
+
+
+class OpportunityScanJob(CamelizedBaseStruct):
+    """An opportunity scan background job."""
+
+    job_key: str
+    status: str
+    progress: float = 0.0
+    counters: dict[str, int] | None = None
+    result: int | None = None
+    error: str | None = None
 
 
 class OpportunityUpdate(CamelizedBaseStruct):
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import difflib
+import enum
+from collections import defaultdict
 from contextlib import suppress
 from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING, Any
@@ -10,7 +13,9 @@ from advanced_alchemy.exceptions import ErrorMessages  # noqa: TCH002
 from advanced_alchemy.repository._util import LoadSpec
 from advanced_alchemy.service import SQLAlchemyAsyncRepositoryService, is_dict, is_msgspec_model, is_pydantic_model
 from advanced_alchemy.utils.dataclass import Empty, EmptyType
-from sqlalchemy import and_, insert, not_, or_, select, text
+from openai import OpenAIError
+from sqlalchemy import delete, func, insert, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import (
     DataError,
     IntegrityError,
@@ -19,25 +24,38 @@ from sqlalchemy.exc import (
     PendingRollbackError,
     StatementError,
 )
-from sqlalchemy.orm import InstrumentedAttribute, selectinload, undefer
+from sqlalchemy.orm import InstrumentedAttribute, contains_eager, undefer
 
+from app.config.app import alchemy
+from app.config.base import get_settings
 from app.db.models import (
     ICP,
     JobPost,
     Opportunity,
     OpportunityAuditLog,
     Person,
+    icp_rejected_job_post_relation,
     opportunity_job_post_relation,
     opportunity_person_relation,
 )
 from app.domain.people.schemas import PersonCreate
 from app.domain.people.services import PersonService
 from app.lib.pdl import search_person_details
-from app.lib.schema import FundingRound, Location, OpportunityStage, WorkExperience
+from app.lib.schema import Location, OpportunityStage, WorkExperience
+from app.lib.tasks import TaskProgress
 from app.lib.utils import get_domain, get_domain_from_email
 
+from .matching import ICPMatcher, icp_criteria_hash
 from .repositories import ICPRepository, OpportunityAuditLogRepository, OpportunityRepository
-from .utils import extract_context_from_job_post
+from .utils import (
+    PendingContexts,
+    context_cache_key,
+    context_request,
+    extract_context_from_job_post,
+    get_cached_context,
+    get_job_post_context,
+    set_cached_context,
+)
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
@@ -46,11 +64,22 @@ if TYPE_CHECKING:
     from advanced_alchemy.filters import FilterTypes
     from advanced_alchemy.repository._util import LoadSpec
     from advanced_alchemy.service import ModelDictT
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 __all__ = ("OpportunityService", "OpportunityAuditLogService", "ICPService")
 logger = structlog.get_logger()
 
 
+class ScanOutcome(enum.Enum):
+    """What became of a job post matching an ICP."""
+
+    CREATED = "created"
+    REJECTED = "rejected"
+    """The job post does not qualify, e.g. no relevant people were found, it is not tried again."""
+    FAILED = "failed"
+    """A data provider could not be reached, the job post is tried again by the next scan."""
+
+
 class OpportunityAuditLogService(SQLAlchemyAsyncRepositoryService[OpportunityAuditLog]):
     """OpportunityAuditLog Service."""
 
@@ -174,356 +203,332 @@ class OpportunityService(SQLAlchemyAsyncRepositoryService[Opportunity]):
 
         return data
 
-    async def scan(  # noqa: C901, PLR0912, PLR0915
+    async def scan(
         self,
         tenant_ids: list[str] | None = None,
         last_n_days: int = 7,
         auto_commit: bool | None = None,
         auto_expunge: bool | None = None,
         auto_refresh: bool | None = None,
+        *,
+        concurrency: int | None = None,
+        progress: TaskProgress | None = None,
+        pending_contexts: PendingContexts | None = None,
     ) -> int:
-        """Generate opportunity from criteria."""
+        """Generate opportunity from criteria.
+
+        The job posts of the last ``last_n_days`` are read once, in chunks, and each one is routed to every ICP it
+        satisfies. Matches of different companies are processed concurrently, up to ``concurrency`` at a time, each
+        with a database session of its own. Calls to data providers are additionally capped per provider.
+
+        Each ICP keeps a cursor on the last job post scanned for it, so that a scan only looks at the job posts created
+        since the previous one. Job posts that matched an ICP without becoming an opportunity are recorded and not
+        tried again. Both are reset when the ICP criteria change. The cursor of an ICP stays before a job post that
+        failed on a data provider, so that the next scan tries it again.
+
+        When a ``progress`` tracker is given, counters are updated as the scan moves along and a checkpoint is
+        saved after every match, so that a retried scan skips the work that was already done.
+
+        Contexts are cached per job post and pitch. When ``pending_contexts`` is given, opportunities whose context is
+        not cached yet are created without one and the requests extracting it are added to it, to be sent in a batch
+        once the scan is done.
+        """
+        if progress is None:
+            progress = TaskProgress()
+        settings = get_settings()
+        semaphore = asyncio.Semaphore(concurrency or settings.scan.CONCURRENCY)
+
         icp_service = ICPService(session=self.repository.session)
         # TDOD: Filter for tenant_ids
-        icps = await icp_service.list()
+        icps = [icp for icp in await icp_service.list() if not tenant_ids or str(icp.tenant_id) in tenant_ids]
+        progress.set("icps_total", len(icps))
 
-        opportunities_found = 0
+        matcher = ICPMatcher(icps)
         for icp in icps:
-            if tenant_ids and str(icp.tenant_id) not in tenant_ids:
-                continue
-
-            if not icp.tool.include and not icp.process.include:
+            if icp not in matcher.icps:
                 await logger.ainfo(
                     "Skipping icp as tool and process include lists are both empty",
                     tenant_id=icp.tenant_id,
                     icp_id=icp.id,
                     icp_name=icp.name,
                 )
-                continue
 
-            date_n_days_ago = datetime.now(UTC) - timedelta(days=last_n_days)
-            and_conditions = [
-                JobPost.created_at > date_n_days_ago,
-                Opportunity.id.is_(None),
-            ]
-
-            # TODO: Filter on tool certainty?
-            tool_stack_or_conditions = (
-                [JobPost.tools.contains([{"name": name}]) for name in icp.tool.include] if icp.tool.include else []
-            )
-            process_or_conditions = (
-                [JobPost.processes.contains([{"name": name}]) for name in icp.process.include]
-                if icp.process.include
-                else []
-            )
+        await self._reset_changed_scan_cursors(matcher.icps)
+        # Only job posts created after the scan cursor of an ICP are matched against it
+        icp_cursors = {
+            icp.id: (icp.scan_cursor_created_at, icp.scan_cursor_id)
+            for icp in matcher.icps
+            if icp.scan_cursor_created_at and icp.scan_cursor_id
+        }
+
+        window_start = datetime.now(UTC) - timedelta(days=last_n_days)
+        # TODO: Filter on tool certainty?
+        job_posts_statement = (
+            select(JobPost)
+            .join(JobPost.company)
+            .where(JobPost.created_at > window_start, matcher.job_post_filter())
+            .order_by(JobPost.created_at, JobPost.id)
+            .limit(settings.scan.CHUNK_SIZE)
+            .execution_options(populate_existing=True)
+            .options(contains_eager(JobPost.company), undefer(JobPost.body))
+        )
 
-            if icp.tool.exclude:
-                tool_stack_not_conditions = [
-                    not_(JobPost.tools.contains([{"name": name} for name in icp.tool.exclude])),
-                ]
-                and_conditions.extend(tool_stack_not_conditions)
-
-            job_posts_statement = (
-                select(JobPost)
-                # TODO: This would still include job posts from last N days not matching this tenant that were previously discarded
-                .outerjoin(
-                    Opportunity,
-                    (JobPost.company_id == Opportunity.company_id) & (Opportunity.tenant_id == icp.tenant_id),
-                )
-                .where(
-                    and_(
-                        or_(*tool_stack_or_conditions, *process_or_conditions),
-                        *and_conditions,
-                    ),
-                )
-                .execution_options(populate_existing=True)
-                .options(selectinload(JobPost.company), undefer(JobPost.body))
+        opportunities_found = 0
+        matching_job_counts: dict[UUID, int] = defaultdict(int)
+        held_icp_ids: set[UUID] = set()
+        cursor = min(icp_cursors.values()) if matcher.icps and len(icp_cursors) == len(matcher.icps) else None
+        while True:
+            statement = job_posts_statement
+            if cursor:
+                statement = statement.where(tuple_(JobPost.created_at, JobPost.id) > cursor)
+            job_posts = list((await self.repository.session.execute(statement=statement)).scalars())
+            if not job_posts:
+                break
+
+            opportunity_statement = select(Opportunity.tenant_id, Opportunity.company_id).where(
+                Opportunity.company_id.in_({job_post.company_id for job_post in job_posts}),
             )
-
-            opportunities_audit_log_service = OpportunityAuditLogService(session=self.repository.session)
-            job_post_results = await self.repository.session.execute(statement=job_posts_statement)
-
-            matching_job_count = 0
-            for result in job_post_results:
-                matching_job_count += 1
-                job_post = result[0]
-                try:
-                    if not job_post.company:
-                        await logger.ainfo(
-                            "Skipping job because no company associated with job post",
-                            job_post_id=job_post.id,
-                            tenant_id=icp.tenant_id,
-                        )
+            opened = set((await self.repository.session.execute(opportunity_statement)).tuples())
+            rejected_statement = select(
+                icp_rejected_job_post_relation.c.icp_id,
+                icp_rejected_job_post_relation.c.job_post_id,
+            ).where(icp_rejected_job_post_relation.c.job_post_id.in_([job_post.id for job_post in job_posts]))
+            rejected = set((await self.repository.session.execute(rejected_statement)).tuples())
+
+            # Matches of the same company are handled one after another, they share contacts and opportunities
+            matches_by_company: dict[UUID | None, list[tuple[ICP, JobPost]]] = defaultdict(list)
+            for job_post in job_posts:
+                for icp in matcher.match(job_post):
+                    icp_cursor = icp_cursors.get(icp.id)
+                    if icp_cursor and (job_post.created_at, job_post.id) <= icp_cursor:
                         continue
-
-                    # Filter for company size but skip if the information is missing
-                    if icp.company.headcount_min and (
-                        not job_post.company.headcount or job_post.company.headcount < icp.company.headcount_min
+                    matching_job_counts[icp.id] += 1
+                    if (
+                        (icp.tenant_id, job_post.company_id) in opened
+                        or (icp.id, job_post.id) in rejected
+                        or progress.is_done("job_posts", f"{icp.id}:{job_post.id}")
                     ):
-                        await logger.ainfo(
-                            "Skipping job because criteria does not match",
-                            job_post_id=job_post.id,
-                            company_id=job_post.company.id,
-                            company_url=job_post.company.url,
-                            company_headcount=job_post.company.headcount,
-                            tenant_id=icp.tenant_id,
-                        )
                         continue
+                    matches_by_company[job_post.company_id].append((icp, job_post))
 
-                    if icp.company.headcount_max and (
-                        not job_post.company.headcount or job_post.company.headcount > icp.company.headcount_max
-                    ):
-                        await logger.ainfo(
-                            "Skipping job because criteria does not match",
-                            job_post_id=job_post.id,
-                            company_id=job_post.company.id,
-                            company_url=job_post.company.url,
-                            company_headcount=job_post.company.headcount,
-                            tenant_id=icp.tenant_id,
-                        )
-                        continue
+            found, failed = await self._scan_companies(
+                list(matches_by_company.values()),
+                progress,
+                semaphore,
+                pending_contexts,
+            )
+            opportunities_found += found
+            await self._hold_scan_cursors(job_posts, failed, icp_cursors, held_icp_ids)
+
+            cursor = (job_posts[-1].created_at, job_posts[-1].id)
+            await self._advance_scan_cursors(
+                [icp.id for icp in matcher.icps if icp.id not in held_icp_ids],
+                icp_cursors,
+                cursor,
+            )
+            progress.clear("job_posts")
+            progress.incr("job_posts_scanned", len(job_posts))
+            await progress.save(progress=(cursor[0] - window_start) / (datetime.now(UTC) - window_start))
 
-                    # Filter for org size but skip if the information is missing
-                    if (
-                        icp.company.org_size
-                        and icp.company.org_size.engineering_min
-                        and (
-                            not job_post.company.org_size
-                            or not job_post.company.org_size.engineering
-                            or job_post.company.org_size.engineering < icp.company.org_size.engineering_min
-                        )
-                    ):
-                        await logger.ainfo(
-                            "Skipping job because criteria does not match",
-                            job_post_id=job_post.id,
-                            company_id=job_post.company.id,
-                            company_url=job_post.company.url,
-                            org_size=job_post.company.org_size,
-                            tenant_id=icp.tenant_id,
-                        )
-                        continue
+        for icp in matcher.icps:
+            await logger.ainfo(
+                "Searched for new jobs matching tool stack and date range",
+                tools_include=icp.tool.include if icp.tool else None,
+                tools_exclude=icp.tool.exclude if icp.tool else None,
+                last_n_days=last_n_days,
+                matching_job_count=matching_job_counts[icp.id],
+                icp=icp.tenant_id,
+            )
 
-                    if (
-                        icp.company.org_size
-                        and icp.company.org_size.engineering_max
-                        and (
-                            not job_post.company.org_size
-                            or not job_post.company.org_size.engineering
-                            or job_post.company.org_size.engineering > icp.company.org_size.engineering_max
-                        )
-                    ):
-                        await logger.ainfo(
-                            "Skipping job because criteria does not match",
-                            job_post_id=job_post.id,
-                            company_id=job_post.company.id,
-                            company_url=job_post.company.url,
-                            org_size=job_post.company.org_size,
-                            tenant_id=icp.tenant_id,
-                        )
-                        continue
+        return opportunities_found
 
-                    # Filter for funding stage but don't skip if the information is missing
-                    if (
-                        icp.company.funding
-                        and job_post.company.last_funding
-                        and job_post.company.last_funding.round_name != FundingRound.SERIES_UNKNOWN
-                        and job_post.company.last_funding.round_name not in icp.company.funding
-                    ):
-                        await logger.ainfo(
-                            "Skipping job because criteria does not match",
-                            job_post_id=job_post.id,
-                            company_id=job_post.company.id,
-                            company_url=job_post.company.url,
-                            funding_round=job_post.company.last_funding,
-                            tenant_id=icp.tenant_id,
-                        )
-                        continue
+    async def warm_contexts(
+        self,
+        last_n_days: int = 1,
+        *,
+        concurrency: int | None = None,
+        progress: TaskProgress | None = None,
+    ) -> int:
+        """Cache the context of recent job posts for the pitch of every ICP they match, ahead of the scan.
 
-                    # Filter for country but don't skip if the information is missing
-                    if icp.company.countries and (
-                        job_post.company.hq_location
-                        and job_post.company.hq_location.country
-                        and job_post.company.hq_location.country not in icp.company.countries
-                    ):
-                        await logger.ainfo(
-                            "Job because criteria does not match, but continuing further",
-                            job_post_id=job_post.id,
-                            company_id=job_post.company.id,
-                            company_url=job_post.company.url,
-                            company_location=job_post.company.hq_location,
-                            tenant_id=icp.tenant_id,
-                        )
+        Only matching job posts are looked at, the others never turn into opportunities. Job posts matching ICPs with
+        the same pitch share their context, and contexts that are already cached are not extracted again.
 
-                    # TODO: Fetch the contact(s) with the right title from an external source
-                    person_statement = (
-                        select(Person.id)
-                        .where(Person.company_id == job_post.company.id)
-                        .execution_options(populate_existing=True)
-                    )
-                    await self.repository.session.execute(text("SET pg_trgm.similarity_threshold = 0.5;"))
-                    person_results = await self.repository.session.execute(statement=person_statement)
-                    person_ids = [result[0] for result in person_results]
-
-                    if not person_ids:
-                        # Extract person from data provider
-                        try:
-                            persons = await search_person_details(
-                                job_post.company.url,
-                                titles=icp.person.titles,
-                                sub_roles=icp.person.sub_roles,
-                            )
-                        except (ValueError, TypeError, LookupError):
-                            persons = []
-
-                        if not persons:
-                            await logger.ainfo(
-                                "Skipping new opportunity because no appropriate contact found",
-                                job_post_id=job_post.id,
-                                company_id=job_post.company.id,
-                                company_url=job_post.company.url,
-                                tenant_id=icp.tenant_id,
-                            )
-
-                        person_objects = []
-                        for person_details in persons:
-
-                            if not icp.person.titles or not difflib.get_close_matches(
-                                person_details.get("job_title", ""),
-                                icp.person.titles,
-                            ):
-                                await logger.ainfo(
-                                    "Skipping person because title doesn't match ICP",
-                                    job_post_id=job_post.id,
-                                    company_id=job_post.company.id,
-                                    company_url=job_post.company.url,
-                                    tenant_id=icp.tenant_id,
-                                    title=person_details.get("job_title"),
-                                    icp_titles=icp.person.titles,
-                                )
-                                continue
-
-                            linkedin_profile_url = None
-                            twitter_profile_url = None
-                            github_profile_url = None
-                            birth_date = None
-                            work_email = None
-
-                            if person_details.get("linkedin_url"):
-                                linkedin_profile_url = "https://" + person_details.get("linkedin_url", "").rstrip("/")
-                            if person_details.get("twitter_url"):
-                                twitter_profile_url = "https://" + person_details.get("twitter_url", "").rstrip("/")
-                            if person_details.get("github_url"):
-                                github_profile_url = "https://" + person_details.get("github_url", "").rstrip("/")
-
-                            with suppress(Exception):
-                                birth_date = (
-                                    datetime.strptime(person_details.get("birth_date", ""), "%Y-%m-%d")
-                                    .replace(tzinfo=UTC)
-                                    .date()
-                                )
-
-                            if person_details.get("work_email") and get_domain_from_email(
-                                person_details.get("work_email", ""),
-                            ) == get_domain(
-                                job_post.company.url,
-                            ):
-                                work_email = person_details.get("work_email")
-
-                            work_experiences = []
-                            for work_ex in person_details.get("experience", []):
-                                with suppress(Exception):
-                                    work_experiences.append(
-                                        WorkExperience(
-                                            starts_at=datetime.strptime(work_ex.get("start_date", ""), "%Y-%m")
-                                            .replace(tzinfo=UTC)
-                                            .date(),
-                                            title=work_ex.get("title", {}).get("name", "Unknown"),
-                                            company_name=work_ex.get("company", {}).get("name", "Unknown"),
-                                            company_url=work_ex.get("company", {}).get("website"),
-                                            company_linkedin_profile_url=work_ex.get("linkedin_url"),
-                                            ends_at=datetime.strptime(work_ex.get("end_date", ""), "%Y-%m")
-                                            .replace(tzinfo=UTC)
-                                            .date()
-                                            if work_ex.get("end_date")
-                                            else None,
-                                        ),
-                                    )
-
-                            obj = PersonCreate(
-                                first_name=person_details.get("first_name"),
-                                last_name=person_details.get("last_name"),
-                                full_name=person_details.get("full_name"),
-                                title=person_details.get("job_title"),
-                                occupation=person_details.get("job_title_role"),
-                                industry=person_details.get("industry"),
-                                linkedin_profile_url=linkedin_profile_url,
-                                twitter_profile_url=twitter_profile_url,
-                                github_profile_url=github_profile_url,
-                                location=Location(
-                                    country=person_details.get("location_country"),
-                                    region=person_details.get("location_region"),
-                                    city=person_details.get("location_locality"),
-                                ),
-                                personal_emails=person_details.get("personal_emails", []),
-                                work_email=work_email,
-                                phone_numbers=person_details.get("phone_numbers", []),
-                                birth_date=birth_date,
-                                work_experiences=work_experiences,
-                                company_id=job_post.company.id,
-                            )
-                            person_objects.append(obj.to_dict())
-
-                        if not person_objects:
-                            await logger.ainfo(
-                                "Skipping new opportunity because no relevant people found",
-                                job_post_id=job_post.id,
-                                company_id=job_post.company.id,
-                                company_url=job_post.company.url,
-                                tenant_id=icp.tenant_id,
-                            )
-                            continue
-
-                        person_service = PersonService(session=self.repository.session)
-                        inserted_persons = await person_service.upsert_many(person_objects)
-                        person_ids = [person.id for person in inserted_persons]
-
-                    # Fetch context from job post
-                    context = {}
-                    if job_post.body and icp.pitch:
-                        context["job_post"] = await extract_context_from_job_post(job_post.body, icp.pitch)
-                    else:
-                        await logger.awarn(
-                            "Cannot generate opportunity highlight, job post body or icp pitch missing",
-                            job_post_id=job_post.id,
-                            icp=icp.id,
-                        )
+        Returns:
+            The number of contexts extracted.
+        """
+        if progress is None:
+            progress = TaskProgress()
+        settings = get_settings()
+        semaphore = asyncio.Semaphore(concurrency or settings.scan.CONCURRENCY)
+        icp_service = ICPService(session=self.repository.session)
+        matcher = ICPMatcher(icp for icp in await icp_service.list() if icp.pitch)
+
+        window_start = datetime.now(UTC) - timedelta(days=last_n_days)
+        job_posts_statement = (
+            select(JobPost)
+            .join(JobPost.company)
+            .where(JobPost.created_at > window_start, JobPost.body.is_not(None), matcher.job_post_filter())
+            .order_by(JobPost.created_at, JobPost.id)
+            .limit(settings.scan.CHUNK_SIZE)
+            .options(contains_eager(JobPost.company), undefer(JobPost.body))
+        )
 
-                    opportunity = await self.create(
-                        {
-                            "name": job_post.company.name,
-                            "stage": OpportunityStage.IDENTIFIED.value,
-                            "context": context,
-                            "company_id": job_post.company.id,
-                            "contact_ids": person_ids,
-                            "job_post_ids": [job_post.id],
-                            "tenant_id": icp.tenant_id,
-                        },
+        async def warm(job_post: JobPost, pitch: str) -> None:
+            async with semaphore:
+                try:
+                    await set_cached_context(
+                        context_cache_key(job_post.id, pitch),
+                        await extract_context_from_job_post(job_post.body or "", pitch),
                     )
+                except (ValueError, TypeError, LookupError, OpenAIError) as e:
+                    await logger.awarn("Failed to extract context", job_post_id=job_post.id, exc_info=e)
+                    return
+                progress.incr("contexts_extracted")
+
+        cursor: tuple[datetime, UUID] | None = None
+        while True:
+            statement = job_posts_statement
+            if cursor:
+                statement = statement.where(tuple_(JobPost.created_at, JobPost.id) > cursor)
+            job_posts = list((await self.repository.session.execute(statement=statement)).scalars())
+            if not job_posts:
+                break
+
+            missing: dict[str, tuple[JobPost, str]] = {}
+            for job_post in job_posts:
+                for icp in matcher.match(job_post):
+                    cache_key = context_cache_key(job_post.id, icp.pitch or "")
+                    if cache_key not in missing and await get_cached_context(cache_key) is None:
+                        missing[cache_key] = (job_post, icp.pitch or "")
+            await asyncio.gather(*(warm(job_post, pitch) for job_post, pitch in missing.values()))
+
+            cursor = (job_posts[-1].created_at, job_posts[-1].id)
+            progress.incr("job_posts_scanned", len(job_posts))
+            await progress.save(progress=(cursor[0] - window_start) / (datetime.now(UTC) - window_start))
+        return progress.counters.get("contexts_extracted", 0)
+
+    async def _reset_changed_scan_cursors(self, icps: list[ICP]) -> None:
+        """Reset the scan cursor and rejected job posts of ICPs whose criteria changed since their last scan."""
+        changed_icps = [icp for icp in icps if icp.scan_criteria_hash != icp_criteria_hash(icp)]
+        if not changed_icps:
+            return
+        for icp in changed_icps:
+            icp.scan_cursor_created_at = None
+            icp.scan_cursor_id = None
+            icp.scan_criteria_hash = icp_criteria_hash(icp)
+        await self.repository.session.execute(
+            delete(icp_rejected_job_post_relation).where(
+                icp_rejected_job_post_relation.c.icp_id.in_([icp.id for icp in changed_icps]),
+            ),
+        )
+        await self.repository.session.commit()
 
-                    await opportunities_audit_log_service.create(
-                        {
-                            "operation": "create",
-                            "diff": {"new": opportunity},
-                            "tenant_id": icp.tenant_id,
-                            "opportunity_id": opportunity.id,
-                        },
-                    )
-                    await self.repository.session.commit()
-                    opportunities_found += 1
+    async def _advance_scan_cursors(
+        self,
+        icp_ids: list[UUID],
+        icp_cursors: dict[UUID, tuple[datetime, UUID]],
+        cursor: tuple[datetime, UUID],
+    ) -> None:
+        """Move the scan cursor of ICPs up to a job post."""
+        behind_icp_ids = [icp_id for icp_id in icp_ids if icp_id not in icp_cursors or icp_cursors[icp_id] < cursor]
+        if not behind_icp_ids:
+            return
+        for icp_id in behind_icp_ids:
+            icp_cursors[icp_id] = cursor
+        await self.repository.session.execute(
+            update(ICP)
+            .where(ICP.id.in_(behind_icp_ids))
+            .values(scan_cursor_created_at=cursor[0], scan_cursor_id=cursor[1])
+            .execution_options(synchronize_session=False),
+        )
+        await self.repository.session.commit()
 
+    async def _hold_scan_cursors(
+        self,
+        job_posts: list[JobPost],
+        failed: list[tuple[UUID, UUID]],
+        icp_cursors: dict[UUID, tuple[datetime, UUID]],
+        held_icp_ids: set[UUID],
+    ) -> None:
+        """Stop the scan cursor of ICPs before the first job post of a chunk that failed, for the rest of the scan."""
+        positions = {job_post.id: index for index, job_post in enumerate(job_posts)}
+        first_failures: dict[UUID, int] = {}
+        for icp_id, job_post_id in failed:
+            first_failures[icp_id] = min(first_failures.get(icp_id, len(job_posts)), positions[job_post_id])
+        for icp_id, index in first_failures.items():
+            if icp_id not in held_icp_ids and index > 0:
+                previous = job_posts[index - 1]
+                await self._advance_scan_cursors([icp_id], icp_cursors, (previous.created_at, previous.id))
+            held_icp_ids.add(icp_id)
+
+    async def _scan_companies(
+        self,
+        matches_by_company: list[list[tuple[ICP, JobPost]]],
+        progress: TaskProgress,
+        semaphore: asyncio.Semaphore,
+        pending_contexts: PendingContexts | None = None,
+    ) -> tuple[int, list[tuple[UUID, UUID]]]:
+        """Scan the matches of each company concurrently, a company that fails does not stop the others.
+
+        Returns:
+            The number of opportunities created, and the ICP and job post ids of the matches that failed.
+        """
+        results = await asyncio.gather(
+            *(self._scan_job_posts(matches, progress, semaphore, pending_contexts) for matches in matches_by_company),
+            return_exceptions=True,
+        )
+        opportunities_found = 0
+        failed: list[tuple[UUID, UUID]] = []
+        for matches, result in zip(matches_by_company, results, strict=True):
+            if isinstance(result, BaseException):
+                # E.g. no database connection, the matches of the company are tried again
+                await logger.aerror("Error scanning job posts of company", exc_info=result)
+                failed.extend((icp.id, job_post.id) for icp, job_post in matches)
+                progress.incr("matches_failed", len(matches))
+                continue
+            opportunities_found += result[0]
+            failed.extend(result[1])
+        return opportunities_found, failed
+
+    async def _scan_job_posts(
+        self,
+        matches: list[tuple[ICP, JobPost]],
+        progress: TaskProgress,
+        semaphore: asyncio.Semaphore,
+        pending_contexts: PendingContexts | None = None,
+    ) -> tuple[int, list[tuple[UUID, UUID]]]:
+        """Turn the ICP matches of a company's job posts into opportunities using a session of their own.
+
+        Returns:
+            The number of opportunities created, and the ICP and job post ids of the matches that failed.
+        """
+        opportunities_found = 0
+        failed: list[tuple[UUID, UUID]] = []
+        opened_tenant_ids: set[UUID] = set()
+        async with semaphore, alchemy.get_session() as db_session:
+            for icp, job_post in matches:
+                if icp.tenant_id in opened_tenant_ids:
+                    continue
+                progress.incr("matches_scanned")
+                outcome = None
+                try:
+                    outcome = await self._create_opportunity_from_job_post(db_session, icp, job_post, pending_contexts)
+                    if outcome is ScanOutcome.CREATED:
+                        opportunities_found += 1
+                        opened_tenant_ids.add(icp.tenant_id)
+                        progress.incr("opportunities_created")
+                    elif outcome is ScanOutcome.REJECTED:
+                        await db_session.execute(
+                            pg_insert(icp_rejected_job_post_relation)
+                            .values(icp_id=icp.id, job_post_id=job_post.id)
+                            .on_conflict_do_nothing(),
+                        )
+                        await db_session.commit()
                 except (ValueError, AttributeError, TypeError) as e:
                     error_msg = "Error processing job post or person"
                     await logger.aerror(error_msg, job_post_id=job_post.id, exc_info=e)
+                    outcome = ScanOutcome.FAILED
                 except (
                     IntegrityError,
                     OperationalError,
@@ -534,18 +539,271 @@ class OpportunityService(SQLAlchemyAsyncRepositoryService[Opportunity]):
                 ) as e:
                     error_msg = "Error inserting / updating opportunity"
                     await logger.aerror(error_msg, job_post_id=job_post.id, exc_info=e)
-                    await self.repository.session.rollback()
-
+                    await db_session.rollback()
+                    outcome = ScanOutcome.FAILED
+                except OpenAIError as e:
+                    await logger.aerror("Error getting job post context", job_post_id=job_post.id, exc_info=e)
+                    await db_session.rollback()
+                    outcome = ScanOutcome.FAILED
+                finally:
+                    # Failed matches are tried again by the next scan or a retry, they hold back the scan cursor
+                    if outcome is ScanOutcome.FAILED:
+                        failed.append((icp.id, job_post.id))
+                        progress.incr("matches_failed")
+                    elif outcome is not None:
+                        progress.mark_done("job_posts", f"{icp.id}:{job_post.id}")
+                    await progress.save()
+        return opportunities_found, failed
+
+    async def _create_opportunity_from_job_post(  # noqa: C901, PLR0912, PLR0915
+        self,
+        db_session: AsyncSession,
+        icp: ICP,
+        job_post: JobPost,
+        pending_contexts: PendingContexts | None = None,
+    ) -> ScanOutcome:
+        """Create an opportunity, along with contacts, for a job post matching the ICP tool stack."""
+        opportunities_service = OpportunityService(session=db_session)
+        opportunities_audit_log_service = OpportunityAuditLogService(session=db_session)
+        if not job_post.company:
             await logger.ainfo(
-                "Searched for new jobs matching tool stack and date range",
-                tools_include=icp.tool.include,
-                tools_exclude=icp.tool.exclude,
-                last_n_days=last_n_days,
-                matching_job_count=matching_job_count,
-                icp=icp.tenant_id,
+                "Skipping job because no company associated with job post",
+                job_post_id=job_post.id,
+                tenant_id=icp.tenant_id,
+            )
+            return ScanOutcome.REJECTED
+
+        # Company size, org size and funding are filtered on while querying job posts
+        # Filter for country but don't skip if the information is missing
+        if icp.company and icp.company.countries and (
+            job_post.company.hq_location
+            and job_post.company.hq_location.country
+            and job_post.company.hq_location.country not in icp.company.countries
+        ):
+            await logger.ainfo(
+                "Job because criteria does not match, but continuing further",
+                job_post_id=job_post.id,
+                company_id=job_post.company.id,
+                company_url=job_post.company.url,
+                company_location=job_post.company.hq_location,
+                tenant_id=icp.tenant_id,
             )
 
-        return opportunities_found
+        # TODO: Fetch the contact(s) with the right title from an external source
+        person_statement = (
+            select(Person.id)
+            .where(Person.company_id == job_post.company.id)
+            .execution_options(populate_existing=True)
+        )
+        await db_session.execute(text("SET pg_trgm.similarity_threshold = 0.5;"))
+        person_results = await db_session.execute(statement=person_statement)
+        person_ids = [result[0] for result in person_results]
+
+        if not person_ids:
+            if not job_post.company.url:
+                await logger.ainfo(
+                    "Skipping new opportunity because the company has no url to search contacts with",
+                    job_post_id=job_post.id,
+                    company_id=job_post.company.id,
+                    tenant_id=icp.tenant_id,
+                )
+                return ScanOutcome.REJECTED
+
+            # Extract person from data provider
+            try:
+                persons = await search_person_details(
+                    job_post.company.url,
+                    titles=icp.person.titles,
+                    sub_roles=icp.person.sub_roles,
+                )
+            except (ValueError, TypeError, LookupError) as e:
+                # E.g. rate limited, out of credits or the provider's circuit breaker is open
+                await logger.awarn(
+                    "Failed to search contacts, the job post is tried again by the next scan",
+                    job_post_id=job_post.id,
+                    company_id=job_post.company.id,
+                    company_url=job_post.company.url,
+                    tenant_id=icp.tenant_id,
+                    exc_info=e,
+                )
+                return ScanOutcome.FAILED
+
+            if not persons:
+                await logger.ainfo(
+                    "Skipping new opportunity because no appropriate contact found",
+                    job_post_id=job_post.id,
+                    company_id=job_post.company.id,
+                    company_url=job_post.company.url,
+                    tenant_id=icp.tenant_id,
+                )
+
+            person_objects = []
+            for person_details in persons:
+
+                if not icp.person.titles or not difflib.get_close_matches(
+                    person_details.get("job_title", ""),
+                    icp.person.titles,
+                ):
+                    await logger.ainfo(
+                        "Skipping person because title doesn't match ICP",
+                        job_post_id=job_post.id,
+                        company_id=job_post.company.id,
+                        company_url=job_post.company.url,
+                        tenant_id=icp.tenant_id,
+                        title=person_details.get("job_title"),
+                        icp_titles=icp.person.titles,
+                    )
+                    continue
+
+                linkedin_profile_url = None
+                twitter_profile_url = None
+                github_profile_url = None
+                birth_date = None
+                work_email = None
+
+                if person_details.get("linkedin_url"):
+                    linkedin_profile_url = "https://" + person_details.get("linkedin_url", "").rstrip("/")
+                if person_details.get("twitter_url"):
+                    twitter_profile_url = "https://" + person_details.get("twitter_url", "").rstrip("/")
+                if person_details.get("github_url"):
+                    github_profile_url = "https://" + person_details.get("github_url", "").rstrip("/")
+
+                with suppress(Exception):
+                    birth_date = (
+                        datetime.strptime(person_details.get("birth_date", ""), "%Y-%m-%d")
+                        .replace(tzinfo=UTC)
+                        .date()
+                    )
+
+                if person_details.get("work_email") and get_domain_from_email(
+                    person_details.get("work_email", ""),
+                ) == get_domain(
+                    job_post.company.url,
+                ):
+                    work_email = person_details.get("work_email")
+
+                work_experiences = []
+                for work_ex in person_details.get("experience", []):
+                    with suppress(Exception):
+                        work_experiences.append(
+                            WorkExperience(
+                                starts_at=datetime.strptime(work_ex.get("start_date", ""), "%Y-%m")
+                                .replace(tzinfo=UTC)
+                                .date(),
+                                title=work_ex.get("title", {}).get("name", "Unknown"),
+                                company_name=work_ex.get("company", {}).get("name", "Unknown"),
+                                company_url=work_ex.get("company", {}).get("website"),
+                                company_linkedin_profile_url=work_ex.get("linkedin_url"),
+                                ends_at=datetime.strptime(work_ex.get("end_date", ""), "%Y-%m")
+                                .replace(tzinfo=UTC)
+                                .date()
+                                if work_ex.get("end_date")
+                                else None,
+                            ),
+                        )
+
+                obj = PersonCreate(
+                    first_name=person_details.get("first_name"),
+                    last_name=person_details.get("last_name"),
+                    full_name=person_details.get("full_name"),
+                    title=person_details.get("job_title"),
+                    occupation=person_details.get("job_title_role"),
+                    industry=person_details.get("industry"),
+                    linkedin_profile_url=linkedin_profile_url,
+                    twitter_profile_url=twitter_profile_url,
+                    github_profile_url=github_profile_url,
+                    location=Location(
+                        country=person_details.get("location_country"),
+                        region=person_details.get("location_region"),
+                        city=person_details.get("location_locality"),
+                    ),
+                    personal_emails=person_details.get("personal_emails", []),
+                    work_email=work_email,
+                    phone_numbers=person_details.get("phone_numbers", []),
+                    birth_date=birth_date,
+                    work_experiences=work_experiences,
+                    company_id=job_post.company.id,
+                )
+                person_objects.append(obj.to_dict())
+
+            if not person_objects:
+                await logger.ainfo(
+                    "Skipping new opportunity because no relevant people found",
+                    job_post_id=job_post.id,
+                    company_id=job_post.company.id,
+                    company_url=job_post.company.url,
+                    tenant_id=icp.tenant_id,
+                )
+                return ScanOutcome.REJECTED
+
+            person_service = PersonService(session=db_session)
+            inserted_persons = await person_service.upsert_many(person_objects)
+            person_ids = [person.id for person in inserted_persons]
+
+        # Fetch context from job post, unless it is left to a batch
+        context: dict[str, Any] | None = {}
+        cache_key = None
+        if job_post.body and icp.pitch:
+            cache_key = context_cache_key(job_post.id, icp.pitch)
+            if pending_contexts is None:
+                context["job_post"] = await get_job_post_context(job_post.id, job_post.body, icp.pitch)
+            elif (cached_context := await get_cached_context(cache_key)) is not None:
+                context["job_post"] = cached_context
+            else:
+                context = None
+        else:
+            await logger.awarn(
+                "Cannot generate opportunity highlight, job post body or icp pitch missing",
+                job_post_id=job_post.id,
+                icp=icp.id,
+            )
+
+        opportunity = await opportunities_service.create(
+            {
+                "name": job_post.company.name,
+                "stage": OpportunityStage.IDENTIFIED.value,
+                "context": context,
+                "company_id": job_post.company.id,
+                "contact_ids": person_ids,
+                "job_post_ids": [job_post.id],
+                "tenant_id": icp.tenant_id,
+            },
+        )
+
+        await opportunities_audit_log_service.create(
+            {
+                "operation": "create",
+                "diff": {"new": opportunity},
+                "tenant_id": icp.tenant_id,
+                "opportunity_id": opportunity.id,
+            },
+        )
+        await db_session.commit()
+        if context is None and pending_contexts is not None and cache_key and job_post.body and icp.pitch:
+            pending_contexts.add(cache_key, context_request(job_post.body, icp.pitch), opportunity.id)
+        return ScanOutcome.CREATED
+
+    async def set_job_post_contexts(self, contexts: dict[UUID, list[dict[str, str]]]) -> int:
+        """Write the job post context of opportunities created without one.
+
+        Returns:
+            The number of opportunities updated, the ones that got a context meanwhile are left as they are.
+        """
+        updated = 0
+        for opportunity_id, job_post_context in contexts.items():
+            result = await self.repository.session.execute(
+                update(Opportunity)
+                # Created without context, which is stored as a JSON null rather than NULL
+                .where(
+                    Opportunity.id == opportunity_id,
+                    func.coalesce(func.jsonb_typeof(Opportunity.context), "null") == "null",
+                )
+                .values(context={"job_post": job_post_context})
+                .execution_options(synchronize_session=False),
+            )
+            updated += result.rowcount
+        await self.repository.session.commit()
+        return updated
 
     async def to_model(self, data: ModelDictT[Opportunity], operation: str | None = None) -> Opportunity:
         if (is_msgspec_model(data) or is_pydantic_model(data)) and operation == "create" and data.slug is None:  # type: ignore[union-attr]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from saq import Job
+from structlog import get_logger
+
+from app.config.app import alchemy
+from app.config.base import get_settings
+from app.lib.tasks import TaskProgress
+
+from . import utils
+from .services import OpportunityService
+
+if TYPE_CHECKING:
+    from saq import Queue
+    from saq.types import Context
+
+__all__ = [
+    "poll_context_batch",
+    "queue_context_batch_poll",
+    "scan_opportunities",
+    "submit_context_batch",
+    "warm_opportunity_contexts",
+]
+
+
+logger = get_logger()
+CONTEXT_BATCH_JOB_TTL = 60 * 60 * 24
+"""Seconds to keep a finished context batch poll around."""
+
+
+async def scan_opportunities(ctx: Context, *, tenant_ids: list[str] | None = None, last_n_days: int = 7) -> int:
+    """Scan recent job posts for new opportunities."""
+    progress = TaskProgress(ctx.get("job"))
+    pending_contexts = utils.PendingContexts() if get_settings().scan.CONTEXT_BATCH else None
+    await logger.ainfo("Scanning for opportunities", tenant_ids=tenant_ids, last_n_days=last_n_days)
+    try:
+        async with OpportunityService.new(config=alchemy) as service:
+            opportunities_found = await service.scan(
+                tenant_ids,
+                last_n_days,
+                progress=progress,
+                pending_contexts=pending_contexts,
+            )
+    finally:
+        # Also when the scan failed, the opportunities it created are not scanned again
+        if pending_contexts and pending_contexts.requests:
+            await submit_context_batch(ctx["queue"], pending_contexts)
+    await logger.ainfo("Opportunity scan complete", opportunities_found=opportunities_found, **progress.counters)
+    return opportunities_found
+
+
+async def submit_context_batch(queue: Queue, pending_contexts: utils.PendingContexts) -> str:
+    """Send the context requests of opportunities in one batch and poll it until it is done."""
+    batch_id = await utils.context_batches.submit(pending_contexts.requests)
+    await logger.ainfo("Submitted context batch", batch_id=batch_id, requests=len(pending_contexts.requests))
+    await queue_context_batch_poll(queue, batch_id, pending_contexts.opportunity_ids, delay=0)
+    return batch_id
+
+
+async def queue_context_batch_poll(
+    queue: Queue,
+    batch_id: str,
+    opportunity_ids: dict[str, list[str]],
+    delay: int | None = None,
+) -> None:
+    """Queue a check of a context batch, in ``delay`` seconds which defaults to the poll interval."""
+    settings = get_settings()
+    if delay is None:
+        delay = settings.scan.CONTEXT_BATCH_POLL_INTERVAL
+    await queue.enqueue(
+        Job(
+            function="poll_context_batch",
+            kwargs={"batch_id": batch_id, "opportunity_ids": opportunity_ids},
+            scheduled=int(time.time()) + delay if delay else 0,
+            retries=settings.saq.JOB_RETRIES,
+            ttl=CONTEXT_BATCH_JOB_TTL,
+        ),
+    )
+
+
+async def poll_context_batch(ctx: Context, *, batch_id: str, opportunity_ids: dict[str, list[str]]) -> int:
+    """Write the contexts of a batch to the opportunities waiting for them once it is done, or check again later.
+
+    The contexts are cached too. Requests that failed or did not complete in time are sent again directly.
+    """
+    batch = await utils.context_batches.retrieve(batch_id)
+    if not batch.is_done:
+        await logger.ainfo("Context batch not done yet", batch_id=batch_id, status=batch.status)
+        await queue_context_batch_poll(ctx["queue"], batch_id, opportunity_ids)
+        return 0
+
+    contents = dict(batch.results)
+    for cache_key, request in batch.failed.items():
+        try:
+            contents[cache_key] = await utils.complete_context_request(request)
+        except Exception as e:  # noqa: BLE001
+            await logger.awarn("Failed to extract context", cache_key=cache_key, exc_info=e)
+
+    contexts = {}
+    for cache_key, content in contents.items():
+        try:
+            context = utils.parse_context(content)
+        except (ValueError, TypeError, LookupError) as e:
+            await logger.awarn("Failed to read extracted context", cache_key=cache_key, exc_info=e)
+            continue
+        await utils.set_cached_context(cache_key, context)
+        contexts.update((UUID(opportunity_id), context) for opportunity_id in opportunity_ids.get(cache_key, []))
+
+    async with OpportunityService.new(config=alchemy) as service:
+        updated = await service.set_job_post_contexts(contexts)
+    await logger.ainfo(
+        "Context batch complete",
+        batch_id=batch_id,
+        status=batch.status,
+        requests=len(batch.results) + len(batch.failed),
+        failed=len(batch.failed),
+        updated=updated,
+    )
+    return updated
+
+
+async def warm_opportunity_contexts(ctx: Context, *, last_n_days: int = 1) -> int:
+    """Cache the context of recently imported job posts for the ICPs they match, so that scans find them ready."""
+    progress = TaskProgress(ctx.get("job"))
+    async with OpportunityService.new(config=alchemy) as service:
+        extracted = await service.warm_contexts(last_n_days, progress=progress)
+    await logger.ainfo("Opportunity contexts warmed", extracted=extracted, **progress.counters)
+    return extracted
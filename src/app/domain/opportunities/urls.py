@@ -4,6 +4,7 @@ OPPORTUNITY_DETAIL = "/api/opportunities/{opportunity_id:uuid}"
 OPPORTUNITY_UPDATE = "/api/opportunities/{opportunity_id:uuid}"
 OPPORTUNITY_CREATE = "/api/opportunities"
 OPPORTUNITY_SCAN_FOR = "/api/opportunities/scan-for"
+OPPORTUNITY_SCAN_FOR_DETAIL = "/api/opportunities/scan-for/{job_key:str}"
 OPPORTUNITY_INDEX = "/api/opportunities/{opportunity_id:uuid}"
 ICP_LIST = "/api/icps"
 ICP_DETAIL = "/api/icps/{icp_id:uuid}"
@@ -1,17 +1,30 @@
+import hashlib
 import json
 import os
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
 
 import structlog
 from openai import AsyncOpenAI
+from redis.exceptions import RedisError
+
+from app.config.base import get_settings
+from app.lib.html import preprocess_html
+from app.lib.limits import provider_limit
+from app.lib.llm_batch import BatchBackend, OpenAIBatchBackend
+from app.lib.stores import provider_store
 
 logger = structlog.get_logger()
 
 model = os.environ["OPENAI_MODEL_NAME"]
 client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
+context_batches: BatchBackend = OpenAIBatchBackend(client)
+"""Where context requests are sent when the scan batches them."""
 
 context_prompt = """
-    Only extract the following information directly from the given job post(which is in the form of HTML/JS code)
-    without adding any outside knowledge or assumptions:
+    Only extract the following information directly from the given job post(which is given as its text, structured
+    JobPosting data and links) without adding any outside knowledge or assumptions:
     - Pick up 0 to 2 most relevant sentences(if they exist and along with the reason) from the job post that prove with high certainty that the compaany that made the post needs my product(pitch: {product_pitch}).
 
     Format the extracted information into a json serializable array of objects as per this format:
@@ -19,32 +32,104 @@ context_prompt = """
 
     Note: Do NOT include anything that's not part of the post.
 
-    Here is the code:
+    Here is the job post:
     {html_content}
 """
 
 
-async def extract_context_from_job_post(html_content: str, product_pitch: str) -> list[dict[str, str]]:
-    """Extracts context from html job post using an LLM."""
-    messages = [
-        {
-            "role": "user",
-            "content": context_prompt.format(html_content=html_content, product_pitch=product_pitch),
-        },
-    ]
-    chat_response = await client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=0,
-        response_format={
-            "type": "json_object",
-        },
-    )
-
-    context = json.loads(chat_response.choices[0].message.content)
+@dataclass
+class PendingContexts:
+    """Context requests left to a batch, one per job post and pitch however many opportunities share it."""
+
+    requests: dict[str, dict[str, Any]] = field(default_factory=dict)
+    """Context requests by cache key."""
+    opportunity_ids: dict[str, list[str]] = field(default_factory=dict)
+    """Ids of the opportunities waiting for a context, by cache key."""
+
+    def add(self, cache_key: str, request: dict[str, Any], opportunity_id: UUID) -> None:
+        """Leave the context of an opportunity to the batch."""
+        self.requests.setdefault(cache_key, request)
+        self.opportunity_ids.setdefault(cache_key, []).append(str(opportunity_id))
+
+
+def context_request(html_content: str, product_pitch: str) -> dict[str, Any]:
+    """Build the chat completion request extracting the context of a job post, as sent directly or in a batch."""
+    return {
+        "model": model,
+        "messages": [
+            {
+                "role": "user",
+                "content": context_prompt.format(
+                    html_content=preprocess_html(html_content),
+                    product_pitch=product_pitch,
+                ),
+            },
+        ],
+        "temperature": 0,
+        "response_format": {"type": "json_object"},
+    }
+
+
+def parse_context(content: str) -> list[dict[str, str]]:
+    """Read the sentences and reasons out of the response to a context request."""
+    context = json.loads(content)
     logger.debug("Context extracted from job post", context=context)
     return [
         {"sentence": str(item["sentence"]), "reason": str(item["reason"])}
         for item in context.get("result", [])
         if "sentence" in item
     ]
+
+
+async def complete_context_request(request: dict[str, Any]) -> str:
+    """Send a context request right away."""
+    async with provider_limit("openai"):
+        chat_response = await client.chat.completions.create(**request)
+    return chat_response.choices[0].message.content or "{}"
+
+
+async def extract_context_from_job_post(html_content: str, product_pitch: str) -> list[dict[str, str]]:
+    """Extracts context from html job post using an LLM."""
+    return parse_context(await complete_context_request(context_request(html_content, product_pitch)))
+
+
+def context_cache_key(job_post_id: UUID | str, product_pitch: str) -> str:
+    """Key of the context of a job post for a pitch, derived from the pitch, the model and the prompt.
+
+    Whitespace is collapsed, so that pitches that only differ in their formatting share their contexts.
+    """
+    digest = hashlib.sha256()
+    prompt_version = get_settings().scan.CONTEXT_PROMPT_VERSION
+    for part in (model, prompt_version, context_prompt, " ".join(product_pitch.split())):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return f"context:{job_post_id}:{digest.hexdigest()}"
+
+
+async def get_cached_context(cache_key: str) -> list[dict[str, str]] | None:
+    """Get the context cached under a key, ``None`` when it was not extracted yet."""
+    try:
+        cached = await provider_store("opportunity-context").get(cache_key)
+    except RedisError as e:
+        await logger.awarn("Failed to read opportunity context cache", key=cache_key, exc_info=e)
+        return None
+    return json.loads(cached) if cached is not None else None
+
+
+async def set_cached_context(cache_key: str, context: list[dict[str, str]]) -> None:
+    """Cache the context extracted for a key."""
+    ttl = get_settings().scan.CONTEXT_CACHE_TTL
+    try:
+        await provider_store("opportunity-context").set(cache_key, json.dumps(context), expires_in=ttl)
+    except RedisError as e:
+        await logger.awarn("Failed to write opportunity context cache", key=cache_key, exc_info=e)
+
+
+async def get_job_post_context(job_post_id: UUID, html_content: str, product_pitch: str) -> list[dict[str, str]]:
+    """Get the context of a job post for a pitch, extracting it only when it is not cached yet."""
+    cache_key = context_cache_key(job_post_id, product_pitch)
+    context = await get_cached_context(cache_key)
+    if context is None:
+        context = await extract_context_from_job_post(html_content, product_pitch)
+        await set_cached_context(cache_key, context)
+    return context
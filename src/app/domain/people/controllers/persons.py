@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import contextlib
 from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING, Annotated
 
@@ -11,24 +10,33 @@ from advanced_alchemy.filters import LimitOffset, SearchFilter
 from litestar import Controller, delete, get, patch, post
 from litestar.di import Provide
 from litestar.exceptions import HTTPException
+from sqlalchemy import func
 
+from app.config.base import get_settings
+from app.db.models import Person as PersonModel
 from app.domain.accounts.guards import requires_active_user
 from app.domain.companies.dependencies import provide_companies_service
-from app.domain.companies.schemas import CompanyCreate
 from app.domain.companies.services import CompanyService  # noqa: TCH001
+from app.domain.companies.tasks import queue_company_enrichment
 from app.domain.people import urls
 from app.domain.people.dependencies import provide_persons_service
-from app.domain.people.schemas import Person, PersonCreate, PersonCreateFromURL, PersonUpdate
+from app.domain.people.schemas import (
+    Person,
+    PersonBulkCreateFromURLs,
+    PersonCreate,
+    PersonCreateFromURL,
+    PersonUpdate,
+)
 from app.domain.people.services import PersonService
-from app.lib.pdl import get_person_details
-from app.lib.schema import Location, WorkExperience
-from app.lib.utils import get_domain, get_domain_from_email
+from app.domain.people.utils import company_from_person_details, person_from_person_details, profile_url_variants
+from app.lib.pdl import get_person_details, get_persons_details, normalize_url
 
 if TYPE_CHECKING:
     from uuid import UUID
 
     from advanced_alchemy.service.pagination import OffsetPagination
     from litestar.params import Dependency, Parameter
+    from litestar_saq import TaskQueues
 
     from app.lib.dependencies import FilterTypes
 
@@ -91,6 +99,7 @@ class PersonController(Controller):
         self,
         companies_service: CompanyService,
         persons_service: PersonService,
+        task_queues: TaskQueues,
         data: PersonCreateFromURL,
     ) -> Person:
         """Create a new person from URL."""
@@ -101,10 +110,9 @@ class PersonController(Controller):
         ]
         results, count = await persons_service.list_and_count(*filters)
 
-        now = datetime.now(UTC)
-        four_weeks_ago = now - timedelta(weeks=4)
-
-        if count > 0 and results[0].updated_at > four_weeks_ago:
+        # Older persons are refreshed here, or by the refresh_stale_persons task
+        max_age = timedelta(days=get_settings().enrichment.MAX_AGE_DAYS)
+        if count > 0 and results[0].updated_at > datetime.now(UTC) - max_age:
             await logger.ainfo("Person already exists and is up-to-date", person=results[0])
             return persons_service.to_schema(schema_type=Person, data=results[0])
 
@@ -117,93 +125,92 @@ class PersonController(Controller):
             logger.aerror(error_msg, exc_info=e)
             raise HTTPException(status_code=500, detail="An unexpected error occurred.") from e
 
-        linkedin_profile_url = None
-        twitter_profile_url = None
-        github_profile_url = None
-        birth_date = None
-        work_email = None
-        person_company_name = str(person_details.get("job_company_name", ""))
-        person_company_url = str(person_details.get("job_company_website", ""))
-        person_company_linkedin_url = str(person_details.get("job_company_linkedin_url"))
-
-        if not person_company_name and not person_company_url and not person_company_linkedin_url:
+        company = company_from_person_details(person_details)
+        if company is None:
             error_msg = "Company not found in person details"
             await logger.aerror(error_msg, person_details=person_details)
             raise ValueError(error_msg)
 
-        if person_details.get("linkedin_url"):
-            linkedin_profile_url = "https://" + person_details.get("linkedin_url", "").rstrip("/")
-        if person_details.get("twitter_url"):
-            twitter_profile_url = "https://" + person_details.get("twitter_url", "").rstrip("/")
-        if person_details.get("github_url"):
-            github_profile_url = "https://" + person_details.get("github_url", "").rstrip("/")
+        # Add or update company
+        lazy = get_settings().enrichment.LAZY
+        # Committed before its enrichment is queued, the job runs in another session
+        company_db_obj = await companies_service.create(company.to_dict(), enrich=not lazy, auto_commit=lazy)
+        if lazy:
+            await queue_company_enrichment(task_queues.get("background-tasks"), company_db_obj)
 
-        with contextlib.suppress(Exception):
-            birth_date = datetime.strptime(person_details.get("birth_date", ""), "%Y-%m-%d").replace(tzinfo=UTC).date()
+        # Add person
+        obj = person_from_person_details(person_details, company_db_obj)
+        db_obj = await persons_service.upsert(obj.to_dict(), item_id=results[0].id if count > 0 else None)
+        return persons_service.to_schema(schema_type=Person, data=db_obj)
 
-        # Add or update company
-        company = CompanyCreate(
-            name=person_company_name,
-            url=person_company_url,
-            linkedin_profile_url=person_company_linkedin_url,
+    @post(
+        operation_id="BulkCreatePersonsFromURLs",
+        name="persons:bulk-create-from-urls",
+        summary="Create new persons from URLs in bulk.",
+        path=urls.PERSON_BULK_CREATE_FROM_URLS,
+    )
+    async def bulk_create_persons_from_urls(
+        self,
+        companies_service: CompanyService,
+        persons_service: PersonService,
+        task_queues: TaskQueues,
+        data: PersonBulkCreateFromURLs,
+    ) -> OffsetPagination[Person]:
+        """Create new persons from URLs, enriching them in bulk."""
+        profile_urls = {normalize_url(url): url.strip().rstrip("/") for url in data.urls if url.strip()}
+
+        # Check which persons already exist in the database
+        existing = await persons_service.list(
+            func.lower(PersonModel.linkedin_profile_url).in_(
+                [variant for url in profile_urls.values() for variant in profile_url_variants(url)],
+            ),
         )
-        company_db_obj = await companies_service.create(company.to_dict())
+        max_age = timedelta(days=get_settings().enrichment.MAX_AGE_DAYS)
+        up_to_date = [person for person in existing if person.updated_at > datetime.now(UTC) - max_age]
+        up_to_date_urls = {normalize_url(person.linkedin_profile_url or "") for person in up_to_date}
+        # Stale persons are updated by id, they may be stored with another spelling of their profile url
+        stale_ids = {
+            normalize_url(person.linkedin_profile_url or ""): person.id
+            for person in existing
+            if person not in up_to_date
+        }
 
-        if (
-            company_db_obj.url
-            and person_details.get("work_email")
-            and get_domain_from_email(person_details["work_email"])
-            == get_domain(
-                company_db_obj.url,
+        # Extract persons from data provider
+        try:
+            persons_details = await get_persons_details(
+                url for normalized, url in profile_urls.items() if normalized not in up_to_date_urls
             )
-        ):
-            work_email = person_details["work_email"]
+        except Exception as e:
+            error_msg = "Error extracting person details"
+            await logger.aerror(error_msg, exc_info=e)
+            raise HTTPException(status_code=500, detail="An unexpected error occurred.") from e
 
-        work_experiences = []
-        for work_ex in person_details.get("experience", []):
-            with contextlib.suppress(Exception):
-                work_experiences.append(
-                    WorkExperience(
-                        starts_at=datetime.strptime(work_ex.get("start_date"), "%Y-%m").replace(tzinfo=UTC).date(),
-                        title=work_ex.get("title", {}).get("name", "Unknown"),
-                        company_name=work_ex.get("company", {}).get("name", "Unknown"),
-                        company_url=work_ex.get("company", {}).get("website"),
-                        company_linkedin_profile_url=work_ex.get("linkedin_url"),
-                        ends_at=datetime.strptime(work_ex.get("end_date"), "%Y-%m").replace(tzinfo=UTC).date()
-                        if work_ex.get("end_date")
-                        else None,
-                    ),
-                )
+        lazy = get_settings().enrichment.LAZY
+        person_objects = []
+        stale_person_objects = []
+        # Companies are committed before their enrichment is queued, the job runs in another session
+        for url, person_details in persons_details.items():
+            company = company_from_person_details(person_details)
+            if company is None:
+                await logger.awarn("Company not found in person details", url=url, person_details=person_details)
+                continue
+            company_db_obj = await companies_service.create(company.to_dict(), enrich=not lazy, auto_commit=lazy)
+            if lazy:
+                await queue_company_enrichment(task_queues.get("background-tasks"), company_db_obj)
+            person_object = person_from_person_details(person_details, company_db_obj).to_dict()
+            if person_id := stale_ids.get(normalize_url(url)):
+                stale_person_objects.append({**person_object, "id": person_id})
+            else:
+                person_objects.append(person_object)
 
-        # Add person
-        # TODO: Move this code into a provider specific code
-        obj = PersonCreate(
-            first_name=person_details.get("first_name"),
-            last_name=person_details.get("last_name"),
-            full_name=person_details.get("full_name"),
-            headline=person_details.get("headline") or person_details.get("summary"),
-            title=person_details.get("job_title"),
-            summary=person_details.get("job_summary"),
-            occupation=person_details.get("job_title_role"),
-            industry=person_details.get("industry"),
-            linkedin_profile_url=linkedin_profile_url,
-            twitter_profile_url=twitter_profile_url,
-            github_profile_url=github_profile_url,
-            location=Location(
-                country=person_details.get("location_country"),
-                region=person_details.get("location_region"),
-                city=person_details.get("location_locality"),
-            ),
-            personal_emails=person_details.get("personal_emails", []),
-            work_email=work_email,
-            phone_numbers=person_details.get("phone_numbers", []),
-            birth_date=birth_date,
-            work_experiences=work_experiences,
-            skills=person_details.get("skills"),
-            company_id=str(company_db_obj.id),
+        upserted = (
+            await persons_service.upsert_many(person_objects, match_fields=["linkedin_profile_url"])
+            if person_objects
+            else []
         )
-        db_obj = await persons_service.upsert(obj.to_dict(), item_id=results[0].id if count > 0 else None)
-        return persons_service.to_schema(schema_type=Person, data=db_obj)
+        updated = await persons_service.upsert_many(stale_person_objects) if stale_person_objects else []
+        results = [*up_to_date, *updated, *upserted]
+        return persons_service.to_schema(data=results, total=len(results), schema_type=Person)
 
     @get(
         operation_id="GetPerson",
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import date, datetime  # noqa: TCH003
+from typing import Annotated
 from uuid import UUID  # noqa: TCH003
 
 import msgspec
@@ -75,6 +76,13 @@ class PersonCreateFromURL(CamelizedBaseStruct):
     url: str
 
 
+class PersonBulkCreateFromURLs(CamelizedBaseStruct):
+    """A persons bulk create from URLs schema."""
+
+    urls: Annotated[list[str], msgspec.Meta(max_length=100)]
+    """Profile urls, limited so that a single request cannot spend an unbounded number of PDL credits."""
+
+
 class PersonUpdate(CamelizedBaseStruct, omit_defaults=True):
     """A person update schema."""
 
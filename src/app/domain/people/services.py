@@ -1,18 +1,29 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING, Any
 
+import structlog
+from advanced_alchemy.exceptions import RepositoryError
 from advanced_alchemy.service import SQLAlchemyAsyncRepositoryService, is_dict, is_msgspec_model, is_pydantic_model
+from sqlalchemy import select, update
 
 from app.db.models import Person
+from app.domain.companies.services import CompanyService
+from app.domain.companies.tasks import queue_company_enrichment
+from app.lib.limits import provider_budget
+from app.lib.pdl import get_persons_details
+from app.lib.tasks import TaskProgress
 
 from .repositories import PersonRepository
+from .utils import company_from_person_details, person_from_person_details
 
 if TYPE_CHECKING:
-
     from advanced_alchemy.service import ModelDictT
+    from saq import Queue
 
 __all__ = ("PersonService",)
+logger = structlog.get_logger()
 
 
 class PersonService(SQLAlchemyAsyncRepositoryService[Person]):
@@ -25,6 +36,77 @@ class PersonService(SQLAlchemyAsyncRepositoryService[Person]):
         self.repository: PersonRepository = self.repository_type(**repo_kwargs)
         self.model_type = self.repository.model_type
 
+    async def refresh_stale(
+        self,
+        queue: Queue,
+        max_age_days: int,
+        limit: int,
+        batch_size: int,
+        progress: TaskProgress | None = None,
+    ) -> int:
+        """Enrich again the persons updated longest ago, within today's PDL budget.
+
+        Persons are fetched ``batch_size`` at a time through the bulk endpoint and each batch is committed once done.
+        New current companies are saved right away and their enrichment is queued on ``queue``.
+
+        Returns:
+            The number of persons refreshed.
+        """
+        progress = progress or TaskProgress()
+        companies_service = CompanyService(session=self.repository.session)
+        persons = list(
+            await self.repository.session.scalars(
+                select(Person)
+                .where(
+                    Person.linkedin_profile_url.is_not(None),
+                    Person.updated_at < datetime.now(UTC) - timedelta(days=max_age_days),
+                )
+                .order_by(Person.updated_at)
+                .limit(limit),
+            ),
+        )
+        granted = await provider_budget.take("pdl", len(persons))
+        progress.incr("persons_over_budget", len(persons) - granted)
+        persons = persons[:granted]
+
+        refreshed = 0
+        for i in range(0, len(persons), batch_size):
+            batch = {person.linkedin_profile_url: person for person in persons[i : i + batch_size]}
+            persons_details = await get_persons_details(batch, refresh=True)
+            not_found = []
+            companies = []
+            for url, person in batch.items():
+                person_details = persons_details.get(url)
+                company = company_from_person_details(person_details) if person_details else None
+                if person_details is None or company is None:
+                    not_found.append(person.id)
+                    progress.incr("persons_not_found")
+                    continue
+                try:
+                    async with self.repository.session.begin_nested():
+                        company_db_obj = await companies_service.create(company.to_dict(), enrich=False)
+                        data = person_from_person_details(person_details, company_db_obj).to_dict()
+                        await self.update(data, item_id=person.id)
+                except RepositoryError as e:
+                    await logger.awarn("Failed to save refreshed person", id=person.id, exc_info=e)
+                    progress.incr("persons_failed")
+                    continue
+                companies.append(company_db_obj)
+                refreshed += 1
+                progress.incr("persons_refreshed")
+
+            # Persons that were not found are checked again once they are stale
+            if not_found:
+                await self.repository.session.execute(
+                    update(Person).where(Person.id.in_(not_found)).values(updated_at=datetime.now(UTC)),
+                )
+            await self.repository.session.commit()
+            # Queued once committed, the jobs run in other sessions
+            for company_db_obj in companies:
+                await queue_company_enrichment(queue, company_db_obj)
+            await progress.save(progress=(i + len(batch)) / len(persons))
+        return refreshed
+
     async def to_model(self, data: ModelDictT[Person], operation: str | None = None) -> Person:
         if (is_msgspec_model(data) or is_pydantic_model(data)) and operation == "create" and data.slug is None:  # type: ignore[union-attr]
             data.slug = await self.repository.get_available_slug(data.name)  # type: ignore[union-attr]
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from structlog import get_logger
+
+from app.config.app import alchemy
+from app.config.base import get_settings
+from app.lib.tasks import TaskProgress
+
+from .services import PersonService
+
+if TYPE_CHECKING:
+    from saq.types import Context
+
+__all__ = ["refresh_stale_persons"]
+
+
+logger = get_logger()
+
+
+async def refresh_stale_persons(
+    ctx: Context,
+    *,
+    max_age_days: int | None = None,
+    limit: int | None = None,
+) -> int:
+    """Enrich again the persons updated longest ago."""
+    settings = get_settings().enrichment
+    max_age_days = max_age_days if max_age_days is not None else settings.MAX_AGE_DAYS
+    limit = limit if limit is not None else settings.REFRESH_LIMIT
+    progress = TaskProgress(ctx.get("job"))
+    await logger.ainfo("Refreshing stale persons", max_age_days=max_age_days, limit=limit)
+    async with PersonService.new(config=alchemy) as service:
+        persons_refreshed = await service.refresh_stale(
+            ctx["queue"],
+            max_age_days,
+            limit,
+            settings.REFRESH_BATCH_SIZE,
+            progress=progress,
+        )
+    await logger.ainfo("Stale person refresh complete", **progress.counters)
+    return persons_refreshed
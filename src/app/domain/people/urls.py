@@ -4,4 +4,5 @@ PERSON_DETAIL = "/api/persons/{company_id:uuid}"
 PERSON_UPDATE = "/api/persons/{company_id:uuid}"
 PERSON_CREATE = "/api/persons"
 PERSON_CREATE_FROM_URL = "/api/persons/from-url"
+PERSON_BULK_CREATE_FROM_URLS = "/api/persons/bulk-from-urls"
 PERSON_INDEX = "/api/persons/{company_id:uuid}"
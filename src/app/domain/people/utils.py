@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import contextlib
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from app.domain.companies.schemas import CompanyCreate
+from app.domain.people.schemas import PersonCreate
+from app.lib.pdl import normalize_url
+from app.lib.schema import Location, WorkExperience
+from app.lib.utils import get_domain, get_domain_from_email
+
+if TYPE_CHECKING:
+    from app.db.models import Company
+
+
+def profile_url_variants(url: str) -> list[str]:
+    """Lowercased spellings a profile url may be stored with."""
+    normalized = normalize_url(url)
+    return [f"{scheme}{www}{normalized}" for scheme in ("https://", "http://", "") for www in ("", "www.")]
+
+
+def company_from_person_details(person_details: dict[str, Any]) -> CompanyCreate | None:
+    """Get the current company of an enriched person."""
+    person_company_name = str(person_details.get("job_company_name", ""))
+    person_company_url = str(person_details.get("job_company_website", ""))
+    person_company_linkedin_url = str(person_details.get("job_company_linkedin_url"))
+
+    if not person_company_name and not person_company_url and not person_company_linkedin_url:
+        return None
+
+    return CompanyCreate(
+        name=person_company_name,
+        url=person_company_url,
+        linkedin_profile_url=person_company_linkedin_url,
+    )
+
+
+def person_from_person_details(person_details: dict[str, Any], company: Company) -> PersonCreate:
+    """Build a person from its enriched details."""
+    # TODO: Move this code into a provider specific code
+    linkedin_profile_url = None
+    twitter_profile_url = None
+    github_profile_url = None
+    birth_date = None
+    work_email = None
+
+    if person_details.get("linkedin_url"):
+        linkedin_profile_url = "https://" + person_details.get("linkedin_url", "").rstrip("/")
+    if person_details.get("twitter_url"):
+        twitter_profile_url = "https://" + person_details.get("twitter_url", "").rstrip("/")
+    if person_details.get("github_url"):
+        github_profile_url = "https://" + person_details.get("github_url", "").rstrip("/")
+
+    with contextlib.suppress(Exception):
+        birth_date = datetime.strptime(person_details.get("birth_date", ""), "%Y-%m-%d").replace(tzinfo=UTC).date()
+
+    if (
+        company.url
+        and person_details.get("work_email")
+        and get_domain_from_email(person_details["work_email"])
+        == get_domain(
+            company.url,
+        )
+    ):
+        work_email = person_details["work_email"]
+
+    work_experiences = []
+    for work_ex in person_details.get("experience", []):
+        with contextlib.suppress(Exception):
+            work_experiences.append(
+                WorkExperience(
+                    starts_at=datetime.strptime(work_ex.get("start_date"), "%Y-%m").replace(tzinfo=UTC).date(),
+                    title=work_ex.get("title", {}).get("name", "Unknown"),
+                    company_name=work_ex.get("company", {}).get("name", "Unknown"),
+                    company_url=work_ex.get("company", {}).get("website"),
+                    company_linkedin_profile_url=work_ex.get("linkedin_url"),
+                    ends_at=datetime.strptime(work_ex.get("end_date"), "%Y-%m").replace(tzinfo=UTC).date()
+                    if work_ex.get("end_date")
+                    else None,
+                ),
+            )
+
+    return PersonCreate(
+        first_name=person_details.get("first_name"),
+        last_name=person_details.get("last_name"),
+        full_name=person_details.get("full_name"),
+        headline=person_details.get("headline") or person_details.get("summary"),
+        title=person_details.get("job_title"),
+        summary=person_details.get("job_summary"),
+        occupation=person_details.get("job_title_role"),
+        industry=person_details.get("industry"),
+        linkedin_profile_url=linkedin_profile_url,
+        twitter_profile_url=twitter_profile_url,
+        github_profile_url=github_profile_url,
+        location=Location(
+            country=person_details.get("location_country"),
+            region=person_details.get("location_region"),
+            city=person_details.get("location_locality"),
+        ),
+        personal_emails=person_details.get("personal_emails", []),
+        work_email=work_email,
+        phone_numbers=person_details.get("phone_numbers", []),
+        birth_date=birth_date,
+        work_experiences=work_experiences,
+        skills=person_details.get("skills"),
+        company_id=str(company.id),
+    )
@@ -1,15 +1,70 @@
+from __future__ import annotations
+
+import asyncio
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
-from typing import Any
+from functools import partial
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
 
 import httpx
+import msgspec
 import structlog
 from google_play_scraper import app, search
+from google_play_scraper.exceptions import GooglePlayScraperException, NotFoundError
+from redis.exceptions import RedisError
 
+from app.lib.http import http_client
+from app.lib.schema import AppDetails
 from app.lib.utils import get_domain
 
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable
+
+    from litestar.stores.base import Store
+
 logger = structlog.get_logger()
 
+AppPlatform = Literal["ios", "android"]
+T = TypeVar("T")
+
+
+class PlayStore:
+    """Google Play scraper calls run on a dedicated thread pool.
+
+    ``google_play_scraper`` is synchronous, so calls are handed to a small pool of their own rather than blocking the
+    event loop or filling up the default executor. A call that takes longer than ``timeout`` seconds, including the
+    time spent waiting for a free thread, raises :class:`TimeoutError`. The thread itself can't be interrupted and is
+    only given back to the pool once the scrape returns.
+    """
+
+    def __init__(self, max_workers: int | None = None, timeout: float | None = None) -> None:
+        # Imported late, app.config imports the task modules which use this module
+        from app.config.base import get_settings
+
+        settings = get_settings().provider
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers if max_workers is not None else settings.PLAY_STORE_MAX_WORKERS,
+            thread_name_prefix="play-store",
+        )
+        self.timeout = timeout if timeout is not None else settings.PLAY_STORE_TIMEOUT
+
+    async def search(self, query: str) -> list[dict[str, Any]]:
+        """Search apps."""
+        return await self._run(partial(search, query))
+
+    async def app(self, app_id: str) -> dict[str, Any]:
+        """Get the details of an app."""
+        return await self._run(partial(app, app_id))
+
+    async def _run(self, func: Callable[[], T]) -> T:
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(self.executor, func), timeout=self.timeout)
+
+
+play_store = PlayStore()
+
 
 async def get_ios_app_url(company_url: str) -> str | None:
     """Get app url."""
@@ -23,7 +78,7 @@ async def get_ios_app_url(company_url: str) -> str | None:
     }
     params = {"term": company_domain, "entity": "software"}
 
-    async with httpx.AsyncClient() as client:
+    async with http_client("app_store") as client:
         response = await client.get("https://itunes.apple.com/search", headers=headers, params=params)
         data = response.json()
         results = data.get("results")
@@ -49,7 +104,11 @@ def extract_ios_app_id_from_url(app_url: str) -> str | None:
 
 
 async def get_ios_app_details(app_url: str) -> dict[str, Any]:
-    """Get app details."""
+    """Get app details, empty when the app does not exist.
+
+    Raises:
+        httpx.HTTPError: The App Store could not be reached, e.g. it is rate limiting requests.
+    """
     if not app_url:
         error_msg = "app url is required"
         raise ValueError(error_msg)
@@ -60,8 +119,9 @@ async def get_ios_app_details(app_url: str) -> dict[str, Any]:
     app_id = extract_ios_app_id_from_url(app_url)
     params = {"id": app_id}
 
-    async with httpx.AsyncClient() as client:
+    async with http_client("app_store") as client:
         response = await client.get("https://itunes.apple.com/lookup", headers=headers, params=params)
+        response.raise_for_status()
         data = response.json()
         results = data.get("results")
         if not results:
@@ -99,19 +159,29 @@ async def get_android_app_url(company_name: str, company_url: str) -> str | None
         error_msg = "company name and url are required"
         raise ValueError(error_msg)
 
-    search_results = search(company_name)
+    try:
+        search_results = await play_store.search(company_name)
+    except (TimeoutError, GooglePlayScraperException) as e:
+        await logger.awarn("Android app search failed.", company_name=company_name, exc_info=e)
+        return None
     if not search_results:
         await logger.awarn("Android app not found.", company_name=company_name)
         return None
 
-    company_domain = get_domain(company_url)
+    app_ids = []
     for result in search_results:
         app_id = result.get("appId")
         if not app_id:
-            await logger.awarn("Android app not found.", company_name=company_name)
-            return None
+            break
+        app_ids.append(app_id)
 
-        app_details = app(app_id)
+    # Results are checked concurrently, the first one published by the company wins
+    company_domain = get_domain(company_url)
+    results = await asyncio.gather(*(play_store.app(app_id) for app_id in app_ids), return_exceptions=True)
+    for app_id, app_details in zip(app_ids, results, strict=True):
+        if isinstance(app_details, BaseException):
+            await logger.awarn("Failed to get Android app details.", app_id=app_id, exc_info=app_details)
+            continue
         if app_details.get("developerWebsite") and get_domain(app_details.get("developerWebsite")) == company_domain:
             return str(app_details.get("url")) if app_details.get("url") else None
 
@@ -120,14 +190,24 @@ async def get_android_app_url(company_name: str, company_url: str) -> str | None
 
 
 async def get_android_app_details(app_url: str) -> dict[str, Any]:
-    """Get app details."""
+    """Get app details, empty when the app does not exist.
+
+    Raises:
+        TimeoutError: Google Play did not answer in time.
+        GooglePlayScraperException: Google Play could not be scraped.
+    """
     if not app_url:
         error_msg = "app url is required"
         raise ValueError(error_msg)
 
+    app_id = extract_android_app_id_from_url(app_url)
+    try:
+        app_details = await play_store.app(app_id)
+    except NotFoundError as e:
+        await logger.awarn("Android app not found.", app_url=app_url, exc_info=e)
+        return {}
+
     try:
-        app_id = extract_android_app_id_from_url(app_url)
-        app_details = app(app_id)
         return {
             "id": app_id,
             "url": app_url,
@@ -142,3 +222,89 @@ async def get_android_app_details(app_url: str) -> dict[str, Any]:
     except (ValueError, TypeError, KeyError) as e:
         await logger.awarn("Android app not found.", app_url=app_url, exc_info=e)
         return {}
+
+
+class _CachedAppDetails(msgspec.Struct):
+    fetched_at: float
+    details: AppDetails | None = None
+
+
+_refreshing: set[str] = set()
+_background_tasks: set[asyncio.Task[None]] = set()
+
+
+class AppDetailsCache:
+    """App store details cached in a litestar store.
+
+    Entries older than ``refresh_after`` seconds are still served, while a fresh copy is fetched in the background.
+    Entries are dropped from the store after ``ttl`` seconds, apps that could not be found are cached too. A fetch
+    that fails, e.g. because the app store timed out, is not cached and leaves the current entry as it is. When the
+    store cannot be reached the details are fetched without caching them.
+    """
+
+    def __init__(
+        self,
+        store: Store,
+        ttl: int | None = None,
+        refresh_after: int | None = None,
+    ) -> None:
+        from app.config.base import get_settings
+
+        settings = get_settings().provider
+        self.store = store
+        self.ttl = ttl if ttl is not None else settings.APP_DETAILS_CACHE_TTL
+        self.refresh_after = refresh_after if refresh_after is not None else settings.APP_DETAILS_REFRESH_AFTER
+        self.fetchers: dict[AppPlatform, Callable[[str], Awaitable[dict[str, Any]]]] = {
+            "ios": get_ios_app_details,
+            "android": get_android_app_details,
+        }
+
+    async def get(self, platform: AppPlatform, app_url: str) -> AppDetails | None:
+        """Get the details of an app, fetching them on a cache miss."""
+        key = f"{platform}:{app_url}"
+        try:
+            cached = await self.store.get(key)
+        except RedisError as e:
+            await logger.awarn("Failed to read app details cache", key=key, exc_info=e)
+            cached = None
+        if cached is None:
+            return await self._fetch(platform, app_url)
+
+        entry = msgspec.json.decode(cached, type=_CachedAppDetails)
+        if time.time() - entry.fetched_at > self.refresh_after and key not in _refreshing:
+            _refreshing.add(key)
+            task = asyncio.create_task(self._refresh(platform, app_url))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        return entry.details
+
+    async def get_many(
+        self,
+        apps: Iterable[tuple[AppPlatform, str]],
+    ) -> dict[tuple[AppPlatform, str], AppDetails | None]:
+        """Get the details of several apps, cache misses are fetched concurrently."""
+        keys = list(dict.fromkeys(apps))
+        results = await asyncio.gather(*(self.get(platform, app_url) for platform, app_url in keys))
+        return dict(zip(keys, results, strict=True))
+
+    async def _fetch(self, platform: AppPlatform, app_url: str) -> AppDetails | None:
+        try:
+            details = await self.fetchers[platform](app_url)
+            app_details = AppDetails(**details) if details else None
+        except (httpx.HTTPError, TimeoutError, GooglePlayScraperException, ValueError, TypeError, KeyError) as e:
+            await logger.awarn("Failed to get app details", platform=platform, app_url=app_url, exc_info=e)
+            return None
+
+        key = f"{platform}:{app_url}"
+        entry = _CachedAppDetails(fetched_at=time.time(), details=app_details)
+        try:
+            await self.store.set(key, msgspec.json.encode(entry), expires_in=self.ttl)
+        except RedisError as e:
+            await logger.awarn("Failed to write app details cache", key=key, exc_info=e)
+        return app_details
+
+    async def _refresh(self, platform: AppPlatform, app_url: str) -> None:
+        try:
+            await self._fetch(platform, app_url)
+        finally:
+            _refreshing.discard(f"{platform}:{app_url}")
@@ -2,9 +2,10 @@
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
-import httpx
 import structlog
 
+from app.lib.http import http_client
+
 logger = structlog.get_logger()
 
 
@@ -19,7 +20,7 @@ async def search_repos(
     url = "https://api.github.com/search/repositories"
     params = {"q": query, "sort": sort, "order": order, "page": str(page), "per_page": str(per_page)}
 
-    async with httpx.AsyncClient() as client:
+    async with http_client("github") as client:
         response = await client.get(url, params=params)
         repos_data = response.json()
         repos = []
@@ -0,0 +1,133 @@
+"""Shrink scraped pages to the content an LLM needs."""
+
+from __future__ import annotations
+
+import json
+import re
+from html import unescape
+from typing import Any
+
+from bs4 import BeautifulSoup, Tag
+
+__all__ = ("extract_json_ld", "preprocess_html")
+
+_REMOVED_TAGS = ("script", "style", "noscript", "template", "svg", "canvas", "iframe", "link", "meta", "form", "button")
+_CHROME_TAGS = ("nav", "header", "footer", "aside")
+_CHROME_ROLES = {"navigation", "banner", "contentinfo", "complementary", "dialog", "alertdialog"}
+_BLOCK_TAGS = (
+    "p",
+    "div",
+    "section",
+    "article",
+    "main",
+    "li",
+    "ul",
+    "ol",
+    "dl",
+    "dt",
+    "dd",
+    "table",
+    "tr",
+    "td",
+    "th",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "blockquote",
+    "pre",
+)
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_SPACES = re.compile(r"[^\S\n]+")
+
+
+def extract_json_ld(soup: BeautifulSoup, type_: str) -> list[dict[str, Any]]:
+    """Get the JSON-LD objects of a type, e.g. ``JobPosting``, also from ``@graph`` and lists."""
+    found: list[dict[str, Any]] = []
+
+    def collect(value: Any) -> None:
+        if isinstance(value, list):
+            for item in value:
+                collect(item)
+        elif isinstance(value, dict):
+            types = value.get("@type")
+            if type_ == types or (isinstance(types, list) and type_ in types):
+                found.append(value)
+            collect(value.get("@graph"))
+
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            collect(json.loads(script.string or ""))
+        except ValueError:
+            continue
+    return found
+
+
+def _text(html_or_soup: BeautifulSoup | Tag | str) -> str:
+    soup = BeautifulSoup(html_or_soup, "html.parser") if isinstance(html_or_soup, str) else html_or_soup
+    # Only blocks end a line, inline tags like <strong> are part of the sentence around them
+    for br in soup.find_all("br"):
+        br.replace_with("\n")
+    for block in soup.find_all(_BLOCK_TAGS):
+        block.append("\n")
+    text = soup.get_text()
+    lines = (_SPACES.sub(" ", line).strip() for line in text.splitlines())
+    return _BLANK_LINES.sub("\n", "\n".join(line for line in lines if line)).strip()
+
+
+def _without_keywords(value: Any) -> Any:
+    """Drop the JSON-LD keywords like ``@type``, they carry no information for the LLM."""
+    if isinstance(value, dict):
+        return {key: _without_keywords(item) for key, item in value.items() if not key.startswith("@")}
+    if isinstance(value, list):
+        return [_without_keywords(item) for item in value]
+    return value
+
+
+def _job_posting(job_posting: dict[str, Any]) -> dict[str, Any]:
+    """Drop the JSON-LD keywords and turn the HTML description, which is often escaped, to text."""
+    result: dict[str, Any] = _without_keywords(job_posting)
+    if isinstance(result.get("description"), str):
+        result["description"] = _text(unescape(result["description"]))
+    return result
+
+
+def preprocess_html(html_content: str) -> str:
+    """Turn a scraped page into text, its JSON-LD ``JobPosting`` data and its links.
+
+    Scripts, styles, forms and page chrome (navigation, headers, footers, dialogs) are removed and whitespace is
+    collapsed. Links are listed separately, as the ones in the chrome often are the company website, its LinkedIn
+    page or a contact email. The description of a ``JobPosting`` usually repeats the page, so the page text is left
+    out when there is one.
+    """
+    soup = BeautifulSoup(html_content, "html.parser")
+    job_postings = [_job_posting(job_posting) for job_posting in extract_json_ld(soup, "JobPosting")]
+    title = soup.title.get_text(strip=True) if soup.title else ""
+
+    links: dict[str, None] = {}
+    for anchor in soup.find_all("a", href=True):
+        href = anchor["href"].strip()
+        if href.startswith(("http://", "https://", "mailto:")):
+            links[href] = None
+
+    for tag in soup.find_all([*_REMOVED_TAGS, *_CHROME_TAGS, "head"]):
+        tag.decompose()
+    for tag in soup.find_all(attrs={"role": True}):
+        if not tag.decomposed and tag.get("role") in _CHROME_ROLES:
+            tag.decompose()
+    for tag in soup.find_all(attrs={"aria-hidden": "true"}):
+        if not tag.decomposed:
+            tag.decompose()
+
+    sections = []
+    if title:
+        sections.append(f"Title: {title}")
+    if job_postings:
+        sections.append(f"JobPosting:\n{json.dumps(job_postings, ensure_ascii=False, separators=(',', ':'))}")
+    if not any(job_posting.get("description") for job_posting in job_postings):
+        sections.append(f"Text:\n{_text(soup)}")
+    if links:
+        sections.append("Links:\n" + "\n".join(links))
+    return "\n\n".join(sections)
@@ -0,0 +1,248 @@
+"""Pooled HTTP clients for third party providers."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any
+
+import httpx
+import structlog
+
+from app.lib.limits import circuit_breaker, rate_limiter
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from app.config.base import ProviderSettings
+
+__all__ = (
+    "HTTPClientRegistry",
+    "ProviderHTTPConfig",
+    "close_http_clients",
+    "http_client",
+    "http_clients",
+    "open_http_clients",
+    "send",
+)
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class ProviderHTTPConfig:
+    """Connection pool settings of a provider."""
+
+    max_connections: int = 20
+    """Maximum number of open connections."""
+    max_keepalive_connections: int = 10
+    """Maximum number of idle connections kept alive."""
+    keepalive_expiry: float = 30.0
+    """Seconds an idle connection is kept alive."""
+    timeout: float = 10.0
+    """Read, write and pool timeout in seconds."""
+    connect_timeout: float = 5.0
+    """Connect timeout in seconds."""
+
+    @classmethod
+    def from_env(cls, provider: str, default: ProviderHTTPConfig) -> ProviderHTTPConfig:
+        """Override the defaults with ``<PROVIDER>_HTTP_<FIELD>`` environment variables."""
+        settings = _provider_settings()
+
+        def override(setting: str, value: float) -> str:
+            return settings.override(provider, f"HTTP_{setting}") or str(value)
+
+        return cls(
+            max_connections=int(override("MAX_CONNECTIONS", default.max_connections)),
+            max_keepalive_connections=int(override("MAX_KEEPALIVE_CONNECTIONS", default.max_keepalive_connections)),
+            keepalive_expiry=float(override("KEEPALIVE_EXPIRY", default.keepalive_expiry)),
+            timeout=float(override("TIMEOUT", default.timeout)),
+            connect_timeout=float(override("CONNECT_TIMEOUT", default.connect_timeout)),
+        )
+
+
+DEFAULT_PROVIDER_HTTP_CONFIG = {
+    "pdl": ProviderHTTPConfig(max_connections=10, max_keepalive_connections=5, timeout=30.0),
+    "pitchbook": ProviderHTTPConfig(max_connections=10, max_keepalive_connections=5, timeout=30.0),
+    "app_store": ProviderHTTPConfig(max_connections=20, max_keepalive_connections=10),
+    "scraperapi": ProviderHTTPConfig(max_connections=20, max_keepalive_connections=10, timeout=60.0),
+    "github": ProviderHTTPConfig(max_connections=10, max_keepalive_connections=5),
+    "job_boards": ProviderHTTPConfig(max_connections=20, max_keepalive_connections=10),
+}
+"""Default pool settings per provider, can be overridden with ``<PROVIDER>_HTTP_<FIELD>``."""
+
+
+class HTTPClientRegistry:
+    """One pooled ``httpx.AsyncClient`` per provider.
+
+    Clients are opened with the application (or worker) and shared by every call to the provider, so that connections
+    and TLS sessions are reused. A client requested before ``open`` (e.g. from the CLI) is created on first use.
+    """
+
+    def __init__(self, configs: dict[str, ProviderHTTPConfig] | None = None) -> None:
+        self.configs = configs if configs is not None else DEFAULT_PROVIDER_HTTP_CONFIG
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def config(self, provider: str) -> ProviderHTTPConfig:
+        """Get the pool settings of a provider."""
+        return ProviderHTTPConfig.from_env(provider, self.configs.get(provider, ProviderHTTPConfig()))
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        """Get the client of a provider, creating it if needed."""
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._clients[provider] = self._create(provider)
+        return client
+
+    def _create(self, provider: str) -> httpx.AsyncClient:
+        config = self.config(provider)
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+        )
+
+    def open(self) -> None:
+        """Create the clients of all configured providers."""
+        for provider in self.configs:
+            self.get(provider)
+
+    async def aclose(self) -> None:
+        """Close all clients and their connections."""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+http_clients = HTTPClientRegistry()
+
+
+@asynccontextmanager
+async def http_client(provider: str) -> AsyncIterator[httpx.AsyncClient]:
+    """Borrow the shared client of a provider.
+
+    Unlike ``httpx.AsyncClient`` used as a context manager, the client is left open on exit.
+    """
+    yield http_clients.get(provider)
+
+
+async def open_http_clients(*_: Any) -> None:
+    """Open the provider clients, used as a Litestar ``on_startup`` and SAQ ``startup`` hook."""
+    http_clients.open()
+
+
+async def close_http_clients(*_: Any) -> None:
+    """Close the provider clients, used as a Litestar ``on_shutdown`` and SAQ ``shutdown`` hook."""
+    await http_clients.aclose()
+
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _provider_settings() -> ProviderSettings:
+    # Imported late, app.config imports this module
+    from app.config.base import get_settings
+
+    return get_settings().provider
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter, in seconds."""
+    settings = _provider_settings()
+    delay = settings.HTTP_RETRY_BACKOFF_BASE * 2 ** (attempt - 1)
+    return random.uniform(0, min(settings.HTTP_RETRY_BACKOFF_MAX, delay))  # noqa: S311
+
+
+def retry_after(response: httpx.Response) -> float | None:
+    """Get the number of seconds a provider asked to wait, from ``Retry-After`` or rate limit reset headers."""
+    value = response.headers.get("retry-after")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                return max((parsedate_to_datetime(value) - datetime.now(UTC)).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    if response.headers.get("x-ratelimit-remaining") in {"0", "0.0"}:
+        try:
+            reset = float(response.headers.get("x-ratelimit-reset", ""))
+        except ValueError:
+            return None
+        # Either seconds until the reset or an epoch timestamp
+        if reset > 1_000_000_000:
+            reset -= datetime.now(UTC).timestamp()
+        return max(reset, 0.0)
+    return None
+
+
+async def send(provider: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Send a request to a provider through its shared client.
+
+    Every attempt takes a token from the provider's rate limiter. Throttled (429) and server error responses, as well
+    as transport errors, are retried with jittered exponential backoff. A ``Retry-After`` is honoured and holds back
+    all workers for that long. Once the attempts are used up the last response is returned, or the transport error
+    raised, and a failure is recorded on the provider's circuit breaker. A trial call of an open circuit breaker is
+    released however it ends.
+
+    Raises:
+        ProviderUnavailableError: When the circuit breaker of the provider is open.
+    """
+    max_attempts = _provider_settings().HTTP_RETRY_MAX_ATTEMPTS
+    breaker = circuit_breaker(provider)
+    is_trial = breaker.check()
+    client = http_clients.get(provider)
+    attempt = 0
+    try:
+        while True:
+            attempt += 1
+            await rate_limiter.acquire(provider)
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == max_attempts:
+                    breaker.record_failure()
+                    raise
+                delay = backoff_delay(attempt)
+                await logger.awarn(
+                    "Retrying provider request",
+                    provider=provider,
+                    attempt=attempt,
+                    delay=delay,
+                    exc_info=e,
+                )
+            except httpx.HTTPError:
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    breaker.record_success()
+                    return response
+                wait = retry_after(response)
+                if response.status_code == 429:
+                    await rate_limiter.block(provider, wait if wait is not None else backoff_delay(attempt))
+                if attempt == max_attempts:
+                    # Throttling is left to the rate limiter, a trial ending in it is released below
+                    if response.status_code != 429:
+                        breaker.record_failure()
+                    return response
+                delay = wait if wait is not None else backoff_delay(attempt)
+                await logger.awarn(
+                    "Retrying provider request",
+                    provider=provider,
+                    attempt=attempt,
+                    delay=delay,
+                    status=response.status_code,
+                )
+            await asyncio.sleep(delay)
+    finally:
+        # Also when cancelled, e.g. by a step timeout, or failing on something else than the provider
+        if is_trial:
+            breaker.release()
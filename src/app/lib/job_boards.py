@@ -0,0 +1,217 @@
+"""Job posts read from the public APIs of applicant tracking systems."""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from html import escape, unescape
+from typing import Any
+from urllib.parse import urlparse
+
+import httpx
+import structlog
+from bs4 import BeautifulSoup
+
+from app.lib.html import extract_json_ld
+from app.lib.http import send
+from app.lib.schema import Location
+from app.lib.utils import get_domain
+
+__all__ = ("JobBoardPosting", "get_job_board_posting", "job_board_extractors", "register_job_board")
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class JobBoardPosting:
+    """The structured fields of a job post."""
+
+    title: str
+    description: str
+    """The body of the post, as HTML."""
+    company_name: str | None = None
+    company_url: str | None = None
+    company_linkedin_url: str | None = None
+    location: Location | None = None
+    location_name: str | None = None
+    """The location as displayed, used when it does not come split into its parts."""
+    team_name: str | None = None
+
+    def to_html(self) -> str:
+        """Render the post as a small page, for the extraction of what has no structured field (e.g. tools)."""
+        header = [self.title, self.company_name, self.location_name, self.team_name]
+        return "".join(f"<p>{escape(line)}</p>" for line in header if line) + self.description
+
+
+JobBoardExtractor = Callable[[list[str]], Awaitable[JobBoardPosting | None]]
+
+job_board_extractors: dict[str, JobBoardExtractor] = {}
+"""Extractors by domain, they get the path segments of the url of a job post."""
+
+
+def register_job_board(*domains: str) -> Callable[[JobBoardExtractor], JobBoardExtractor]:
+    """Register an extractor for the job posts hosted on the given domains."""
+
+    def register(extractor: JobBoardExtractor) -> JobBoardExtractor:
+        for domain in domains:
+            job_board_extractors[domain] = extractor
+        return extractor
+
+    return register
+
+
+async def get_job_board_posting(url: str) -> JobBoardPosting | None:
+    """Get a job post from the API of the job board hosting it.
+
+    The APIs do not tell the website of the company, it is read from the structured data of the post's page instead,
+    see ``get_hiring_organization_urls``.
+
+    Returns:
+        The post, or ``None`` when the job board is not supported or the post could not be read from its API.
+    """
+    extractor = job_board_extractors.get(get_domain(url))
+    if extractor is None:
+        return None
+    url = url if "://" in url else f"https://{url}"
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    try:
+        posting = await extractor(segments)
+        if posting is not None and not posting.company_url and not posting.company_linkedin_url:
+            posting.company_url, posting.company_linkedin_url = await get_hiring_organization_urls(url)
+    except (httpx.HTTPError, LookupError, ValueError, TypeError, AttributeError) as e:
+        await logger.awarn("Failed to read job post from its job board", url=url, exc_info=e)
+        return None
+    return posting
+
+
+async def get_hiring_organization_urls(url: str) -> tuple[str | None, str | None]:
+    """Get the website and LinkedIn page of the company from the JSON-LD ``JobPosting`` of a job post's page.
+
+    The ``url`` and ``sameAs`` of its ``hiringOrganization`` are used, links to the job board itself are skipped.
+
+    Returns:
+        The company url and company LinkedIn url, either is ``None`` when not found.
+    """
+    response = await send("job_boards", "GET", url, follow_redirects=True)
+    if response.status_code != 200:
+        return None, None
+    company_url = company_linkedin_url = None
+    for job_posting in extract_json_ld(BeautifulSoup(response.text, "html.parser"), "JobPosting"):
+        organization = job_posting.get("hiringOrganization")
+        if not isinstance(organization, dict):
+            continue
+        same_as = organization.get("sameAs")
+        for link in [organization.get("url"), *(same_as if isinstance(same_as, list) else [same_as])]:
+            if not isinstance(link, str) or not link.startswith(("http://", "https://")):
+                continue
+            domain = get_domain(link)
+            if domain.endswith("linkedin.com"):
+                company_linkedin_url = company_linkedin_url or link
+            elif not _is_job_board(domain):
+                company_url = company_url or link
+    return company_url, company_linkedin_url
+
+
+def _is_job_board(domain: str) -> bool:
+    """Whether a domain belongs to one of the supported job boards, e.g. ``greenhouse.io``."""
+    for board_domain in job_board_extractors:
+        site = ".".join(board_domain.split(".")[-2:])
+        if domain == site or domain.endswith(f".{site}"):
+            return True
+    return False
+
+
+async def _get_json(url: str, **params: Any) -> Any:
+    response = await send("job_boards", "GET", url, params=params or None)
+    if response.status_code == 404:
+        error_msg = "Job post not found."
+        raise LookupError(error_msg)
+    response.raise_for_status()
+    return response.json()
+
+
+@register_job_board("boards.greenhouse.io", "job-boards.greenhouse.io")
+async def _greenhouse(segments: list[str]) -> JobBoardPosting | None:
+    # /{board}/jobs/{id}
+    if len(segments) < 3 or segments[1] != "jobs":
+        return None
+    board, job_id = segments[0], segments[2]
+    job = await _get_json(f"https://boards-api.greenhouse.io/v1/boards/{board}/jobs/{job_id}")
+    company_name = job.get("company_name")
+    if not company_name:
+        company_name = (await _get_json(f"https://boards-api.greenhouse.io/v1/boards/{board}")).get("name")
+    departments = job.get("departments") or []
+    return JobBoardPosting(
+        title=job["title"],
+        # The content is escaped HTML
+        description=unescape(job.get("content") or ""),
+        company_name=company_name,
+        location_name=(job.get("location") or {}).get("name"),
+        team_name=departments[0].get("name") if departments else None,
+    )
+
+
+@register_job_board("jobs.lever.co", "jobs.eu.lever.co")
+async def _lever(segments: list[str]) -> JobBoardPosting | None:
+    # /{company}/{id}
+    if len(segments) < 2:
+        return None
+    company, posting_id = segments[0], segments[1]
+    posting = await _get_json(f"https://api.lever.co/v0/postings/{company}/{posting_id}")
+    categories = posting.get("categories") or {}
+    lists = "".join(
+        f"<h3>{escape(item.get('text', ''))}</h3><ul>{item.get('content', '')}</ul>"
+        for item in posting.get("lists", [])
+    )
+    return JobBoardPosting(
+        title=posting["text"],
+        description=f"{posting.get('description', '')}{lists}{posting.get('additional', '')}",
+        location_name=categories.get("location"),
+        team_name=categories.get("team"),
+    )
+
+
+@register_job_board("jobs.ashbyhq.com")
+async def _ashby(segments: list[str]) -> JobBoardPosting | None:
+    # /{organization}/{id}
+    if len(segments) < 2:
+        return None
+    organization, job_id = segments[0], segments[1]
+    board = await _get_json(f"https://api.ashbyhq.com/posting-api/job-board/{organization}")
+    job = next((job for job in board.get("jobs", []) if job.get("id") == job_id), None)
+    if job is None:
+        error_msg = "Job post not found."
+        raise LookupError(error_msg)
+    address = (job.get("address") or {}).get("postalAddress") or {}
+    return JobBoardPosting(
+        title=job["title"],
+        description=job.get("descriptionHtml") or "",
+        location=Location(
+            city=address.get("addressLocality"),
+            region=address.get("addressRegion"),
+            country=address.get("addressCountry"),
+        )
+        if address
+        else None,
+        location_name=job.get("location"),
+        team_name=job.get("team") or job.get("department"),
+    )
+
+
+@register_job_board("apply.workable.com")
+async def _workable(segments: list[str]) -> JobBoardPosting | None:
+    # /{account}/j/{shortcode}
+    if len(segments) < 3 or segments[1] != "j":
+        return None
+    account, shortcode = segments[0], segments[2]
+    job = await _get_json(f"https://apply.workable.com/api/v2/accounts/{account}/jobs/{shortcode}")
+    location = job.get("location") or {}
+    departments = job.get("department") or []
+    return JobBoardPosting(
+        title=job["title"],
+        description="".join(job.get(section) or "" for section in ("description", "requirements", "benefits")),
+        location=Location(city=location.get("city"), region=location.get("region"), country=location.get("country"))
+        if location
+        else None,
+        team_name=departments[0] if departments else None,
+    )
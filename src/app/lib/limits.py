@@ -0,0 +1,312 @@
+"""Concurrency caps, rate limits and circuit breakers for third party providers."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import structlog
+from redis.exceptions import RedisError
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+__all__ = (
+    "CircuitBreaker",
+    "DailyBudget",
+    "ProviderUnavailableError",
+    "RateLimiter",
+    "circuit_breaker",
+    "provider_budget",
+    "provider_limit",
+    "rate_limiter",
+)
+
+logger = structlog.get_logger()
+
+DEFAULT_PROVIDER_CONCURRENCY = {
+    "pdl": 5,
+    "openai": 10,
+}
+"""Default number of in-flight calls per provider, can be overridden with ``<PROVIDER>_CONCURRENCY``."""
+
+DEFAULT_PROVIDER_RATE_LIMIT = {
+    "pdl": (10.0, 10),
+    "pitchbook": (5.0, 5),
+}
+"""Default requests per second and burst size per provider, can be overridden with ``<PROVIDER>_RATE_LIMIT`` and
+``<PROVIDER>_RATE_BURST``. Providers without a rate limit are only throttled when they ask for it."""
+
+DEFAULT_PROVIDER_DAILY_BUDGET = {
+    "pdl": 1000,
+}
+"""Default number of calls per UTC day background refreshes may make to a provider, can be overridden with
+``<PROVIDER>_DAILY_BUDGET``. Providers without a budget are not capped."""
+
+_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def provider_limit(provider: str) -> asyncio.Semaphore:
+    """Get the semaphore capping concurrent calls to a provider within this process."""
+    semaphore = _semaphores.get(provider)
+    if semaphore is None:
+        # Imported late, app.config imports the task modules which use this module
+        from app.config.base import ProviderSettings
+
+        default = DEFAULT_PROVIDER_CONCURRENCY.get(provider, 10)
+        limit = int(ProviderSettings.override(provider, "CONCURRENCY") or default)
+        semaphore = _semaphores[provider] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+class ProviderUnavailableError(LookupError):
+    """A provider failed repeatedly and is not called until its circuit breaker closes again."""
+
+
+# Returns the number of milliseconds to wait before a token is available, 0 when one was taken. A provider that
+# asked to back off is blocked for everyone until ``blocked_until``.
+_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until')
+local blocked_until = tonumber(state[3]) or 0
+if blocked_until > now then
+    return blocked_until - now
+end
+if rate <= 0 then
+    return 0
+end
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate / 1000)
+local wait = 0
+if tokens < 1 then
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+else
+    tokens = tokens - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 60000)
+return wait
+"""
+
+_BLOCK_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local blocked_until = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+if blocked_until > current then
+    redis.call('HSET', KEYS[1], 'blocked_until', blocked_until)
+end
+if redis.call('PTTL', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[1]) + 60000)
+end
+return blocked_until
+"""
+
+
+class RateLimiter:
+    """Token bucket per provider kept in Redis, so that it is shared by all web workers and SAQ processes.
+
+    When Redis is unreachable calls are let through, they are still capped by ``provider_limit``.
+    """
+
+    def __init__(self, namespace: str | None = None) -> None:
+        self.namespace = namespace
+        self._scripts: tuple[AsyncScript, AsyncScript] | None = None
+
+    def _key(self, provider: str) -> str:
+        if self.namespace is None:
+            # Imported late, app.config imports the task modules which use this module
+            from app.config.base import get_settings
+
+            self.namespace = f"{get_settings().app.slug}:ratelimit"
+        return f"{self.namespace}:{provider}"
+
+    def scripts(self) -> tuple[AsyncScript, AsyncScript]:
+        """Get the token bucket and block scripts, registered on the application's Redis client."""
+        if self._scripts is None:
+            from app.config.base import get_settings
+
+            redis = get_settings().redis.get_client()
+            self._scripts = (redis.register_script(_BUCKET_SCRIPT), redis.register_script(_BLOCK_SCRIPT))
+        return self._scripts
+
+    @staticmethod
+    def limit(provider: str) -> tuple[float, int]:
+        """Get the requests per second and burst size of a provider, a rate of 0 means unlimited."""
+        from app.config.base import ProviderSettings
+
+        rate, burst = DEFAULT_PROVIDER_RATE_LIMIT.get(provider, (0.0, 1))
+        return (
+            float(ProviderSettings.override(provider, "RATE_LIMIT") or rate),
+            int(ProviderSettings.override(provider, "RATE_BURST") or burst),
+        )
+
+    async def acquire(self, provider: str) -> None:
+        """Wait until a request to the provider is allowed."""
+        rate, burst = self.limit(provider)
+        acquire_script, _ = self.scripts()
+        while True:
+            try:
+                wait_ms = int(await acquire_script(keys=[self._key(provider)], args=[rate, max(burst, 1)]))
+            except RedisError as e:
+                await logger.awarn("Failed to acquire rate limit token", provider=provider, error=str(e))
+                return
+            if wait_ms <= 0:
+                return
+            await asyncio.sleep(wait_ms / 1000)
+
+    async def block(self, provider: str, seconds: float) -> None:
+        """Hold back every request to the provider for a while, e.g. when it answered with ``Retry-After``."""
+        _, block_script = self.scripts()
+        try:
+            await block_script(keys=[self._key(provider)], args=[max(int(seconds * 1000), 1)])
+        except RedisError as e:
+            await logger.awarn("Failed to block provider", provider=provider, error=str(e))
+
+
+# Returns the number of calls granted out of the ones asked for.
+_BUDGET_SCRIPT = """
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+local granted = math.max(0, math.min(tonumber(ARGV[1]), tonumber(ARGV[2]) - used))
+if granted > 0 then
+    redis.call('INCRBY', KEYS[1], granted)
+end
+redis.call('EXPIRE', KEYS[1], 172800)
+return granted
+"""
+
+
+class DailyBudget:
+    """Number of calls per UTC day kept in Redis, for work that can wait until tomorrow like background refreshes.
+
+    When Redis is unreachable nothing is granted.
+    """
+
+    def __init__(self, namespace: str | None = None) -> None:
+        self.namespace = namespace
+        self._script: AsyncScript | None = None
+
+    def _key(self, provider: str) -> str:
+        if self.namespace is None:
+            # Imported late, app.config imports the task modules which use this module
+            from app.config.base import get_settings
+
+            self.namespace = f"{get_settings().app.slug}:budget"
+        return f"{self.namespace}:{provider}:{datetime.now(UTC).date().isoformat()}"
+
+    def script(self) -> AsyncScript:
+        """Get the budget script, registered on the application's Redis client."""
+        if self._script is None:
+            from app.config.base import get_settings
+
+            self._script = get_settings().redis.get_client().register_script(_BUDGET_SCRIPT)
+        return self._script
+
+    @staticmethod
+    def limit(provider: str) -> int | None:
+        """Get the daily budget of a provider, ``None`` when it is not capped."""
+        from app.config.base import ProviderSettings
+
+        budget = ProviderSettings.override(provider, "DAILY_BUDGET")
+        if budget is not None:
+            return int(budget)
+        return DEFAULT_PROVIDER_DAILY_BUDGET.get(provider)
+
+    async def take(self, provider: str, calls: int) -> int:
+        """Take up to ``calls`` from today's budget of the provider.
+
+        Returns:
+            The number of calls that may be made.
+        """
+        budget = self.limit(provider)
+        if budget is None or calls <= 0:
+            return max(calls, 0)
+        try:
+            return int(await self.script()(keys=[self._key(provider)], args=[calls, budget]))
+        except RedisError as e:
+            await logger.awarn("Failed to take from the daily budget", provider=provider, error=str(e))
+            return 0
+
+
+class CircuitBreaker:
+    """Stop calling a provider for ``reset_timeout`` seconds after ``failure_threshold`` consecutive failures.
+
+    Once the timeout passed a single trial call is let through, the circuit closes again when it succeeds. A trial
+    that ends without an outcome, e.g. because it was cancelled, is released so that the next call is a trial again.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls to the provider are currently held back."""
+        return self.opened_at is not None
+
+    def check(self) -> bool:
+        """Raise ``ProviderUnavailableError`` if the provider should not be called.
+
+        Returns:
+            Whether the call is the trial call of an open circuit, which is to be released once it is done.
+        """
+        if self.opened_at is None:
+            return False
+        if self._trial or time.monotonic() - self.opened_at < self.reset_timeout:
+            error_msg = f"{self.provider} is unavailable, circuit breaker is open."
+            raise ProviderUnavailableError(error_msg)
+        self._trial = True
+        return True
+
+    def release(self) -> None:
+        """End the trial call, the circuit stays as it is unless its outcome was recorded."""
+        self._trial = False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit once the threshold is reached."""
+        self.failures += 1
+        self._trial = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("Opening circuit breaker", provider=self.provider, failures=self.failures)
+            self.opened_at = time.monotonic()
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def circuit_breaker(provider: str) -> CircuitBreaker:
+    """Get the circuit breaker of a provider within this process."""
+    breaker = _circuit_breakers.get(provider)
+    if breaker is None:
+        from app.config.base import get_settings
+
+        settings = get_settings().provider
+        breaker = _circuit_breakers[provider] = CircuitBreaker(
+            provider,
+            failure_threshold=int(
+                settings.override(provider, "CIRCUIT_BREAKER_THRESHOLD") or settings.CIRCUIT_BREAKER_THRESHOLD,
+            ),
+            reset_timeout=float(settings.override(provider, "CIRCUIT_BREAKER_RESET") or settings.CIRCUIT_BREAKER_RESET),
+        )
+    return breaker
+
+
+rate_limiter = RateLimiter()
+provider_budget = DailyBudget()
@@ -0,0 +1,130 @@
+"""Chat completions run in batches, for offline work that can wait for cheaper tokens."""
+
+from __future__ import annotations
+
+import json
+import uuid
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Protocol
+
+import structlog
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from openai import AsyncOpenAI
+
+__all__ = ("Batch", "BatchBackend", "LocalBatchBackend", "OpenAIBatchBackend")
+
+logger = structlog.get_logger()
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+"""Statuses of a batch after which none of its requests run anymore."""
+
+
+@dataclass
+class Batch:
+    """The state of a submitted batch."""
+
+    id: str
+    status: str
+    results: dict[str, str] = field(default_factory=dict)
+    """Message content of the completed requests, by custom id."""
+    failed: dict[str, dict[str, Any]] = field(default_factory=dict)
+    """Request body of the requests without result once the batch is done, by custom id."""
+
+    @property
+    def is_done(self) -> bool:
+        """Whether the batch reached a final status."""
+        return self.status in FINAL_STATUSES
+
+
+class BatchBackend(Protocol):
+    """Submits chat completion requests in bulk and reports on them."""
+
+    async def submit(self, requests: dict[str, dict[str, Any]]) -> str:
+        """Submit chat completion request bodies by custom id.
+
+        Returns:
+            The id of the batch.
+        """
+        ...
+
+    async def retrieve(self, batch_id: str) -> Batch:
+        """Get the state of a batch, with its results once it is done."""
+        ...
+
+
+class OpenAIBatchBackend:
+    """The OpenAI Batch API: requests are uploaded as a JSONL file and completed within 24 hours at half the price."""
+
+    def __init__(self, client: AsyncOpenAI) -> None:
+        self.client = client
+
+    async def submit(self, requests: dict[str, dict[str, Any]]) -> str:
+        lines = (
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": CHAT_COMPLETIONS_ENDPOINT, "body": body})
+            for custom_id, body in requests.items()
+        )
+        input_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def retrieve(self, batch_id: str) -> Batch:
+        openai_batch = await self.client.batches.retrieve(batch_id)
+        batch = Batch(id=batch_id, status=openai_batch.status)
+        if not batch.is_done:
+            return batch
+        # Expired and cancelled batches have results for the requests that completed in time
+        if openai_batch.output_file_id:
+            for line in await self._read_lines(openai_batch.output_file_id):
+                response = line.get("response") or {}
+                if response.get("status_code") == 200:
+                    batch.results[line["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        for line in await self._read_lines(openai_batch.input_file_id):
+            if line["custom_id"] not in batch.results:
+                batch.failed[line["custom_id"]] = line["body"]
+        return batch
+
+    async def _read_lines(self, file_id: str) -> list[dict[str, Any]]:
+        content = await self.client.files.content(file_id)
+        return [json.loads(line) for line in content.text.splitlines() if line.strip()]
+
+
+class LocalBatchBackend:
+    """Completes batches in-process, a stand-in for the batch endpoint in tests and development.
+
+    Requests are completed with ``complete`` when their batch is retrieved, a request for which it raises
+    is reported as failed.
+    """
+
+    def __init__(self, complete: Callable[[dict[str, Any]], Awaitable[str]]) -> None:
+        self.complete = complete
+        self.batches: dict[str, dict[str, dict[str, Any]]] = {}
+
+    async def submit(self, requests: dict[str, dict[str, Any]]) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        self.batches[batch_id] = dict(requests)
+        return batch_id
+
+    async def retrieve(self, batch_id: str) -> Batch:
+        requests = self.batches.get(batch_id)
+        if requests is None:
+            error_msg = f"Batch {batch_id} does not exist."
+            raise LookupError(error_msg)
+        batch = Batch(id=batch_id, status="completed")
+        for custom_id, body in requests.items():
+            try:
+                batch.results[custom_id] = await self.complete(body)
+            except Exception as e:  # noqa: BLE001
+                await logger.awarn("Failed to complete batch request", custom_id=custom_id, exc_info=e)
+                batch.failed[custom_id] = body
+        return batch
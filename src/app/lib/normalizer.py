@@ -0,0 +1,97 @@
+"""Map free-form names, e.g. the tools extracted from job posts, onto a canonical vocabulary."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from rapidfuzz import fuzz, process
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+__all__ = ("NameNormalizer",)
+
+
+class NameNormalizer:
+    """Normalize names to the closest canonical name, or leave them as they are when none is close enough.
+
+    Canonical names are deduplicated and lowercased once, a list of names is scored against all of them in a single
+    ``rapidfuzz.process.cdist`` call and results are kept in a bounded LRU cache, so that the vocabulary can grow to
+    thousands of names. Special cases (e.g. ``k8s``) take precedence over fuzzy matching.
+    """
+
+    def __init__(
+        self,
+        canonical_names: Iterable[str] = (),
+        special_cases: Mapping[str, str] | None = None,
+        *,
+        score_cutoff: float = 90,
+        cache_size: int = 4096,
+    ) -> None:
+        self.score_cutoff = score_cutoff
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, str | None] = OrderedDict()
+        self.canonical_names: list[str] = []
+        self._choices: list[str] = []
+        self.special_cases: dict[str, str] = {}
+        self.set_vocabulary(canonical_names, special_cases)
+
+    def set_vocabulary(self, canonical_names: Iterable[str], special_cases: Mapping[str, str] | None = None) -> None:
+        """Replace the canonical names and special cases, e.g. with the ones stored in the database.
+
+        The first spelling of names that only differ in case is kept.
+        """
+        names: dict[str, str] = {}
+        for name in canonical_names:
+            names.setdefault(name.strip().lower(), name.strip())
+        names.pop("", None)
+        self._choices = list(names)
+        self.canonical_names = list(names.values())
+        self.special_cases = {key.lower(): value for key, value in (special_cases or {}).items()}
+        self._cache.clear()
+
+    def normalize(self, name: str) -> str:
+        """Normalize a single name."""
+        return self.normalize_many([name])[0]
+
+    def normalize_many(self, names: Sequence[str]) -> list[str]:
+        """Normalize a list of names, scoring the ones not seen before in one batch."""
+        names = [name.strip() for name in names]
+        matches: dict[str, str | None] = {}
+        for name in names:
+            key = name.lower()
+            if key not in self.special_cases and key in self._cache:
+                self._cache.move_to_end(key)
+                matches[key] = self._cache[key]
+        missing = [
+            key
+            for key in dict.fromkeys(name.lower() for name in names)
+            if key not in matches and key not in self.special_cases
+        ]
+        if missing:
+            scored: list[str | None] = [None] * len(missing)
+            if self._choices:
+                scores = process.cdist(missing, self._choices, scorer=fuzz.token_set_ratio)
+                for i, row in enumerate(scores):
+                    best = int(row.argmax())
+                    if row[best] > self.score_cutoff:
+                        scored[i] = self.canonical_names[best]
+            for key, match in zip(missing, scored, strict=True):
+                matches[key] = match
+                self._remember(key, match)
+
+        return [self.special_cases.get(name.lower()) or matches.get(name.lower()) or name for name in names]
+
+    def normalize_items(self, items: list[dict[str, str]]) -> list[dict[str, str]]:
+        """Normalize the ``name`` of each item in place, e.g. the tools of a job post."""
+        named = [item for item in items if "name" in item]
+        for item, name in zip(named, self.normalize_many([item["name"] for item in named]), strict=True):
+            item["name"] = name
+        return items
+
+    def _remember(self, key: str, match: str | None) -> None:
+        self._cache[key] = match
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -1,25 +1,117 @@
+import asyncio
+import hashlib
 import json
 import os
-from typing import Any
+from collections.abc import Iterable
+from typing import Any, Literal
 
-import httpx
+import msgspec
 import structlog
+from redis.exceptions import RedisError
+
+from app.lib.http import send
+from app.lib.limits import provider_limit
+from app.lib.stores import provider_store
+from app.lib.utils import get_domain
 
 logger = structlog.get_logger()
 pdl_api_key = os.environ["PDL_API_KEY"]
 
+PDLEndpoint = Literal["company/enrich", "person/enrich", "person/search"]
 
-async def get_company_details(url: str | None = None, social_url: str | None = None) -> dict[str, Any]:
-    """Get company details."""
-    if not url and not social_url:
-        error_msg = "Either url or social_url is required"
-        raise ValueError(error_msg)
 
-    headers = {
+class _CachedResponse(msgspec.Struct):
+    status_code: int
+    data: Any = None
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a website or profile url, so that variants of it share a cache entry."""
+    url = url.strip().lower()
+    if "://" in url:
+        url = url.split("://", 1)[1]
+    domain, _, path = url.partition("/")
+    return f"{get_domain(domain)}/{path}".rstrip("/")
+
+
+def cache_key(endpoint: PDLEndpoint, params: dict[str, Any]) -> str:
+    """Build the cache key of a request from its normalized parameters."""
+    normalized = {
+        key: normalize_url(value) if key in {"website", "profile"} else value for key, value in params.items()
+    }
+    digest = hashlib.sha256(msgspec.json.encode(normalized, order="sorted")).hexdigest()
+    return f"{endpoint}:{digest}"
+
+
+async def _get(endpoint: PDLEndpoint, params: dict[str, Any], *, refresh: bool = False) -> tuple[int, Any]:
+    """Call an endpoint, answering from the response cache when possible.
+
+    Successful responses are cached for the TTL of the endpoint and "not found" responses for
+    ``PDL_NOT_FOUND_CACHE_TTL``. Other errors (e.g. rate limits or missing credits) are not cached. With ``refresh``
+    the cache is bypassed and overwritten.
+    """
+    key = cache_key(endpoint, params)
+    cached = await _get_cached(key) if not refresh else None
+    if cached is not None:
+        return cached.status_code, cached.data
+
+    url = f"https://api.peopledatalabs.com/v5/{endpoint}"
+    async with provider_limit("pdl"):
+        response = await send("pdl", "GET", url, headers=_headers(), params=params)
+    data = response.json()
+    await _set_cached(key, endpoint, response.status_code, data)
+    return response.status_code, data
+
+
+def _headers() -> dict[str, str]:
+    return {
         "accept": "application/json",
         "Content-Type": "application/json",
         "X-API-Key": pdl_api_key,
     }
+
+
+async def _get_cached(key: str) -> _CachedResponse | None:
+    try:
+        cached = await provider_store("pdl").get(key)
+    except RedisError as e:
+        await logger.awarn("Failed to read PDL response cache", key=key, exc_info=e)
+        return None
+    return msgspec.json.decode(cached, type=_CachedResponse) if cached is not None else None
+
+
+async def _set_cached(key: str, endpoint: PDLEndpoint, status_code: int, data: Any) -> None:
+    # Imported late, app.config imports the task modules which use this module
+    from app.config.base import get_settings
+
+    settings = get_settings().provider
+    if status_code == 200:
+        ttl = {
+            "company/enrich": settings.PDL_COMPANY_ENRICH_CACHE_TTL,
+            "person/enrich": settings.PDL_PERSON_ENRICH_CACHE_TTL,
+            "person/search": settings.PDL_PERSON_SEARCH_CACHE_TTL,
+        }[endpoint]
+    elif status_code == 404:
+        ttl = settings.PDL_NOT_FOUND_CACHE_TTL
+    else:
+        return
+    try:
+        await provider_store("pdl").set(key, msgspec.json.encode(_CachedResponse(status_code, data)), expires_in=ttl)
+    except RedisError as e:
+        await logger.awarn("Failed to write PDL response cache", key=key, exc_info=e)
+
+
+async def get_company_details(
+    url: str | None = None,
+    social_url: str | None = None,
+    *,
+    refresh: bool = False,
+) -> dict[str, Any]:
+    """Get company details."""
+    if not url and not social_url:
+        error_msg = "Either url or social_url is required"
+        raise ValueError(error_msg)
+
     params = {"titlecase": "true"}
 
     if url:
@@ -28,20 +120,18 @@ async def get_company_details(url: str | None = None, social_url: str | None = N
     if social_url:
         params["profile"] = social_url
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get("https://api.peopledatalabs.com/v5/company/enrich", headers=headers, params=params)
-        data = response.json()
-        if response.status_code != 200 or not data:
-            error_msg = "Company not found."
-            await logger.awarn(
-                error_msg,
-                status=response.status_code,
-                response=data,
-                url=url,
-                social_url=social_url,
-            )
-            raise LookupError(error_msg)
-        return data if isinstance(data, dict) else {}
+    status_code, data = await _get("company/enrich", params, refresh=refresh)
+    if status_code != 200 or not data:
+        error_msg = "Company not found."
+        await logger.awarn(
+            error_msg,
+            status=status_code,
+            response=data,
+            url=url,
+            social_url=social_url,
+        )
+        raise LookupError(error_msg)
+    return data if isinstance(data, dict) else {}
 
 
 async def get_person_details(social_url: str) -> dict[str, Any]:
@@ -50,22 +140,77 @@ async def get_person_details(social_url: str) -> dict[str, Any]:
         error_msg = "social_url is required"
         raise ValueError(error_msg)
 
-    headers = {
-        "accept": "application/json",
-        "Content-Type": "application/json",
-        "X-API-Key": pdl_api_key,
-    }
     params = {"titlecase": "true", "profile": social_url}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get("https://api.peopledatalabs.com/v5/person/enrich", headers=headers, params=params)
-        data = response.json()
-        if not data.get("data"):
-            error_msg = "Person not found."
-            await logger.awarn(error_msg, response=data, social_url=social_url)
-            raise LookupError(error_msg)
-        data = data.get("data")
-        return data if isinstance(data, dict) else {}
+    _, data = await _get("person/enrich", params)
+    if not data.get("data"):
+        error_msg = "Person not found."
+        await logger.awarn(error_msg, response=data, social_url=social_url)
+        raise LookupError(error_msg)
+    data = data.get("data")
+    return data if isinstance(data, dict) else {}
+
+
+async def get_persons_details(social_urls: Iterable[str], *, refresh: bool = False) -> dict[str, dict[str, Any]]:
+    """Get the details of several persons through the bulk enrichment endpoint.
+
+    Requests are split in chunks of ``PDL_BULK_CHUNK_SIZE`` profiles. Responses share the cache of
+    ``get_person_details``, so only profiles without a cached response are sent to PDL, or all of them with
+    ``refresh``.
+
+    Returns:
+        The details of the persons that were found, keyed by their social url.
+    """
+    social_urls = list(dict.fromkeys(url for url in social_urls if url))
+    keys = {url: cache_key("person/enrich", {"titlecase": "true", "profile": url}) for url in social_urls}
+    cached = await asyncio.gather(*(_get_cached(key) for key in keys.values())) if not refresh else [None] * len(keys)
+
+    responses: dict[str, tuple[int, Any]] = {}
+    missing: list[str] = []
+    for url, entry in zip(social_urls, cached, strict=True):
+        if entry is None:
+            missing.append(url)
+        else:
+            responses[url] = (entry.status_code, entry.data)
+
+    from app.config.base import get_settings
+
+    chunk_size = get_settings().provider.PDL_BULK_CHUNK_SIZE
+    chunks = [missing[i : i + chunk_size] for i in range(0, len(missing), chunk_size)]
+    for chunk_responses in await asyncio.gather(*(_bulk_person_enrich(chunk) for chunk in chunks)):
+        for url, (status_code, data) in chunk_responses.items():
+            await _set_cached(keys[url], "person/enrich", status_code, data)
+            responses[url] = (status_code, data)
+
+    details: dict[str, dict[str, Any]] = {}
+    for url, (status_code, data) in responses.items():
+        if status_code == 200 and isinstance(data, dict) and isinstance(data.get("data"), dict):
+            details[url] = data["data"]
+        else:
+            await logger.awarn("Person not found.", status=status_code, social_url=url)
+    return details
+
+
+async def _bulk_person_enrich(social_urls: list[str]) -> dict[str, tuple[int, Any]]:
+    """Enrich a chunk of profiles, responses are shaped like the ones of the person enrichment endpoint."""
+    payload = {
+        "titlecase": True,
+        "requests": [{"params": {"profile": [url]}, "metadata": {"profile": url}} for url in social_urls],
+    }
+    url = "https://api.peopledatalabs.com/v5/person/bulk"
+    async with provider_limit("pdl"):
+        response = await send("pdl", "POST", url, headers=_headers(), json=payload)
+    data = response.json()
+    if response.status_code != 200 or not isinstance(data, list):
+        await logger.awarn("Bulk person enrichment failed.", status=response.status_code, response=data)
+        return {}
+
+    responses: dict[str, tuple[int, Any]] = {}
+    for url, item in zip(social_urls, data, strict=False):
+        profile = (item.get("metadata") or {}).get("profile", url)
+        status_code = item.get("status", 500)
+        responses[profile] = (status_code, {"status": status_code, "data": item.get("data")})
+    return responses
 
 
 async def search_person_details(
@@ -76,7 +221,11 @@ async def search_person_details(
     org_name: str = "engineering",
     limit: int = 5,
 ) -> list[dict[str, Any]]:
-    """Get relevant persons."""
+    """Get relevant persons.
+
+    Raises:
+        LookupError: When the search failed, e.g. because of rate limits. No matches are an empty list.
+    """
     if not company_url:
         error_msg = "company_url is required"
         raise LookupError(error_msg)
@@ -84,12 +233,6 @@ async def search_person_details(
     if not levels:
         levels = ["cxo", "director", "vp"]
 
-    headers = {
-        "accept": "application/json",
-        "Content-Type": "application/json",
-        "X-API-Key": pdl_api_key,
-    }
-
     search_criteria = {
         "bool": {
             "must": [
@@ -133,14 +276,20 @@ async def search_person_details(
 
     search_criteria["bool"]["must"].append(role_criteria)
 
-    params: dict[str, str] = {"query": json.dumps(search_criteria), "size": str(limit), "titlecase": "true"}
+    params: dict[str, str] = {
+        "query": json.dumps(search_criteria, sort_keys=True),
+        "size": str(limit),
+        "titlecase": "true",
+    }
     await logger.ainfo("Searching relevant people", company_url=company_url, search_criteria=search_criteria)
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get("https://api.peopledatalabs.com/v5/person/search", headers=headers, params=params)
-        data: dict[str, list[dict[str, Any]]] = response.json()
-        if "data" not in data:
-            error_msg = "Person not found."
-            await logger.awarn(error_msg, response=data, company_url=company_url)
-            raise LookupError(error_msg)
-        return data.get("data", [])
+    data: dict[str, list[dict[str, Any]]]
+    status_code, data = await _get("person/search", params)
+    if status_code == 404:
+        # No one matches the search
+        return []
+    if "data" not in data:
+        error_msg = "Person not found."
+        await logger.awarn(error_msg, response=data, company_url=company_url)
+        raise LookupError(error_msg)
+    return data.get("data", [])
@@ -0,0 +1,89 @@
+"""Run dependent async steps concurrently."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Literal
+
+import structlog
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+
+__all__ = ("Step", "StepStatus", "run_steps")
+
+logger = structlog.get_logger()
+
+StepStatus = Literal["done", "timeout", "failed", "skipped"]
+
+
+@dataclass(frozen=True)
+class Step:
+    """A unit of work of a pipeline."""
+
+    name: str
+    run: Callable[[], Awaitable[None]]
+    """Does the work, results are expected to be written to a shared object."""
+    timeout: float
+    """Seconds after which the step is cancelled, leaving its results unset."""
+    after: tuple[str, ...] = field(default_factory=tuple)
+    """Names of the steps this one waits for."""
+
+
+async def run_steps(steps: Sequence[Step]) -> dict[str, StepStatus]:
+    """Run steps as soon as the steps they depend on finished, so that independent ones run concurrently.
+
+    A step that times out or raises does not fail the pipeline, the steps that depend on it are skipped. The exception
+    of a failed step is logged.
+
+    Returns:
+        The status of each step.
+    """
+    _check_graph(steps)
+
+    statuses: dict[str, StepStatus] = {}
+    done = {step.name: asyncio.Event() for step in steps}
+
+    async def run(step: Step) -> None:
+        try:
+            for name in step.after:
+                await done[name].wait()
+            if any(statuses[name] != "done" for name in step.after):
+                statuses[step.name] = "skipped"
+                return
+            try:
+                async with asyncio.timeout(step.timeout):
+                    await step.run()
+            except TimeoutError:
+                await logger.awarn("Step timed out", step=step.name, timeout=step.timeout)
+                statuses[step.name] = "timeout"
+            except Exception as e:  # noqa: BLE001
+                await logger.awarn("Step failed", step=step.name, exc_info=e)
+                statuses[step.name] = "failed"
+            else:
+                statuses[step.name] = "done"
+        finally:
+            done[step.name].set()
+
+    async with asyncio.TaskGroup() as task_group:
+        for step in steps:
+            task_group.create_task(run(step))
+    return statuses
+
+
+def _check_graph(steps: Sequence[Step]) -> None:
+    """Make sure all dependencies exist and there are no cycles, which would never finish."""
+    after = {step.name: set(step.after) for step in steps}
+    for name, dependencies in after.items():
+        unknown = dependencies - after.keys()
+        if unknown:
+            error_msg = f"Step {name} depends on unknown steps: {', '.join(sorted(unknown))}"
+            raise ValueError(error_msg)
+    resolved: set[str] = set()
+    while len(resolved) < len(after):
+        ready = {name for name, dependencies in after.items() if name not in resolved and dependencies <= resolved}
+        if not ready:
+            error_msg = f"Steps have circular dependencies: {', '.join(sorted(after.keys() - resolved))}"
+            raise ValueError(error_msg)
+        resolved |= ready
@@ -4,7 +4,13 @@ from datetime import date
 from typing import Any
 
 import httpx
+import msgspec
 import structlog
+from redis.exceptions import RedisError
+
+from app.lib.http import RETRYABLE_STATUS_CODES, send
+from app.lib.stores import provider_store
+from app.lib.utils import get_domain
 
 logger = structlog.get_logger()
 pb_api_key = os.environ["PB_API_KEY"]
@@ -24,28 +30,59 @@ pitchbook_round_map = {
 
 
 async def fetch_url(
-    client: httpx.AsyncClient,
     url: str,
     headers: dict[str, Any] | None = None,
     params: dict[str, Any] | None = None,
 ) -> Any:
-    """Fetch url."""
+    """Fetch url.
+
+    Returns an empty dict when there is no data, e.g. a company without financing.
+
+    Raises:
+        LookupError: When the request failed, even after retrying.
+    """
+    try:
+        response = await send("pitchbook", "GET", url, headers=headers or {}, params=params or {})
+    except httpx.TransportError as e:
+        await logger.awarn("Error while fetching data.", url=url, exc_info=e)
+        error_msg = "Failed to fetch data."
+        raise LookupError(error_msg) from e
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        error_msg = "Failed to fetch data."
+        await logger.awarn(error_msg, url=url, status=response.status_code)
+        raise LookupError(error_msg)
+    if response.status_code != 200 or not response.text:
+        return {}
+    return response.json()
+
+
+async def get_company_id(url: str, headers: dict[str, Any]) -> str:
+    """Resolve the PitchBook id of a company from its url.
+
+    The id of a domain does not change, so it is cached without expiry.
+    """
+    cache_key = f"company-id:{get_domain(url).lower()}"
+    cached = await _get_cached(cache_key)
+    if cached is not None:
+        return cached.decode()
+
+    data = await fetch_url("https://api.pitchbook.com/companies/search", headers=headers, params={"companyNames": url})
     try:
-        if not headers:
-            headers = {}
-        if not params:
-            params = {}
-        response = await client.get(url, headers=headers)
-        if response.status_code != 200 or not response.text:
-            return {}
-        return response.json()
-    except httpx.RequestError as e:
-        await logger.awarn("Error while fetching data.", exc_info=e)
-    return {}
-
-
-async def get_company_funding_data(url: str) -> dict[str, Any]:
-    """Get company investors."""
+        pb_company_id = str(data["items"][0]["companyId"])
+    except (KeyError, TypeError, IndexError) as e:
+        error_msg = "Company not found."
+        await logger.awarn(error_msg, response=data, url=url, exc_info=e)
+        raise LookupError(error_msg) from e
+    await _set_cached(cache_key, pb_company_id.encode())
+    return pb_company_id
+
+
+async def get_company_funding_data(url: str, *, refresh: bool = False) -> dict[str, Any]:
+    """Get company investors.
+
+    Investors and the most recent financing are cached for ``PB_FUNDING_CACHE_TTL`` seconds, unless ``refresh`` is
+    set or either is empty.
+    """
     if not url:
         error_msg = "url is required"
         raise ValueError(error_msg)
@@ -55,62 +92,78 @@ async def get_company_funding_data(url: str) -> dict[str, Any]:
         "Content-Type": "application/json",
         "Authorization": f"PB-Token {pb_api_key}",
     }
-    params = {"companyNames": url}
+    pb_company_id = await get_company_id(url, headers)
 
-    async with httpx.AsyncClient() as client:
-        # Fetch company pb id
-        response = await client.get("https://api.pitchbook.com/companies/search", headers=headers, params=params)
-        data = response.json()
-        try:
-            pb_company_id = data["items"][0]["companyId"]
-        except (KeyError, TypeError, IndexError) as e:
-            error_msg = "Company not found."
-            await logger.awarn(error_msg, response=data, url=url, exc_info=e)
-            raise LookupError(error_msg) from e
-
-        results: list[Any] = []
-        try:
+    results: list[Any] = []
+    try:
+        cache_key = f"funding:{pb_company_id}"
+        cached = None if refresh else await _get_cached(cache_key)
+        if cached is not None:
+            results = msgspec.json.decode(cached)
+        else:
             urls = [
                 f"https://api.pitchbook.com/companies/{pb_company_id}/active-investors",
                 f"https://api.pitchbook.com/companies/{pb_company_id}/most-recent-financing",
             ]
 
-            tasks = [fetch_url(client, url, headers=headers) for url in urls]
+            tasks = [fetch_url(url, headers=headers) for url in urls]
             results = await asyncio.gather(*tasks)
+            # Empty results, e.g. of a 4xx response, are not cached so that they are fetched again
+            if all(results):
+                # Imported late, app.config imports the task modules which use this module
+                from app.config.base import get_settings
+
+                ttl = get_settings().provider.PB_FUNDING_CACHE_TTL
+                await _set_cached(cache_key, msgspec.json.encode(results), expires_in=ttl)
 
-            # Get funding round name (Awesome API design Pitchbook!)
+        # Get funding round name (Awesome API design Pitchbook!)
+        try:
+            round_name = pitchbook_round_map[results[1]["lastFinancingDealType3"]["code"]]
+        except (KeyError, TypeError):
             try:
-                round_name = pitchbook_round_map[results[1]["lastFinancingDealType3"]["code"]]
+                round_name = pitchbook_round_map[results[1]["lastFinancingDealType2"]["code"]]
             except (KeyError, TypeError):
                 try:
-                    round_name = pitchbook_round_map[results[1]["lastFinancingDealType2"]["code"]]
+                    round_name = pitchbook_round_map[results[1]["lastFinancingDealType"]["code"]]
                 except (KeyError, TypeError):
-                    try:
-                        round_name = pitchbook_round_map[results[1]["lastFinancingDealType"]["code"]]
-                    except (KeyError, TypeError):
-                        round_name = "Series Unknown"
+                    round_name = "Series Unknown"
 
-            try:
-                announced_date = date.fromisoformat(results[1]["lastFinancingDate"])
-            except (KeyError, ValueError):
-                announced_date = None
+        try:
+            announced_date = date.fromisoformat(results[1]["lastFinancingDate"])
+        except (KeyError, ValueError):
+            announced_date = None
 
-            try:
-                money_raised = results[1]["lastFinancingSize"]["amount"]
-            except (KeyError, ValueError):
-                money_raised = None
-
-            return {
-                "investors": [
-                    item["investorName"]
-                    for item in results[0]
-                    if "individual" not in item["investorTypes"][0]["type"]["description"]
-                ],
-                "round_name": round_name,
-                "announced_date": announced_date,
-                "money_raised": money_raised,
-            }
-        except (KeyError, TypeError, IndexError) as e:
-            error_msg = "Failed to get round and investors"
-            await logger.awarn(error_msg, response=results, url=url, exc_info=e)
-            raise
+        try:
+            money_raised = results[1]["lastFinancingSize"]["amount"]
+        except (KeyError, ValueError):
+            money_raised = None
+
+        return {
+            "investors": [
+                item["investorName"]
+                for item in results[0]
+                if "individual" not in item["investorTypes"][0]["type"]["description"]
+            ],
+            "round_name": round_name,
+            "announced_date": announced_date,
+            "money_raised": money_raised,
+        }
+    except (KeyError, TypeError, IndexError) as e:
+        error_msg = "Failed to get round and investors"
+        await logger.awarn(error_msg, response=results, url=url, exc_info=e)
+        raise
+
+
+async def _get_cached(key: str) -> bytes | None:
+    try:
+        return await provider_store("pitchbook").get(key)
+    except RedisError as e:
+        await logger.awarn("Failed to read PitchBook cache", key=key, exc_info=e)
+        return None
+
+
+async def _set_cached(key: str, value: bytes, expires_in: int | None = None) -> None:
+    try:
+        await provider_store("pitchbook").set(key, value, expires_in=expires_in)
+    except RedisError as e:
+        await logger.awarn("Failed to write PitchBook cache", key=key, exc_info=e)
@@ -70,7 +70,7 @@ class Funding(CamelizedBaseStruct):
     round_name: FundingRound = FundingRound.SERIES_UNKNOWN
     money_raised: float | None = None
     announced_date: date | None = None
-    investors: list[Investor] = []
+    investors: list[Investor | str] = []
 
 
 class WorkExperience(CamelizedBaseStruct):
@@ -114,6 +114,21 @@ class OpportunityStage(enum.Enum):
     CUSTOMER = "Customer"
 
 
+class EnrichmentStatus(enum.Enum):
+    """Progress of filling in a record from the data providers."""
+
+    PENDING = "Pending"
+    ENRICHED = "Enriched"
+    FAILED = "Failed"
+
+
+class ToolKind(enum.Enum):
+    """What a name of the tool taxonomy stands for."""
+
+    TOOL = "Tool"
+    PROCESS = "Process"
+
+
 class OrgSize(CamelizedBaseStruct):
     """Org size data."""
 
@@ -1,6 +1,6 @@
 import os
 
-import httpx
+from app.lib.http import http_client
 
 scraper_api_key = os.environ["SCRAPERAPI_API_KEY"]
 
@@ -16,6 +16,6 @@ async def extract_url_content(url: str, render: bool = False, timeout: float = 6
         "render": str(render).lower(),
     }
 
-    async with httpx.AsyncClient() as client:
+    async with http_client("scraperapi") as client:
         response = await client.get("https://api.scraperapi.com", params=params, timeout=timeout)
         return response.text
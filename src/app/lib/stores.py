@@ -0,0 +1,21 @@
+"""Stores for provider responses, usable outside of a request."""
+
+from __future__ import annotations
+
+from litestar.stores.redis import RedisStore
+
+__all__ = ("provider_store",)
+
+_stores: dict[str, RedisStore] = {}
+
+
+def provider_store(name: str) -> RedisStore:
+    """Get a Redis store on the application's client, namespaced like the ones of ``app.stores``."""
+    store = _stores.get(name)
+    if store is None:
+        # Imported late, app.config imports the task modules which use this module
+        from app.config.base import get_settings
+
+        settings = get_settings()
+        store = _stores[name] = RedisStore(settings.redis.get_client(), namespace=f"{settings.app.slug}:{name}")
+    return store
@@ -0,0 +1,75 @@
+"""Helpers for long running background tasks."""
+
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from litestar.utils.module_loader import import_string
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from saq import Job
+    from saq.types import Context
+
+__all__ = ("TaskProgress", "lazy_task")
+
+
+@cache
+def lazy_task(path: str) -> Callable[..., Awaitable[Any]]:
+    """Refer to a task by its import path, importing it on its first run rather than when the queue is configured.
+
+    Task modules import ``app.config`` themselves, e.g. for ``alchemy``, so they cannot be imported while it loads.
+    The task is registered under the name of the function, as it would be when imported directly.
+    """
+    name = path.rpartition(".")[2]
+
+    async def task(ctx: Context, **kwargs: Any) -> Any:
+        return await import_string(path)(ctx, **kwargs)
+
+    task.__name__ = task.__qualname__ = name
+    return task
+
+
+class TaskProgress:
+    """Progress counters and a resume checkpoint for a background job.
+
+    Both are kept in ``job.meta`` so that they survive retries and can be polled through ``Queue.job``. When no job
+    is given (e.g. the work is run inline from the CLI) the state is only kept in memory.
+    """
+
+    def __init__(self, job: Job | None = None) -> None:
+        self.job = job
+        self.meta: dict[str, Any] = job.meta if job is not None else {}
+        self.counters: dict[str, int] = self.meta.setdefault("counters", {})
+        self.checkpoint: dict[str, list[str]] = self.meta.setdefault("checkpoint", {})
+
+    def incr(self, counter: str, amount: int = 1) -> None:
+        """Increment a progress counter."""
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def set(self, counter: str, value: int) -> None:
+        """Set a progress counter."""
+        self.counters[counter] = value
+
+    def is_done(self, scope: str, key: Any) -> bool:
+        """Check if an item was already processed by a previous attempt."""
+        return str(key) in self.checkpoint.get(scope, [])
+
+    def mark_done(self, scope: str, key: Any) -> None:
+        """Record an item as processed."""
+        self.checkpoint.setdefault(scope, []).append(str(key))
+
+    def clear(self, scope: str) -> None:
+        """Forget the processed items of a scope."""
+        self.checkpoint.pop(scope, None)
+
+    async def save(self, progress: float | None = None) -> None:
+        """Persist counters and checkpoint on the job."""
+        if self.job is None:
+            return
+        if progress is not None:
+            await self.job.update(meta=self.meta, progress=min(progress, 1.0))
+        else:
+            await self.job.update(meta=self.meta)
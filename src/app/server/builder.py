@@ -34,13 +34,14 @@ class ApplicationConfigurator(InitPluginProtocol, CLIPluginProtocol):
         """
 
     def on_cli_init(self, cli: Group) -> None:
-        from app.cli.commands import user_management_app
+        from app.cli.commands import job_management_app, user_management_app
         from app.config import get_settings
 
         settings = get_settings()
         self.redis = settings.redis.get_client()
         self.app_slug = settings.app.slug
         cli.add_command(user_management_app)
+        cli.add_command(job_management_app)
 
     def on_app_init(self, app_config: AppConfig) -> AppConfig:
         """Configure application for use with SQLAlchemy.
@@ -54,7 +55,9 @@ class ApplicationConfigurator(InitPluginProtocol, CLIPluginProtocol):
 
         from app.config import constants, get_settings
         from app.db.models import User as UserModel
+        from app.domain.jobs.taxonomy import tool_taxonomy
         from app.lib.exceptions import ApplicationError, exception_to_http_response
+        from app.lib.http import close_http_clients, open_http_clients
 
         settings = get_settings()
         self.redis = settings.redis.get_client()
@@ -64,6 +67,11 @@ class ApplicationConfigurator(InitPluginProtocol, CLIPluginProtocol):
             key_builder=self._cache_key_builder,
         )
         app_config.stores = StoreRegistry(default_factory=self.redis_store_factory)
+        app_config.on_startup.append(open_http_clients)
+        app_config.on_startup.append(tool_taxonomy.start)
+        # Hooks run in order, the taxonomy listener is stopped while Redis is still open
+        app_config.on_shutdown.append(tool_taxonomy.stop)
+        app_config.on_shutdown.append(close_http_clients)
         app_config.on_shutdown.append(self.redis.aclose)  # type: ignore[attr-defined]
         app_config.signature_namespace.update(
             {
@@ -0,0 +1,60 @@
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from litestar.stores.memory import MemoryStore
+
+from app.lib.app_store import AppDetailsCache
+
+pytestmark = pytest.mark.anyio
+
+APP_URL = "https://play.google.com/store/apps/details?id=com.example"
+DETAILS = {
+    "id": "com.example",
+    "url": APP_URL,
+    "version": "1.0",
+    "release_date": datetime(2024, 1, 1, tzinfo=UTC),
+    "current_version_release_date": datetime(2024, 6, 1, tzinfo=UTC),
+    "rating": 4.5,
+    "rating_count": 100,
+    "price": 0,
+}
+
+
+def _cache(*results: dict[str, Any] | Exception) -> AppDetailsCache:
+    cache = AppDetailsCache(MemoryStore())
+    remaining = list(results)
+
+    async def fetch(app_url: str) -> dict[str, Any]:
+        result = remaining.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    cache.fetchers["android"] = fetch
+    return cache
+
+
+async def test_app_details_cache_caches_apps_that_are_not_found() -> None:
+    cache = _cache({})
+
+    assert await cache.get("android", APP_URL) is None
+    assert await cache.store.get(f"android:{APP_URL}") is not None
+
+
+async def test_app_details_cache_does_not_cache_failures() -> None:
+    cache = _cache(TimeoutError())
+
+    assert await cache.get("android", APP_URL) is None
+    assert await cache.store.get(f"android:{APP_URL}") is None
+
+
+async def test_app_details_cache_keeps_entry_when_refresh_fails() -> None:
+    cache = _cache(DETAILS, TimeoutError())
+    await cache.get("android", APP_URL)
+
+    await cache._refresh("android", APP_URL)
+
+    details = await cache.get("android", APP_URL)
+    assert details is not None
+    assert details.id == "com.example"
@@ -0,0 +1,99 @@
+"""Pre-processing of scraped job posts.
+
+The fixtures are saved job board pages, the test doubles as a benchmark of the prompt size (run with ``-s`` to see
+it). Tokens are estimated at 4 characters each, close enough to compare the raw page with its pre-processed form.
+"""
+
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from app.lib.html import extract_json_ld, preprocess_html
+
+FIXTURES = Path(__file__).parent / "fixtures" / "job_posts"
+
+# The values the job post extraction needs from each page
+EXPECTED_FIELDS = {
+    "greenhouse.html": [
+        "Senior Platform Engineer",
+        "Nimbus Labs",
+        "https://nimbuslabs.io",
+        "https://www.linkedin.com/company/nimbus-labs",
+        "careers@nimbuslabs.io",
+        "Austin",
+        "Platform team",
+        "Kubernetes",
+        "GitHub Actions",
+        "Argo CD",
+        "code review",
+        "documentation",
+    ],
+    "lever.html": [
+        "Backend Engineer, Payments",
+        "Orbital Pay",
+        "https://orbitalpay.com",
+        "https://www.linkedin.com/company/orbital-pay/",
+        "Berlin, Germany",
+        "Payments Core",
+        "Rust",
+        "Kafka",
+        "PostgreSQL",
+        "gRPC",
+        "Datadog",
+        "tests first",
+    ],
+    "workable.html": [
+        "Machine Learning Engineer",
+        "Quanta Health",
+        "https://quanta.health",
+        "https://www.linkedin.com/company/quanta-health",
+        "London",
+        "Clinical AI team",
+        "PyTorch",
+        "HuggingFace",
+        "ONNX",
+        "LlamaIndex",
+        "GitLab CI",
+        "code review",
+    ],
+}
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4
+
+
+@pytest.mark.parametrize("fixture", sorted(EXPECTED_FIELDS))
+def test_preprocess_html_keeps_the_extracted_fields(fixture: str) -> None:
+    raw = (FIXTURES / fixture).read_text()
+    content = preprocess_html(raw)
+    for field in EXPECTED_FIELDS[fixture]:
+        assert field in raw
+        assert field in content, field
+
+
+@pytest.mark.parametrize("fixture", sorted(EXPECTED_FIELDS))
+def test_preprocess_html_drops_scripts_styles_and_chrome(fixture: str) -> None:
+    content = preprocess_html((FIXTURES / fixture).read_text())
+    assert "addEventListener" not in content
+    assert "font:" not in content
+    assert "We use cookies" not in content
+    assert "Submit Application" not in content
+
+
+def test_preprocess_html_token_reduction() -> None:
+    for fixture in sorted(EXPECTED_FIELDS):
+        raw = (FIXTURES / fixture).read_text()
+        assert _tokens(preprocess_html(raw)) < _tokens(raw) * 0.05
+
+
+def test_extract_json_ld_finds_job_postings_in_graphs() -> None:
+    soup = BeautifulSoup((FIXTURES / "workable.html").read_text(), "html.parser")
+    job_postings = extract_json_ld(soup, "JobPosting")
+    assert [job_posting["title"] for job_posting in job_postings] == ["Machine Learning Engineer"]
+
+
+def test_preprocess_html_without_structured_data_keeps_the_page_text() -> None:
+    content = preprocess_html("<html><body><nav>Menu</nav><p>Hello <b>world</b></p><script>x()</script></body></html>")
+    assert content == "Text:\nHello world"
@@ -0,0 +1,154 @@
+import httpx
+import pytest
+
+from app.config.base import get_settings
+from app.lib import http
+from app.lib.job_boards import get_job_board_posting, job_board_extractors, register_job_board
+
+pytestmark = pytest.mark.anyio
+
+
+class _NoRateLimit:
+    async def acquire(self, provider: str) -> None:
+        return None
+
+    async def block(self, provider: str, seconds: float) -> None:
+        return None
+
+
+@pytest.fixture()
+def api(monkeypatch: "pytest.MonkeyPatch") -> dict[str, httpx.Response]:
+    """Responses of the job board APIs by url, requests to any other url get a 404."""
+    responses: dict[str, httpx.Response] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.get(str(request.url.copy_with(query=None)), httpx.Response(404))
+
+    monkeypatch.setattr(http, "rate_limiter", _NoRateLimit())
+    monkeypatch.setattr(get_settings().provider, "HTTP_RETRY_BACKOFF_BASE", 0.001)
+    monkeypatch.setitem(
+        http.http_clients._clients,
+        "job_boards",
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    return responses
+
+
+async def test_greenhouse(api: dict[str, httpx.Response]) -> None:
+    api["https://boards-api.greenhouse.io/v1/boards/nimbus/jobs/123"] = httpx.Response(
+        200,
+        json={
+            "title": "Senior Platform Engineer",
+            "content": "&lt;p&gt;We use Kubernetes&lt;/p&gt;",
+            "company_name": "Nimbus Labs",
+            "location": {"name": "Austin, TX"},
+            "departments": [{"name": "Platform"}],
+        },
+    )
+    posting = await get_job_board_posting("https://boards.greenhouse.io/nimbus/jobs/123?gh_src=abc")
+    assert posting is not None
+    assert posting.title == "Senior Platform Engineer"
+    assert posting.company_name == "Nimbus Labs"
+    assert posting.description == "<p>We use Kubernetes</p>"
+    assert posting.to_html() == (
+        "<p>Senior Platform Engineer</p><p>Nimbus Labs</p><p>Austin, TX</p><p>Platform</p><p>We use Kubernetes</p>"
+    )
+
+
+async def test_company_urls_from_the_page(api: dict[str, httpx.Response]) -> None:
+    api["https://boards-api.greenhouse.io/v1/boards/nimbus/jobs/123"] = httpx.Response(
+        200,
+        json={"title": "Senior Platform Engineer", "content": "", "company_name": "Nimbus Labs"},
+    )
+    api["https://boards.greenhouse.io/nimbus/jobs/123"] = httpx.Response(
+        200,
+        html="""<script type="application/ld+json">{"@type": "JobPosting", "hiringOrganization": {
+            "name": "Nimbus Labs", "url": "https://boards.greenhouse.io/nimbus",
+            "sameAs": ["https://nimbus.dev", "https://www.linkedin.com/company/nimbus-labs"]}}</script>""",
+    )
+    posting = await get_job_board_posting("https://boards.greenhouse.io/nimbus/jobs/123")
+    assert posting is not None
+    assert posting.company_url == "https://nimbus.dev"
+    assert posting.company_linkedin_url == "https://www.linkedin.com/company/nimbus-labs"
+
+
+async def test_lever(api: dict[str, httpx.Response]) -> None:
+    api["https://api.lever.co/v0/postings/orbital/abc-123"] = httpx.Response(
+        200,
+        json={
+            "text": "Backend Engineer, Payments",
+            "description": "<div>Payments at scale</div>",
+            "lists": [{"text": "What you will use", "content": "<li>Rust</li><li>Kafka</li>"}],
+            "additional": "<div>Benefits</div>",
+            "categories": {"location": "Berlin, Germany", "team": "Payments Core"},
+        },
+    )
+    posting = await get_job_board_posting("jobs.lever.co/orbital/abc-123/apply")
+    assert posting is not None
+    assert posting.title == "Backend Engineer, Payments"
+    assert "<li>Rust</li>" in posting.description
+    assert posting.location_name == "Berlin, Germany"
+    assert posting.team_name == "Payments Core"
+
+
+async def test_ashby(api: dict[str, httpx.Response]) -> None:
+    api["https://api.ashbyhq.com/posting-api/job-board/quanta"] = httpx.Response(
+        200,
+        json={
+            "jobs": [
+                {"id": "other", "title": "Designer"},
+                {
+                    "id": "job-1",
+                    "title": "Machine Learning Engineer",
+                    "descriptionHtml": "<p>PyTorch</p>",
+                    "team": "Clinical AI",
+                    "address": {"postalAddress": {"addressLocality": "London", "addressCountry": "United Kingdom"}},
+                },
+            ],
+        },
+    )
+    posting = await get_job_board_posting("https://jobs.ashbyhq.com/quanta/job-1")
+    assert posting is not None
+    assert posting.title == "Machine Learning Engineer"
+    assert posting.location is not None
+    assert posting.location.city == "London"
+    assert posting.location.country == "United Kingdom"
+    assert await get_job_board_posting("https://jobs.ashbyhq.com/quanta/missing") is None
+
+
+async def test_workable(api: dict[str, httpx.Response]) -> None:
+    api["https://apply.workable.com/api/v2/accounts/quanta/jobs/ABC123"] = httpx.Response(
+        200,
+        json={
+            "title": "Machine Learning Engineer",
+            "description": "<p>About</p>",
+            "requirements": "<p>ONNX</p>",
+            "location": {"city": "London", "country": "United Kingdom"},
+            "department": ["Clinical AI team"],
+        },
+    )
+    posting = await get_job_board_posting("https://apply.workable.com/quanta/j/ABC123/")
+    assert posting is not None
+    assert posting.description == "<p>About</p><p>ONNX</p>"
+    assert posting.team_name == "Clinical AI team"
+
+
+async def test_unsupported_or_unreadable_posts(api: dict[str, httpx.Response]) -> None:
+    assert await get_job_board_posting("https://example.com/careers/123") is None
+    # Not the url of a job post
+    assert await get_job_board_posting("https://boards.greenhouse.io/nimbus") is None
+    # Not found
+    assert await get_job_board_posting("https://boards.greenhouse.io/nimbus/jobs/404") is None
+    # Unexpected payload
+    api["https://api.lever.co/v0/postings/orbital/abc-123"] = httpx.Response(200, json={"description": "No title"})
+    assert await get_job_board_posting("https://jobs.lever.co/orbital/abc-123") is None
+
+
+async def test_register_job_board(monkeypatch: "pytest.MonkeyPatch") -> None:
+    monkeypatch.setattr("app.lib.job_boards.job_board_extractors", dict(job_board_extractors))
+
+    @register_job_board("careers.example.com")
+    async def _example(segments: list[str]) -> None:
+        assert segments == ["jobs", "1"]
+
+    assert await get_job_board_posting("https://careers.example.com/jobs/1") is None
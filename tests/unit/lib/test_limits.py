@@ -0,0 +1,155 @@
+import asyncio
+
+import httpx
+import pytest
+from redis.exceptions import RedisError
+
+from app.config.base import get_settings
+from app.lib import http, limits
+from app.lib.limits import CircuitBreaker, DailyBudget, ProviderUnavailableError
+
+pytestmark = pytest.mark.anyio
+
+
+class _NoRateLimit:
+    def __init__(self) -> None:
+        self.blocked: list[float] = []
+
+    async def acquire(self, provider: str) -> None:
+        return None
+
+    async def block(self, provider: str, seconds: float) -> None:
+        self.blocked.append(seconds)
+
+
+@pytest.fixture()
+def rate_limiter(monkeypatch: "pytest.MonkeyPatch") -> _NoRateLimit:
+    limiter = _NoRateLimit()
+    monkeypatch.setattr(http, "rate_limiter", limiter)
+    monkeypatch.setattr(get_settings().provider, "HTTP_RETRY_BACKOFF_BASE", 0.001)
+    return limiter
+
+
+def _mock_client(monkeypatch: "pytest.MonkeyPatch", provider: str, responses: list[httpx.Response]) -> list[int]:
+    calls: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return responses[min(len(calls), len(responses)) - 1]
+
+    monkeypatch.setitem(
+        http.http_clients._clients,
+        provider,
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    return calls
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"retry-after": "3"}, 3.0),
+        ({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "7"}, 7.0),
+        ({"x-ratelimit-remaining": "4", "x-ratelimit-reset": "7"}, None),
+        ({}, None),
+    ],
+)
+def test_retry_after(headers: dict[str, str], expected: float | None) -> None:
+    assert http.retry_after(httpx.Response(429, headers=headers)) == expected
+
+
+def test_backoff_delay_is_bounded() -> None:
+    for attempt in range(1, 20):
+        assert 0 <= http.backoff_delay(attempt) <= get_settings().provider.HTTP_RETRY_BACKOFF_MAX
+
+
+def test_circuit_breaker_opens_after_threshold() -> None:
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.check()
+    breaker.record_failure()
+    with pytest.raises(ProviderUnavailableError):
+        breaker.check()
+
+
+def test_circuit_breaker_lets_a_trial_call_through() -> None:
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.check()
+    with pytest.raises(ProviderUnavailableError):
+        breaker.check()
+    breaker.record_success()
+    breaker.check()
+    assert not breaker.is_open
+
+
+async def test_send_releases_a_throttled_trial_call(
+    monkeypatch: "pytest.MonkeyPatch",
+    rate_limiter: _NoRateLimit,
+) -> None:
+    breaker = CircuitBreaker("test-trial", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    monkeypatch.setitem(limits._circuit_breakers, "test-trial", breaker)
+    _mock_client(monkeypatch, "test-trial", [httpx.Response(429, headers={"retry-after": "0"})])
+    response = await http.send("test-trial", "GET", "https://example.com")
+    assert response.status_code == 429
+    assert breaker.is_open
+    assert breaker.check()
+
+
+async def test_send_releases_a_cancelled_trial_call(
+    monkeypatch: "pytest.MonkeyPatch",
+    rate_limiter: _NoRateLimit,
+) -> None:
+    breaker = CircuitBreaker("test-cancelled", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    monkeypatch.setitem(limits._circuit_breakers, "test-cancelled", breaker)
+
+    async def hang(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    monkeypatch.setitem(
+        http.http_clients._clients,
+        "test-cancelled",
+        httpx.AsyncClient(transport=httpx.MockTransport(hang)),
+    )
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(http.send("test-cancelled", "GET", "https://example.com"), 0.01)
+    assert breaker.check()
+
+
+async def test_send_retries_throttled_requests(monkeypatch: "pytest.MonkeyPatch", rate_limiter: _NoRateLimit) -> None:
+    calls = _mock_client(
+        monkeypatch,
+        "test-throttled",
+        [httpx.Response(429, headers={"retry-after": "0"}), httpx.Response(200, json={})],
+    )
+    response = await http.send("test-throttled", "GET", "https://example.com")
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert rate_limiter.blocked == [0.0]
+
+
+async def test_send_returns_last_response_once_attempts_are_used_up(
+    monkeypatch: "pytest.MonkeyPatch",
+    rate_limiter: _NoRateLimit,
+) -> None:
+    calls = _mock_client(monkeypatch, "test-unavailable", [httpx.Response(503)])
+    response = await http.send("test-unavailable", "GET", "https://example.com")
+    assert response.status_code == 503
+    assert len(calls) == get_settings().provider.HTTP_RETRY_MAX_ATTEMPTS
+
+
+async def test_daily_budget_does_not_cap_providers_without_a_budget() -> None:
+    assert await DailyBudget(namespace="test").take("test-unbudgeted", 7) == 7
+
+
+async def test_daily_budget_grants_nothing_without_redis(monkeypatch: "pytest.MonkeyPatch") -> None:
+    async def unreachable(**_: object) -> int:
+        raise RedisError
+
+    budget = DailyBudget(namespace="test")
+    monkeypatch.setenv("BUDGETED_DAILY_BUDGET", "10")
+    monkeypatch.setattr(budget, "script", lambda: unreachable)
+    assert await budget.take("budgeted", 3) == 0
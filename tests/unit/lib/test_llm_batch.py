@@ -0,0 +1,94 @@
+import json
+from typing import Any
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from app.lib.llm_batch import LocalBatchBackend, OpenAIBatchBackend
+
+pytestmark = pytest.mark.anyio
+
+
+def _request(content: str) -> dict[str, Any]:
+    return {"model": "gpt-test", "messages": [{"role": "user", "content": content}]}
+
+
+async def test_local_batch_backend() -> None:
+    async def complete(request: dict[str, Any]) -> str:
+        content = request["messages"][0]["content"]
+        if content == "fail":
+            raise ValueError(content)
+        return content.upper()
+
+    backend = LocalBatchBackend(complete)
+    batch_id = await backend.submit({"a": _request("hello"), "b": _request("fail")})
+    batch = await backend.retrieve(batch_id)
+    assert batch.is_done
+    assert batch.results == {"a": "HELLO"}
+    assert batch.failed == {"b": _request("fail")}
+    with pytest.raises(LookupError):
+        await backend.retrieve("batch_missing")
+
+
+def _openai_api(files: dict[str, str], batch: dict[str, Any]) -> AsyncOpenAI:
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/v1/files" and request.method == "POST":
+            # The JSONL upload is the single file part of the multipart body
+            body = request.read().decode()
+            files["file-input"] = body[body.index('{"custom_id"') : body.rindex("}") + 1]
+            return httpx.Response(
+                200,
+                json={
+                    "id": "file-input",
+                    "object": "file",
+                    "bytes": 1,
+                    "created_at": 0,
+                    "filename": "batch.jsonl",
+                    "purpose": "batch",
+                    "status": "processed",
+                },
+            )
+        if path.startswith("/v1/files/") and path.endswith("/content"):
+            return httpx.Response(200, text=files[path.split("/")[3]])
+        if path.startswith("/v1/batches"):
+            return httpx.Response(200, json=batch)
+        return httpx.Response(404)
+
+    return AsyncOpenAI(api_key="test", http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+async def test_openai_batch_backend() -> None:
+    batch = {
+        "id": "batch_1",
+        "object": "batch",
+        "endpoint": "/v1/chat/completions",
+        "input_file_id": "file-input",
+        "completion_window": "24h",
+        "created_at": 0,
+        "status": "in_progress",
+    }
+    files: dict[str, str] = {}
+    backend = OpenAIBatchBackend(_openai_api(files, batch))
+
+    batch_id = await backend.submit({"a": _request("hello"), "b": _request("world")})
+    assert batch_id == "batch_1"
+    lines = [json.loads(line) for line in files["file-input"].splitlines()]
+    assert [line["custom_id"] for line in lines] == ["a", "b"]
+    assert lines[0]["url"] == "/v1/chat/completions"
+    assert lines[0]["body"] == _request("hello")
+    assert not (await backend.retrieve(batch_id)).is_done
+
+    # Expired with one request completed in time
+    batch.update(status="expired", output_file_id="file-output")
+    files["file-output"] = json.dumps(
+        {
+            "custom_id": "a",
+            "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "HELLO"}}]}},
+        },
+    )
+    result = await backend.retrieve(batch_id)
+    assert result.is_done
+    assert result.results == {"a": "HELLO"}
+    assert result.failed == {"b": _request("world")}
@@ -0,0 +1,33 @@
+from app.lib.normalizer import NameNormalizer
+
+
+def test_vocabulary_is_deduplicated() -> None:
+    normalizer = NameNormalizer(["Python", "Flask", "python", " Flask ", "", "Go"])
+    assert normalizer.canonical_names == ["Python", "Flask", "Go"]
+
+
+def test_normalize_many() -> None:
+    normalizer = NameNormalizer(["Kubernetes", "GitHub Actions", "PostgreSQL"], {"k8s": "Kubernetes"})
+    assert normalizer.normalize_many([" kubernetes", "K8S", "github actions", "Terraform", "kubernetes"]) == [
+        "Kubernetes",
+        "Kubernetes",
+        "GitHub Actions",
+        "Terraform",
+        "Kubernetes",
+    ]
+    assert normalizer.normalize("postgresql") == "PostgreSQL"
+
+
+def test_normalize_items() -> None:
+    normalizer = NameNormalizer(["Code Review"])
+    items = [{"name": "code review "}, {"certainty": "High"}]
+    assert normalizer.normalize_items(items) == [{"name": "Code Review"}, {"certainty": "High"}]
+
+
+def test_cache_is_bounded_and_reset_with_the_vocabulary() -> None:
+    normalizer = NameNormalizer(["Rust"], cache_size=2)
+    assert normalizer.normalize_many(["rust", "a", "b"]) == ["Rust", "a", "b"]
+    assert list(normalizer._cache) == ["a", "b"]
+    normalizer.set_vocabulary(["A"])
+    assert not normalizer._cache
+    assert normalizer.normalize_many(["a", "rust"]) == ["A", "rust"]
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.lib.pipeline import Step, run_steps
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_run_steps_runs_independent_steps_concurrently() -> None:
+    started: list[str] = []
+    both_started = asyncio.Event()
+
+    async def step(name: str) -> None:
+        started.append(name)
+        if len(started) == 2:
+            both_started.set()
+        await asyncio.wait_for(both_started.wait(), 1)
+
+    statuses = await run_steps([Step("a", lambda: step("a"), 1), Step("b", lambda: step("b"), 1)])
+    assert statuses == {"a": "done", "b": "done"}
+
+
+async def test_run_steps_waits_for_dependencies() -> None:
+    order: list[str] = []
+
+    async def step(name: str) -> None:
+        await asyncio.sleep(0.01 if name == "first" else 0)
+        order.append(name)
+
+    await run_steps(
+        [Step("second", lambda: step("second"), 1, after=("first",)), Step("first", lambda: step("first"), 1)],
+    )
+    assert order == ["first", "second"]
+
+
+async def test_run_steps_returns_partial_results_on_timeout() -> None:
+    results: dict[str, int] = {}
+
+    async def fast() -> None:
+        results["fast"] = 1
+
+    async def slow() -> None:
+        await asyncio.sleep(1)
+        results["slow"] = 1
+
+    statuses = await run_steps(
+        [
+            Step("fast", fast, 1),
+            Step("slow", slow, 0.01),
+            Step("after_slow", fast, 1, after=("slow",)),
+        ],
+    )
+    assert statuses == {"fast": "done", "slow": "timeout", "after_slow": "skipped"}
+    assert results == {"fast": 1}
+
+
+async def test_run_steps_skips_dependents_of_failed_steps() -> None:
+    results: dict[str, int] = {}
+
+    async def fast() -> None:
+        results["fast"] = 1
+
+    async def failing() -> None:
+        error_msg = "provider error"
+        raise RuntimeError(error_msg)
+
+    statuses = await run_steps(
+        [
+            Step("fast", fast, 1),
+            Step("failing", failing, 1),
+            Step("after_failing", fast, 1, after=("failing",)),
+        ],
+    )
+    assert statuses == {"fast": "done", "failing": "failed", "after_failing": "skipped"}
+    assert results == {"fast": 1}
+
+
+async def test_run_steps_rejects_circular_dependencies() -> None:
+    async def noop() -> None:
+        return None
+
+    with pytest.raises(ValueError, match="circular"):
+        await run_steps([Step("a", noop, 1, after=("b",)), Step("b", noop, 1, after=("a",))])
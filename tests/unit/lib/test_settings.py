@@ -1,6 +1,7 @@
 import pytest
 
 from app.config import get_settings
+from app.config.base import ProviderSettings
 
 pytestmark = pytest.mark.anyio
 
@@ -10,3 +11,10 @@ def test_app_slug() -> None:
     settings = get_settings()
     settings.app.NAME = "My Application!"
     assert settings.app.slug == "my-application"
+
+
+def test_provider_retry_attempts_are_validated(monkeypatch: "pytest.MonkeyPatch") -> None:
+    """Test that a provider request is attempted at least once."""
+    monkeypatch.setenv("HTTP_RETRY_MAX_ATTEMPTS", "0")
+    with pytest.raises(ValueError, match="HTTP_RETRY_MAX_ATTEMPTS"):
+        ProviderSettings()
@@ -0,0 +1,160 @@
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import pytest
+from saq import Job
+from sqlalchemy.dialects import postgresql
+
+from app.config.base import get_settings
+from app.domain.opportunities import tasks, utils
+from app.domain.opportunities.services import OpportunityService
+from app.lib.llm_batch import Batch, LocalBatchBackend
+from app.lib.tasks import TaskProgress
+
+pytestmark = pytest.mark.anyio
+
+PITCH = "We sell a Kubernetes cost dashboard"
+
+
+class _Queue:
+    def __init__(self) -> None:
+        self.jobs: list[Job] = []
+
+    async def enqueue(self, job: Job) -> Job:
+        self.jobs.append(job)
+        return job
+
+
+class _SlowBatchBackend(LocalBatchBackend):
+    """Reports a batch as in progress the first time it is retrieved."""
+
+    def __init__(self, complete: Callable[[dict[str, Any]], Awaitable[str]]) -> None:
+        super().__init__(complete)
+        self.polled: set[str] = set()
+
+    async def retrieve(self, batch_id: str) -> Batch:
+        if batch_id not in self.polled:
+            self.polled.add(batch_id)
+            return Batch(id=batch_id, status="in_progress")
+        return await super().retrieve(batch_id)
+
+
+class _OpportunityService:
+    """Leaves the context of the opportunities it creates to the batch, like a scan over two job posts."""
+
+    job_post_ids = (uuid4(), uuid4())
+    opportunity_ids = (uuid4(), uuid4(), uuid4())
+    contexts: dict[UUID, list[dict[str, str]]] = {}
+
+    @classmethod
+    @asynccontextmanager
+    async def new(cls, config: Any) -> AsyncIterator["_OpportunityService"]:  # noqa: ARG003
+        yield cls()
+
+    async def scan(
+        self,
+        tenant_ids: list[str] | None,
+        last_n_days: int,
+        *,
+        progress: TaskProgress,
+        pending_contexts: utils.PendingContexts | None = None,
+    ) -> int:
+        assert pending_contexts is not None
+        # Two ICPs with the same pitch share the context of the first job post
+        for job_post_id, opportunity_id in zip(
+            (self.job_post_ids[0], *self.job_post_ids),
+            self.opportunity_ids,
+            strict=True,
+        ):
+            pending_contexts.add(
+                utils.context_cache_key(job_post_id, PITCH),
+                utils.context_request(f"<p>Job post {job_post_id}</p>", PITCH),
+                opportunity_id,
+            )
+        return len(self.opportunity_ids)
+
+    async def set_job_post_contexts(self, contexts: dict[UUID, list[dict[str, str]]]) -> int:
+        self.contexts.update(contexts)
+        return len(contexts)
+
+
+def _content(sentence: str) -> str:
+    return json.dumps({"result": [{"sentence": sentence, "reason": "Matches the pitch"}]})
+
+
+@pytest.fixture()
+def cache(monkeypatch: "pytest.MonkeyPatch") -> dict[str, list[dict[str, str]]]:
+    cached: dict[str, list[dict[str, str]]] = {}
+
+    async def set_cached_context(cache_key: str, context: list[dict[str, str]]) -> None:
+        cached[cache_key] = context
+
+    monkeypatch.setattr(utils, "set_cached_context", set_cached_context)
+    return cached
+
+
+async def test_scan_extracts_contexts_in_a_batch(
+    monkeypatch: "pytest.MonkeyPatch",
+    cache: dict[str, list[dict[str, str]]],
+) -> None:
+    first_job_post_id, second_job_post_id = _OpportunityService.job_post_ids
+    failing_key = utils.context_cache_key(second_job_post_id, PITCH)
+
+    async def complete(request: dict[str, Any]) -> str:
+        if str(second_job_post_id) in request["messages"][0]["content"]:
+            error_msg = "Request failed in the batch"
+            raise ValueError(error_msg)
+        return _content("Batched")
+
+    async def complete_context_request(request: dict[str, Any]) -> str:
+        return _content("Direct")
+
+    backend = _SlowBatchBackend(complete)
+    monkeypatch.setattr(utils, "context_batches", backend)
+    monkeypatch.setattr(utils, "complete_context_request", complete_context_request)
+    monkeypatch.setattr(tasks, "OpportunityService", _OpportunityService)
+    monkeypatch.setattr(_OpportunityService, "contexts", {})
+    monkeypatch.setattr(get_settings().scan, "CONTEXT_BATCH", True)
+    queue = _Queue()
+    ctx: dict[str, Any] = {"queue": queue}
+
+    assert await tasks.scan_opportunities(ctx) == 3
+    # Two context requests, one of them for two opportunities, and a poll right away
+    [batch_requests] = backend.batches.values()
+    assert len(batch_requests) == 2
+    [poll] = queue.jobs
+    assert poll.function == "poll_context_batch"
+    assert poll.scheduled == 0
+
+    # Polled again later while the batch is running
+    assert await tasks.poll_context_batch(ctx, **poll.kwargs) == 0
+    poll_again = queue.jobs[-1]
+    assert poll_again.function == "poll_context_batch"
+    assert poll_again.scheduled > 0
+    assert _OpportunityService.contexts == {}
+
+    # The request that failed in the batch is sent again directly
+    assert await tasks.poll_context_batch(ctx, **poll_again.kwargs) == 3
+    batched = [{"sentence": "Batched", "reason": "Matches the pitch"}]
+    direct = [{"sentence": "Direct", "reason": "Matches the pitch"}]
+    first, second, third = _OpportunityService.opportunity_ids
+    assert _OpportunityService.contexts == {first: batched, second: batched, third: direct}
+    assert cache == {utils.context_cache_key(first_job_post_id, PITCH): batched, failing_key: direct}
+
+
+async def test_set_job_post_contexts_only_fills_missing_contexts() -> None:
+    session = AsyncMock()
+    session.execute.return_value.rowcount = 1
+    service = OpportunityService(session=session)
+
+    context = [{"sentence": "Batched", "reason": "Matches the pitch"}]
+    assert await service.set_job_post_contexts({uuid4(): context, uuid4(): context}) == 2
+
+    # Opportunities are created with a JSON null context while it is extracted in a batch
+    statement = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "coalesce(jsonb_typeof(opportunity.context)" in statement
+    session.commit.assert_awaited_once()
@@ -0,0 +1,108 @@
+from datetime import date
+from typing import Any
+
+import msgspec
+import pytest
+
+from app.db.models.custom_types import (
+    CompanyCriteriaType,
+    FundingType,
+    JSONBType,
+    LocationType,
+    OpportunityContextType,
+    OrgSizeCriteriaType,
+    OrgSizeType,
+    PersonCriteriaType,
+    ProcessCriteriaType,
+    ProcessType,
+    SocialActivityType,
+    ToolCriteriaType,
+    ToolType,
+    WorkExperienceType,
+)
+from app.lib.schema import (
+    CompanyCriteria,
+    Funding,
+    FundingRound,
+    Investor,
+    Location,
+    OpportunityContext,
+    OrgSize,
+    OrgSizeCriteria,
+    PersonCriteria,
+    Process,
+    ProcessCriteria,
+    Scale,
+    SocialActivity,
+    Tool,
+    ToolCriteria,
+    WorkExperience,
+)
+
+
+def roundtrip(column_type: JSONBType, value: Any) -> Any:
+    """Bind a value and read it back as text, the way struct columns are selected."""
+    bound = column_type.process_bind_param(value, None)
+    return column_type.process_result_value(msgspec.json.encode(bound).decode(), None)
+
+
+@pytest.mark.parametrize(
+    ("column_type", "value", "expected"),
+    [
+        (LocationType(), {"city": "Berlin", "country": "DE"}, Location(city="Berlin", country="DE")),
+        (
+            FundingType(),
+            {
+                "round_name": "Series A",
+                "money_raised": 1000.0,
+                "investors": [{"name": "X", "linkedin_profile_url": "u"}],
+            },
+            Funding(
+                round_name=FundingRound.SERIES_A,
+                money_raised=1000.0,
+                investors=[Investor(name="X", linkedin_profile_url="u")],
+            ),
+        ),
+        (
+            WorkExperienceType(),
+            [{"starts_at": "2020-01-01", "title": "CTO", "company_name": "Acme", "location": {"city": "Paris"}}],
+            [
+                WorkExperience(
+                    starts_at=date(2020, 1, 1),
+                    title="CTO",
+                    company_name="Acme",
+                    location=Location(city="Paris"),
+                ),
+            ],
+        ),
+        (SocialActivityType(), [{"title": "Post", "link": "l"}], [SocialActivity(title="Post", link="l")]),
+        (OrgSizeType(), {"engineering": 10}, OrgSize(engineering=10)),
+        (ToolType(), [{"name": "Python", "certainty": "High"}], [Tool(name="Python", certainty=Scale.HIGH)]),
+        (ProcessType(), [{"name": "CI/CD"}], [Process(name="CI/CD")]),
+        (OrgSizeCriteriaType(), {"engineering_min": 5}, OrgSizeCriteria(engineering_min=5)),
+        (PersonCriteriaType(), {"sub_roles": ["devops"]}, PersonCriteria(sub_roles=["devops"])),
+        (ToolCriteriaType(), {"include": ["Go"]}, ToolCriteria(include=["Go"])),
+        (ProcessCriteriaType(), {"exclude": ["Scrum"]}, ProcessCriteria(exclude=["Scrum"])),
+        (
+            CompanyCriteriaType(),
+            {"headcount_min": 10, "org_size": {"engineering_max": 50}, "funding": ["Seed"]},
+            CompanyCriteria(
+                headcount_min=10,
+                org_size=OrgSizeCriteria(engineering_max=50),
+                funding=[FundingRound.SEED],
+            ),
+        ),
+        (
+            OpportunityContextType(),
+            {"job_post": [{"snake_case": "kept"}]},
+            OpportunityContext(job_post=[{"snake_case": "kept"}]),
+        ),
+    ],
+)
+def test_jsonb_dicts_roundtrip(column_type: JSONBType, value: Any, expected: Any) -> None:
+    assert roundtrip(column_type, value) == expected
+    assert roundtrip(column_type, expected) == expected
+
+
+def test_jsonb_contains_operand_is_not_filled_with_defaults() -> None:
+    assert ToolType().process_bind_param([{"name": "Python"}], None) == [{"name": "Python"}]
@@ -0,0 +1,52 @@
+from typing import Any
+
+import pytest
+
+from app.domain.jobs import utils
+from app.lib.job_boards import JobBoardPosting
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def scraped(monkeypatch: "pytest.MonkeyPatch") -> list[str]:
+    """Urls scraped through ScraperAPI, job details are extracted without calling the LLM."""
+    urls: list[str] = []
+
+    async def extract_url_content(url: str, render: bool = False, timeout: float = 60.0) -> str:
+        urls.append(url)
+        return "<p>Scraped</p>"
+
+    async def extract_job_details_from_html(html_content: str, *, refresh: bool = False) -> dict[str, Any]:
+        return {"title": "Extracted", "company": {"name": "Nimbus Labs", "url": "https://nimbus.dev"}}
+
+    monkeypatch.setattr(utils, "extract_url_content", extract_url_content)
+    monkeypatch.setattr(utils, "extract_job_details_from_html", extract_job_details_from_html)
+    return urls
+
+
+def _posting(monkeypatch: "pytest.MonkeyPatch", posting: JobBoardPosting | None) -> None:
+    async def get_job_board_posting(url: str) -> JobBoardPosting | None:
+        return posting
+
+    monkeypatch.setattr(utils, "get_job_board_posting", get_job_board_posting)
+
+
+async def test_job_board_posts_are_not_scraped(monkeypatch: "pytest.MonkeyPatch", scraped: list[str]) -> None:
+    _posting(
+        monkeypatch,
+        JobBoardPosting(title="Platform Engineer", description="<p>Go</p>", company_url="https://nimbus.dev"),
+    )
+    html_content, job_details = await utils.extract_job_post("https://boards.greenhouse.io/nimbus/jobs/123")
+    assert scraped == []
+    assert html_content == "<p>Platform Engineer</p><p>Go</p>"
+    assert job_details["title"] == "Platform Engineer"
+    assert job_details["company"]["url"] == "https://nimbus.dev"
+
+
+async def test_posts_without_company_are_scraped(monkeypatch: "pytest.MonkeyPatch", scraped: list[str]) -> None:
+    _posting(monkeypatch, JobBoardPosting(title="Platform Engineer", description="<p>Go</p>"))
+    html_content, job_details = await utils.extract_job_post("https://boards.greenhouse.io/nimbus/jobs/123")
+    assert scraped == ["https://boards.greenhouse.io/nimbus/jobs/123"]
+    assert html_content == "<p>Scraped</p>"
+    assert job_details["title"] == "Extracted"
@@ -0,0 +1,152 @@
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import ICP, Company, JobPost
+from app.domain.opportunities.matching import (
+    ICPMatcher,
+    company_criteria_filters,
+    company_criteria_matches,
+    icp_criteria_hash,
+)
+from app.lib.schema import (
+    CompanyCriteria,
+    Funding,
+    FundingRound,
+    OrgSize,
+    OrgSizeCriteria,
+    Process,
+    ProcessCriteria,
+    Tool,
+    ToolCriteria,
+)
+
+
+def _icp(
+    tools: list[str] | None = None,
+    excluded_tools: list[str] | None = None,
+    processes: list[str] | None = None,
+    company: CompanyCriteria | None = None,
+) -> ICP:
+    return ICP(
+        id=uuid4(),
+        tenant_id=uuid4(),
+        name="ICP",
+        company=company,
+        tool=ToolCriteria(include=tools, exclude=excluded_tools),
+        process=ProcessCriteria(include=processes),
+    )
+
+
+def _job_post(
+    tools: list[str] | None = None,
+    processes: list[str] | None = None,
+    company: Company | None = None,
+) -> JobPost:
+    return JobPost(
+        id=uuid4(),
+        created_at=datetime.now(UTC),
+        tools=[Tool(name=name) for name in tools or []],
+        processes=[Process(name=name) for name in processes or []],
+        company=company,
+    )
+
+
+@pytest.mark.parametrize(
+    ("criteria", "company", "expected"),
+    [
+        (None, Company(), True),
+        (CompanyCriteria(headcount_min=10), Company(headcount=None), False),
+        (CompanyCriteria(headcount_min=10), Company(headcount=5), False),
+        (CompanyCriteria(headcount_min=10), Company(headcount=10), True),
+        (CompanyCriteria(headcount_max=50), Company(headcount=None), False),
+        (CompanyCriteria(headcount_max=50), Company(headcount=51), False),
+        (CompanyCriteria(headcount_max=50), Company(headcount=50), True),
+        (CompanyCriteria(org_size=OrgSizeCriteria(engineering_min=5)), Company(org_size=None), False),
+        (CompanyCriteria(org_size=OrgSizeCriteria(engineering_min=5)), Company(org_size=OrgSize()), False),
+        (
+            CompanyCriteria(org_size=OrgSizeCriteria(engineering_max=20)),
+            Company(org_size=OrgSize(engineering=21)),
+            False,
+        ),
+        (
+            CompanyCriteria(org_size=OrgSizeCriteria(engineering_max=20)),
+            Company(org_size=OrgSize(engineering=20)),
+            True,
+        ),
+        (CompanyCriteria(funding=[FundingRound.SEED]), Company(last_funding=None), True),
+        (CompanyCriteria(funding=[FundingRound.SEED]), Company(last_funding=Funding()), True),
+        (CompanyCriteria(funding=[FundingRound.SEED]), Company(last_funding=Funding(FundingRound.SEED)), True),
+        (CompanyCriteria(funding=[FundingRound.SEED]), Company(last_funding=Funding(FundingRound.SERIES_A)), False),
+        (CompanyCriteria(countries=["France"]), Company(), True),
+    ],
+)
+def test_company_criteria_matches(criteria: CompanyCriteria | None, company: Company, expected: bool) -> None:
+    assert company_criteria_matches(criteria, company) is expected
+
+
+def test_company_criteria_filters_without_criteria() -> None:
+    assert company_criteria_filters(None) == []
+    assert company_criteria_filters(CompanyCriteria(countries=["France"])) == []
+
+
+def test_company_criteria_filters_keep_unknown_funding() -> None:
+    criteria = CompanyCriteria(headcount_min=10, funding=[FundingRound.SEED, FundingRound.SERIES_A])
+    filters = company_criteria_filters(criteria)
+    assert len(filters) == 2
+
+    funding_filter = str(filters[1].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert f"'{FundingRound.SERIES_UNKNOWN.value}'" in funding_filter
+    assert "NOT IN" in funding_filter
+    excluded = funding_filter.split("NOT IN")[1]
+    assert f"'{FundingRound.SERIES_B.value}'" in excluded
+    assert f"'{FundingRound.SEED.value}'" not in excluded
+    assert f"'{FundingRound.SERIES_UNKNOWN.value}'" not in excluded
+
+
+def test_icp_matcher_matches_included_tools_and_processes() -> None:
+    by_tool = _icp(tools=["Python"])
+    by_process = _icp(processes=["Code review"])
+    matcher = ICPMatcher([by_tool, by_process])
+
+    assert matcher.match(_job_post(tools=["Python"])) == [by_tool]
+    assert matcher.match(_job_post(processes=["Code review"])) == [by_process]
+    assert {icp.id for icp in matcher.match(_job_post(["Python"], ["Code review"]))} == {by_tool.id, by_process.id}
+    assert matcher.match(_job_post(tools=["Go"])) == []
+
+
+def test_icp_matcher_excludes_job_posts_with_every_excluded_tool() -> None:
+    icp = _icp(tools=["Python"], excluded_tools=["Java", "Go"])
+    matcher = ICPMatcher([icp])
+
+    assert matcher.match(_job_post(tools=["Python", "Java"])) == [icp]
+    assert matcher.match(_job_post(tools=["Python", "Java", "Go"])) == []
+
+
+def test_icp_matcher_checks_company_criteria() -> None:
+    icp = _icp(tools=["Python"], company=CompanyCriteria(headcount_min=10))
+    matcher = ICPMatcher([icp])
+
+    assert matcher.match(_job_post(tools=["Python"], company=Company(headcount=50))) == [icp]
+    assert matcher.match(_job_post(tools=["Python"], company=Company(headcount=5))) == []
+
+
+def test_icp_matcher_skips_icps_without_includes() -> None:
+    matcher = ICPMatcher([_icp(excluded_tools=["Java"])])
+
+    assert matcher.icps == []
+    assert str(matcher.job_post_filter()) == "false"
+
+
+def test_icp_criteria_hash_changes_with_matching_criteria_only() -> None:
+    icp = _icp(tools=["Python"])
+    criteria_hash = icp_criteria_hash(icp)
+
+    icp.name = "Renamed"
+    icp.pitch = "Another pitch"
+    assert icp_criteria_hash(icp) == criteria_hash
+
+    icp.tool = ToolCriteria(include=["Python", "Go"])
+    assert icp_criteria_hash(icp) != criteria_hash
@@ -0,0 +1,108 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.db.models import ICP, JobPost
+from app.domain.opportunities.matching import icp_criteria_hash
+from app.domain.opportunities.services import OpportunityService
+from app.lib.schema import ToolCriteria
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def service() -> OpportunityService:
+    return OpportunityService(session=AsyncMock())
+
+
+def _job_posts(count: int) -> list[JobPost]:
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    return [JobPost(id=uuid4(), created_at=start + timedelta(minutes=i)) for i in range(count)]
+
+
+def _cursor(job_post: JobPost) -> tuple[datetime, UUID]:
+    return (job_post.created_at, job_post.id)
+
+
+async def test_hold_scan_cursors_stops_before_first_failure(service: OpportunityService) -> None:
+    job_posts = _job_posts(4)
+    icp_id, other_icp_id = uuid4(), uuid4()
+    icp_cursors: dict[UUID, tuple[datetime, UUID]] = {}
+    held_icp_ids: set[UUID] = set()
+
+    await service._hold_scan_cursors(
+        job_posts,
+        [(icp_id, job_posts[3].id), (icp_id, job_posts[2].id)],
+        icp_cursors,
+        held_icp_ids,
+    )
+
+    assert icp_cursors == {icp_id: _cursor(job_posts[1])}
+    assert held_icp_ids == {icp_id}
+
+    # Held ICPs are not moved by the end of the chunk, the others are
+    await service._advance_scan_cursors(
+        [id_ for id_ in (icp_id, other_icp_id) if id_ not in held_icp_ids],
+        icp_cursors,
+        _cursor(job_posts[-1]),
+    )
+    assert icp_cursors == {icp_id: _cursor(job_posts[1]), other_icp_id: _cursor(job_posts[-1])}
+
+
+async def test_hold_scan_cursors_keeps_cursor_when_first_job_post_fails(service: OpportunityService) -> None:
+    job_posts = _job_posts(2)
+    icp_id = uuid4()
+    icp_cursors: dict[UUID, tuple[datetime, UUID]] = {}
+    held_icp_ids: set[UUID] = set()
+
+    await service._hold_scan_cursors(job_posts, [(icp_id, job_posts[0].id)], icp_cursors, held_icp_ids)
+
+    assert icp_cursors == {}
+    assert held_icp_ids == {icp_id}
+
+
+async def test_hold_scan_cursors_does_not_move_held_icps(service: OpportunityService) -> None:
+    first_chunk, second_chunk = _job_posts(2), _job_posts(2)
+    icp_id = uuid4()
+    icp_cursors: dict[UUID, tuple[datetime, UUID]] = {}
+    held_icp_ids: set[UUID] = set()
+
+    await service._hold_scan_cursors(first_chunk, [(icp_id, first_chunk[1].id)], icp_cursors, held_icp_ids)
+    await service._hold_scan_cursors(second_chunk, [(icp_id, second_chunk[1].id)], icp_cursors, held_icp_ids)
+
+    assert icp_cursors == {icp_id: _cursor(first_chunk[0])}
+
+
+async def test_advance_scan_cursors_never_moves_back(service: OpportunityService) -> None:
+    job_posts = _job_posts(2)
+    icp_id = uuid4()
+    icp_cursors = {icp_id: _cursor(job_posts[1])}
+
+    await service._advance_scan_cursors([icp_id], icp_cursors, _cursor(job_posts[0]))
+
+    assert icp_cursors == {icp_id: _cursor(job_posts[1])}
+    service.repository.session.execute.assert_not_awaited()
+
+
+async def test_reset_changed_scan_cursors(service: OpportunityService) -> None:
+    cursor = _cursor(_job_posts(1)[0])
+    unchanged, changed = (
+        ICP(
+            id=uuid4(),
+            tool=ToolCriteria(include=["Python"]),
+            scan_cursor_created_at=cursor[0],
+            scan_cursor_id=cursor[1],
+        )
+        for _ in range(2)
+    )
+    unchanged.scan_criteria_hash = icp_criteria_hash(unchanged)
+    changed.scan_criteria_hash = icp_criteria_hash(changed)
+    changed.tool = ToolCriteria(include=["Python", "Go"])
+
+    await service._reset_changed_scan_cursors([unchanged, changed])
+
+    assert (unchanged.scan_cursor_created_at, unchanged.scan_cursor_id) == cursor
+    assert (changed.scan_cursor_created_at, changed.scan_cursor_id) == (None, None)
+    assert changed.scan_criteria_hash == icp_criteria_hash(changed)